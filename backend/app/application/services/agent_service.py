@@ -11,7 +11,7 @@ from app.domain.services.agent_domain_service import AgentDomainService
 from app.domain.models.event import AgentEvent
 from typing import Type
 from app.domain.models.agent import Agent
-from app.domain.external.sandbox import Sandbox
+from app.domain.external.sandbox import Sandbox, SandboxPool
 from app.domain.external.search import SearchEngine
 from app.domain.external.llm import LLM
 from app.domain.external.file import FileStorage
@@ -20,7 +20,8 @@ from app.domain.external.task import Task
 from app.domain.utils.json_parser import JsonParser
 from app.domain.models.file import FileInfo
 from app.domain.repositories.mcp_repository import MCPRepository
-from app.domain.models.session import SessionStatus
+from app.domain.models.session import SessionStatus, SessionSummary
+from app.domain.external.notification import SessionNotifier
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -37,6 +38,8 @@ class AgentService:
         file_storage: FileStorage,
         mcp_repository: MCPRepository,
         search_engine: Optional[SearchEngine] = None,
+        session_notifier: Optional[SessionNotifier] = None,
+        sandbox_pool: Optional[SandboxPool] = None,
     ):
         logger.info("Initializing AgentService")
         self._agent_repository = agent_repository
@@ -52,10 +55,12 @@ class AgentService:
             file_storage,
             mcp_repository,
             search_engine,
+            sandbox_pool,
         )
         self._llm = llm
         self._search_engine = search_engine
         self._sandbox_cls = sandbox_cls
+        self._session_notifier = session_notifier
     
     async def create_session(self, user_id: str) -> Session:
         logger.info(f"Creating new session for user: {user_id}")
@@ -110,10 +115,22 @@ class AgentService:
             logger.error(f"Session {session_id} not found for user {user_id}")
         return session
     
-    async def get_all_sessions(self, user_id: str) -> List[Session]:
-        """Get all sessions for a specific user"""
+    async def get_session_events(self, session_id: str, after_id: Optional[str] = None, limit: Optional[int] = None) -> List[AgentEvent]:
+        """Get a page of session events, starting after the given event ID"""
+        logger.info(f"Getting events for session {session_id} after {after_id}")
+        return await self._session_repository.get_events(session_id, after_id, limit)
+
+    async def get_all_sessions(self, user_id: str, session_ids: Optional[List[str]] = None) -> List[SessionSummary]:
+        """Get summaries of all sessions, or of the given sessions, for a specific user"""
         logger.info(f"Getting all sessions for user {user_id}")
-        return await self._session_repository.find_by_user_id(user_id)
+        return await self._session_repository.find_summaries_by_user_id(user_id, session_ids)
+
+    async def watch_sessions(self, user_id: str, timeout: float) -> AsyncGenerator[List[str], None]:
+        """Yield IDs of the user's changed sessions, or an empty list after timeout seconds without changes"""
+        if not self._session_notifier:
+            raise ConnectionError("Session change notifications are not configured")
+        async for session_ids in self._session_notifier.listen(user_id, timeout):
+            yield session_ids
 
     async def delete_session(self, session_id: str, user_id: str) -> None:
         """Delete a session, ensuring it belongs to the user"""
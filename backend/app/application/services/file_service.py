@@ -1,5 +1,7 @@
 from typing import Dict, Any, Optional, BinaryIO, Tuple
+import asyncio
 import logging
+import time
 from app.domain.external.file import FileStorage
 from app.domain.models.file import FileInfo
 from app.application.services.token_service import TokenService
@@ -7,6 +9,9 @@ from app.application.services.token_service import TokenService
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Seconds between lookups of a file that is still being uploaded
+PENDING_FILE_POLL_SECONDS = 0.25
+
 class FileService:
     def __init__(self, file_storage: Optional[FileStorage] = None, token_service: Optional[TokenService] = None):
         self._file_storage = file_storage
@@ -27,15 +32,33 @@ class FileService:
             logger.error(f"Failed to upload file for user {user_id}: {str(e)}")
             raise
     
-    async def download_file(self, file_id: str, user_id: Optional[str] = None) -> Tuple[BinaryIO, FileInfo]:
-        """Download file"""
+    async def download_file(
+        self,
+        file_id: str,
+        user_id: Optional[str] = None,
+        wait_seconds: float = 0
+    ) -> Tuple[BinaryIO, FileInfo]:
+        """Download file
+        
+        Args:
+            wait_seconds: How long to wait for a missing file to appear, for files
+                referenced while they are uploaded in the background
+        """
         logger.info(f"Download file request: file_id={file_id}, user_id={user_id}")
         if not self._file_storage:
             logger.error("File storage service not available")
             raise RuntimeError("File storage service not available")
         
+        deadline = time.monotonic() + wait_seconds
         try:
-            result = await self._file_storage.download_file(file_id, user_id)
+            while True:
+                try:
+                    result = await self._file_storage.download_file(file_id, user_id)
+                    break
+                except FileNotFoundError:
+                    if time.monotonic() >= deadline:
+                        raise
+                await asyncio.sleep(PENDING_FILE_POLL_SECONDS)
             logger.info(f"File downloaded successfully: file_id={file_id}, user_id={user_id}")
             return result
         except Exception as e:
@@ -90,8 +113,20 @@ class FileService:
             logger.error(f"Failed to enrich file info {file_info.file_id} with file URL: {str(e)}")
             raise
 
-    async def create_signed_url(self, file_id: str, user_id: Optional[str] = None, expire_minutes: int = 30) -> str:
-        """Create signed URL for file download"""
+    async def create_signed_url(
+        self,
+        file_id: str,
+        user_id: Optional[str] = None,
+        expire_minutes: int = 30,
+        must_exist: bool = True
+    ) -> str:
+        """Create signed URL for file download
+        
+        Args:
+            must_exist: Check that the file exists, False for files still being uploaded
+                in the background, whose downloads wait for the upload. Only applies without
+                a user, whose access is checked.
+        """
         logger.info(f"Create signed URL request: file_id={file_id}, user_id={user_id}, expire_minutes={expire_minutes}")
         
         if not self._token_service:
@@ -103,13 +138,16 @@ class FileService:
             expire_minutes = 30
         
         # Check if file exists and user has access
-        file_info = await self.get_file_info(file_id, user_id)
-        if not file_info:
-            logger.warning(f"File not found or access denied for signed URL: file_id={file_id}, user_id={user_id}")
-            raise FileNotFoundError("File not found")
+        if must_exist or user_id:
+            file_info = await self.get_file_info(file_id, user_id)
+            if not file_info:
+                logger.warning(f"File not found or access denied for signed URL: file_id={file_id}, user_id={user_id}")
+                raise FileNotFoundError("File not found")
         
-        # Create signed URL for file download
+        # Create signed URL for file download, the pending flag is covered by the signature
         base_url = f"/api/v1/files/{file_id}"
+        if not must_exist and not user_id:
+            base_url = f"{base_url}?pending=1"
         signed_url = self._token_service.create_signed_url(
             base_url=base_url,
             expire_minutes=expire_minutes
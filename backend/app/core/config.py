@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from pydantic import field_validator
+from pydantic import BaseModel, field_validator
 from functools import lru_cache
 import secrets
 import logging
@@ -7,6 +7,14 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+class LLMEndpointConfig(BaseModel):
+    """One OpenAI-compatible endpoint of the LLM router"""
+    api_base: str
+    api_key: str | None = None  # Defaults to API_KEY
+    model_name: str | None = None  # Defaults to MODEL_NAME
+    max_concurrency: int = 8  # Requests in flight at once, further requests queue
+
+
 class Settings(BaseSettings):
 
     # Model provider configuration
@@ -17,6 +25,27 @@ class Settings(BaseSettings):
     model_name: str = "deepseek-chat"
     temperature: float = 0.7
     max_tokens: int = 2000
+    llm_stream: bool = True  # Stream completions so users see text as it is generated
+    llm_stream_usage: bool = True  # Ask for token counts in the last stream chunk (stream_options.include_usage)
+    llm_parallel_tool_calls: bool = False  # Let the model call several read-only tools in one turn and run them concurrently
+    llm_structured_output: bool | None = None  # Constrain JSON answers to their schema, probed from the provider if unset
+    llm_prompt_cache: bool = False  # Keep the prompt prefix unchanged between requests for provider prompt caching
+    llm_context_window: int | None = None  # Prompt + response tokens, looked up from the model name if unset
+
+    # Models of auxiliary LLM calls, unset values fall back to the tier above (extraction -> fast -> main)
+    fast_api_base: str | None = None
+    fast_api_key: str | None = None
+    fast_model_name: str | None = None  # JSON repair
+    extraction_api_base: str | None = None
+    extraction_api_key: str | None = None
+    extraction_model_name: str | None = None  # Browser page content extraction
+
+    # LLM router configuration, used when endpoints are configured (JSON list, first is preferred)
+    llm_endpoints: list[LLMEndpointConfig] = []
+    llm_hedge: bool = True  # Send a request slower than the endpoint's p95 to a second endpoint too, once 20 latencies are known
+    llm_hedge_min_delay_seconds: float = 2.0  # Hedge after max(this, the endpoint's p95 latency)
+    llm_circuit_failure_threshold: int = 3  # Consecutive 429/5xx/connection errors that open an endpoint's circuit
+    llm_circuit_open_seconds: float = 30.0  # Circuit open time when the provider gives no Retry-After
 
     # MongoDB configuration
     mongodb_uri: str = "mongodb://mongodb:27017"
@@ -29,6 +58,11 @@ class Settings(BaseSettings):
     redis_port: int = 6379
     redis_db: int = 0
     redis_password: str | None = None
+    redis_stream_max_len: int | None = 10000  # Approximate MAXLEN applied on every XADD
+    redis_stream_retention_seconds: int | None = None  # Approximate MINID trimming, takes precedence over max len
+    redis_stream_ttl_seconds: int = 3600  # Expiry of task streams once the task is done
+    redis_stream_sweep_interval_seconds: int = 600
+    redis_stream_orphan_seconds: int = 86400  # Idle streams without TTL older than this are deleted
 
     # Sandbox configuration
     sandbox_address: str | None = None
@@ -40,6 +74,21 @@ class Settings(BaseSettings):
     sandbox_https_proxy: str | None = None
     sandbox_http_proxy: str | None = None
     sandbox_no_proxy: str | None = None
+    sandbox_http2: bool = False  # Requires the h2 package
+    sandbox_max_connections: int = 20  # Per sandbox address
+    sandbox_max_keepalive_connections: int = 10
+    sandbox_keepalive_expiry_seconds: float = 30.0
+    sandbox_pool_min_idle: int = 0  # Ready sandboxes kept booted ahead of time, 0 disables the pool
+    sandbox_pool_max_total: int = 4  # Upper bound of idle plus booting pool sandboxes
+    sandbox_pool_health_check_interval_seconds: int = 30
+    sandbox_pool_acquire_timeout_seconds: int = 90
+
+    # Browser configuration
+    browser_view_mode: str = "extract"  # "extract" rewrites the page with the LLM, "accessibility" outlines its accessibility tree
+    browser_screenshot_format: str = "jpeg"  # "png", "jpeg", "webp" of the screenshots shown with browser tool events
+    browser_screenshot_quality: int = 70  # 0-100, for jpeg and webp
+    browser_extraction_cache_ttl_seconds: int = 3600  # Reuse LLM page extractions of unchanged pages, 0 disables
+    browser_extraction_cache_max_entries: int = 1000  # Least recently used extractions are evicted beyond this
 
     # Search engine configuration
     search_provider: str | None = "bing"  # "baidu", "google", "bing"
@@ -95,6 +144,14 @@ class Settings(BaseSettings):
             return []
         return [origin.strip() for origin in self.cors_origins.split(",") if origin.strip()]
 
+    @field_validator("browser_screenshot_format")
+    @classmethod
+    def validate_browser_screenshot_format(cls, value: str) -> str:
+        """Only accept formats the browser can encode, so a typo such as jpg fails at startup"""
+        if value not in ("png", "jpeg", "webp"):
+            raise ValueError(f'BROWSER_SCREENSHOT_FORMAT must be "png", "jpeg" or "webp", got "{value}"')
+        return value
+
     def validate(self):
         """Validate configuration settings"""
         if not self.api_key:
@@ -1,11 +1,15 @@
-from typing import Optional, Protocol
+from typing import Optional, Protocol, Tuple
 from app.domain.models.tool_result import ToolResult
 
 class Browser(Protocol):
     """Browser service gateway interface"""
     
-    async def view_page(self) -> ToolResult:
-        """View current page content"""
+    async def view_page(self, mode: Optional[str] = None) -> ToolResult:
+        """View current page content, in the given or the configured view mode"""
+        ...
+    
+    async def cleanup(self) -> None:
+        """Close the browser connection and release its resources"""
         ...
     
     async def navigate(self, url: str) -> ToolResult:
@@ -72,9 +76,15 @@ class Browser(Protocol):
     
     async def screenshot(
         self,
-        full_page: Optional[bool] = False
+        full_page: Optional[bool] = False,
+        image_format: str = "png",
+        quality: Optional[int] = None
     ) -> bytes:
-        """Take a screenshot of the current page"""
+        """Take a screenshot of the current page in an image format of png, jpeg or webp"""
+        ...
+    
+    async def preview_screenshot(self) -> Tuple[bytes, str]:
+        """Take a compressed screenshot of the viewport to show the user, returning the data and its MIME type"""
         ...
     
     async def console_exec(self, javascript: str) -> ToolResult:
@@ -10,7 +10,8 @@ class FileStorage(Protocol):
         filename: str,
         user_id: str,
         content_type: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        file_id: Optional[str] = None
     ) -> FileInfo:
         """Upload file to storage
         
@@ -20,12 +21,17 @@ class FileStorage(Protocol):
             user_id: ID of the user uploading the file
             content_type: MIME type of the file (optional)
             metadata: Additional metadata to store with the file (optional)
+            file_id: ID from new_file_id to store the file under (optional, generated if None)
             
         Returns:
             FileUploadResult containing file_id and upload information
         """
         ...
     
+    def new_file_id(self) -> str:
+        """Generate the ID of a file before uploading it, so it can be referenced while the upload runs"""
+        ...
+    
     async def download_file(
         self,
         file_id: str,
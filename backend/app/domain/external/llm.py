@@ -1,4 +1,5 @@
-from typing import List, Dict, Any, Optional, Protocol
+from typing import List, Dict, Any, Optional, Protocol, AsyncGenerator, Type
+from pydantic import BaseModel
 
 class LLM(Protocol):
     """AI service gateway interface for interacting with AI services"""
@@ -8,7 +9,8 @@ class LLM(Protocol):
         messages: List[Dict[str, str]],
         tools: Optional[List[Dict[str, Any]]] = None,
         response_format: Optional[Dict[str, Any]] = None,
-        tool_choice: Optional[str] = None
+        tool_choice: Optional[str] = None,
+        response_schema: Optional[Type[BaseModel]] = None
     ) -> Dict[str, Any]:
         """Send chat request to AI service
         
@@ -17,11 +19,52 @@ class LLM(Protocol):
             tools: Optional list of tools for function calling
             response_format: Optional response format configuration
             tool_choice: Optional tool choice configuration
+            response_schema: Optional model of the JSON response; providers that support
+                structured output are constrained to it, others get response_format
         Returns:
-            Response message from AI service
+            Response message from AI service, with the provider's token counts
+            in "usage" when available
         """
         ... 
 
+    def ask_stream(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tool_choice: Optional[str] = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Send chat request to AI service and stream the response
+        
+        Args:
+            messages: List of messages, including conversation history
+            tools: Optional list of tools for function calling
+            response_format: Optional response format configuration
+            tool_choice: Optional tool choice configuration
+            response_schema: Optional model of the JSON response, as for ask
+        Yields:
+            {"type": "delta", "content": str} for every content chunk as it arrives, then
+            {"type": "message", "message": Dict} with the complete response message,
+            including fully assembled tool calls and "usage" like ask
+        """
+        ...
+
+    @property
+    def stream(self) -> bool:
+        """Whether responses should be streamed"""
+        ...
+
+    @property
+    def parallel_tool_calls(self) -> bool:
+        """Whether the model may request several tool calls in one response"""
+        ...
+
+    @property
+    def prompt_cache(self) -> bool:
+        """Whether the prompt prefix should be kept unchanged between requests for provider prompt caching"""
+        ...
+
     @property
     def model_name(self) -> str:
         """Get the model name"""
@@ -35,4 +78,9 @@ class LLM(Protocol):
     @property
     def max_tokens(self) -> int:
         """Get the max tokens"""
+        ...
+
+    @property
+    def context_window(self) -> int:
+        """Get the number of tokens the model accepts for prompt and response together"""
         ...
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Any, Protocol, Tuple, Optional
+from typing import Any, Protocol, Tuple, Optional, List
 
 class MessageQueue(Protocol):
     """Message queue interface for agent communication"""
@@ -23,14 +23,44 @@ class MessageQueue(Protocol):
         """
         ...
     
-    async def pop(self) -> Tuple[str, Any]:
-        """Get and remove the first message from the queue
+    async def get_many(self, start_id: Optional[str] = None, count: int = 100, block_ms: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """Get up to count messages from the queue in one round trip
+        
+        Args:
+            start_id: Message ID to start reading after, defaults to "0" meaning from the earliest message
+            count: Maximum number of messages to return
+            block_ms: Block time in milliseconds if no message is available, defaults to None meaning no blocking
+            
+        Returns:
+            List[Tuple[str, Any]]: (Message ID, Message content) pairs in order, empty if no message
+        """
+        ...
+    
+    async def pop(self, block_ms: Optional[int] = None) -> Tuple[str, Any]:
+        """Take the first message from the queue so no other consumer receives it
+        
+        Args:
+            block_ms: Time in milliseconds to wait for a message if the queue is empty,
+                defaults to None meaning no blocking
         
         Returns:
             Tuple[str, Any]: (Message ID, Message content), returns (None, None) if queue is empty
         """
         ...
     
+    async def ack(self, message_id: str) -> bool:
+        """Acknowledge that a popped message has been handled
+        
+        Unacknowledged messages may be delivered again to another consumer.
+        
+        Args:
+            message_id: ID of the popped message
+            
+        Returns:
+            bool: True if the message was acknowledged
+        """
+        ...
+    
     async def clear(self) -> None:
         """Clear all messages from the queue"""
         ...
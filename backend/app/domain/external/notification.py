@@ -0,0 +1,29 @@
+from typing import Protocol, AsyncGenerator, List
+
+
+class SessionNotifier(Protocol):
+    """Publish/subscribe interface for per-user session change notifications"""
+
+    async def publish(self, user_id: str, session_id: str) -> None:
+        """Notify subscribers of a user that one of their sessions changed
+
+        Args:
+            user_id: Owner of the changed session
+            session_id: ID of the created, updated or deleted session
+        """
+        ...
+
+    def listen(self, user_id: str, timeout: float) -> AsyncGenerator[List[str], None]:
+        """Listen for session changes of a user
+
+        Args:
+            user_id: User to listen for
+            timeout: Seconds to wait for a change before yielding an empty batch as heartbeat
+
+        Yields:
+            List[str]: IDs of sessions changed since the previous batch, empty on heartbeat
+
+        Raises:
+            ConnectionError: If the notification channel is lost, callers should resync and listen again
+        """
+        ...
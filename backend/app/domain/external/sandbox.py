@@ -10,6 +10,14 @@ class Sandbox(Protocol):
         """Ensure sandbox is ready"""
         ...
     
+    async def health_check(self) -> bool:
+        """Check once whether all sandbox services are running
+        
+        Returns:
+            bool: True if the sandbox is ready to use
+        """
+        ...
+    
     async def exec_command(
         self,
         session_id: str,
@@ -295,3 +303,15 @@ class Sandbox(Protocol):
             Sandbox instance
         """
         ...
+
+
+class SandboxPool(Protocol):
+    """Pool of sandboxes booted ahead of time"""
+
+    async def acquire(self) -> Sandbox:
+        """Take a ready sandbox out of the pool, creating one if none is available
+        
+        Returns:
+            Sandbox instance owned by the caller
+        """
+        ...
@@ -83,8 +83,8 @@ class Task(Protocol):
         ...
     
     @classmethod
-    def get(cls, task_id: str) -> Optional["Task"]:
-        """Get a task by its ID.
+    async def get(cls, task_id: str) -> Optional["Task"]:
+        """Get a task by its ID, wherever it is running.
 
         Returns:
             Optional[Task]: Task instance if found, None otherwise
@@ -4,6 +4,25 @@ from pydantic import BaseModel, Field, field_validator
 from app.domain.models.memory import Memory
 import uuid
 
+class TokenUsage(BaseModel):
+    """Token counts reported by the LLM provider"""
+    requests: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0  # Prompt tokens served from the provider's prompt cache
+    completion_tokens: int = 0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        if not self.prompt_tokens:
+            return 0.0
+        return self.cached_tokens / self.prompt_tokens
+
+    def add(self, usage: "TokenUsage") -> None:
+        self.requests += usage.requests
+        self.prompt_tokens += usage.prompt_tokens
+        self.cached_tokens += usage.cached_tokens
+        self.completion_tokens += usage.completion_tokens
+
 class Agent(BaseModel):
     """
     Agent aggregate root that manages the lifecycle and state of an AI agent
@@ -14,11 +33,20 @@ class Agent(BaseModel):
     model_name: str = Field(default="")
     temperature: float = Field(default=0.7)
     max_tokens: int = Field(default=2000)
+    usage: Dict[str, TokenUsage] = Field(default_factory=dict)  # Token usage by agent name
     
     # Context related fields
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))  # Creation timestamp
     updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))  # Last update timestamp
 
+    @property
+    def total_usage(self) -> TokenUsage:
+        """Token usage of all agents of the session"""
+        total = TokenUsage()
+        for usage in self.usage.values():
+            total.add(usage)
+        return total
+
     @field_validator("temperature")
     def validate_temperature(cls, v: float) -> float:
         """Validate temperature is between 0 and 1"""
@@ -0,0 +1,32 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+# JSON response schemas of the agent prompts, used for structured output
+
+
+class PlanStepResponse(BaseModel):
+    id: str = Field(description="Step identifier")
+    description: str = Field(description="Step description")
+
+
+class CreatePlanResponse(BaseModel):
+    message: str = Field(description="Response to user's message and thinking about the task, use the user's language")
+    language: str = Field(description="The working language according to the user's message")
+    steps: List[PlanStepResponse]
+    goal: str = Field(description="Plan goal generated based on the context")
+    title: str = Field(description="Plan title generated based on the context")
+
+
+class UpdatePlanResponse(BaseModel):
+    steps: List[PlanStepResponse] = Field(description="Array of updated uncompleted steps")
+
+
+class StepResultResponse(BaseModel):
+    success: bool = Field(description="Whether the task is executed successfully")
+    attachments: List[str] = Field(description="File paths in sandbox for generated files to be delivered to user")
+    result: str = Field(description="Task result, empty if no result to deliver")
+
+
+class SummaryResponse(BaseModel):
+    message: str = Field(description="Response to user's message and thinking about the task, as detailed as possible")
+    attachments: List[str] = Field(description="File paths in sandbox for generated files to be delivered to user")
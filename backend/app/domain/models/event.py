@@ -50,7 +50,7 @@ class PlanEvent(BaseEvent):
 
 class BrowserToolContent(BaseModel):
     """Browser tool content"""
-    screenshot: str
+    screenshot: Optional[str]  # File ID, None when the screenshot could not be stored
 
 class SearchToolContent(BaseModel):
     """Search tool content"""
@@ -105,6 +105,11 @@ class MessageEvent(BaseEvent):
     message: str
     attachments: Optional[List[FileInfo]] = None
 
+class MessageDeltaEvent(BaseEvent):
+    """Partial assistant message streamed while it is generated, superseded by the MessageEvent"""
+    type: Literal["message_delta"] = "message_delta"
+    delta: str
+
 class DoneEvent(BaseEvent):
     """Done event"""
     type: Literal["done"] = "done"
@@ -119,6 +124,7 @@ AgentEvent = Union[
     ToolEvent,
     StepEvent,
     MessageEvent,
+    MessageDeltaEvent,
     DoneEvent,
     TitleEvent,
     WaitEvent,
@@ -1,16 +1,37 @@
 import logging
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, PrivateAttr
+from typing import List, Dict, Any, Optional, Set
 from app.domain.models.tool_result import ToolResult
 
 
 logger = logging.getLogger(__name__)
 
+# Tool results compacted away to keep the prompt small
+COMPACTED_FUNCTIONS = ["browser_view", "browser_navigate"]
+# Appended instead of rewriting tool results when the message prefix must stay unchanged
+COMPACTION_MARKER = "(Browser page contents above are outdated, view the page again if you need them)"
+
+class MemoryChanges(BaseModel):
+    """Changes made to a memory since it was last saved"""
+    replace: bool = False  # The stored messages are unknown, write all of them
+    truncate_to: Optional[int] = None  # Drop stored messages from this index on
+    removed: int = 0  # Number of stored messages dropped by truncate_to
+    updated: Dict[int, Dict[str, Any]] = {}  # Stored messages changed in place
+    appended: List[Dict[str, Any]] = []  # New messages after the stored ones
+
+    @property
+    def empty(self) -> bool:
+        return not (self.replace or self.truncate_to is not None or self.updated or self.appended)
+
 class Memory(BaseModel):
     """
     Memory class, defining the basic behavior of memory
     """
     messages: List[Dict[str, Any]] = []
+    # Number of leading messages known to be stored, None if unknown
+    _saved_count: Optional[int] = PrivateAttr(default=None)
+    _truncated_to: Optional[int] = PrivateAttr(default=None)
+    _dirty_indices: Set[int] = PrivateAttr(default_factory=set)
 
     def get_message_role(self, message: Dict[str, Any]) -> str:
         """Get the role of the message"""
@@ -36,16 +57,57 @@ class Memory(BaseModel):
     
     def roll_back(self) -> None:
         """Roll back memory"""
-        self.messages = self.messages[:-1]
+        if not self.messages:
+            return
+        self.messages.pop()
+        length = len(self.messages)
+        self._dirty_indices.discard(length)
+        if self._saved_count is not None and length < self._saved_count:
+            self._truncated_to = length if self._truncated_to is None else min(self._truncated_to, length)
     
-    def compact(self) -> None:
-        """Compact memory"""
-        for message in self.messages:
+    def compact(self, append_only: bool = False) -> None:
+        """Compact memory
+
+        Args:
+            append_only: Leave earlier messages unchanged, so a provider prompt cache keeps
+                matching them, and only append a marker after new browser results
+        """
+        if append_only:
+            for message in reversed(self.messages):
+                if message.get("role") == "user" and message.get("content") == COMPACTION_MARKER:
+                    return
+                if message.get("role") == "tool" and message.get("function_name") in COMPACTED_FUNCTIONS:
+                    self.add_message({"role": "user", "content": COMPACTION_MARKER})
+                    return
+            return
+        removed = ToolResult(success=True, data='(removed)').model_dump_json()
+        for index, message in enumerate(self.messages):
             if message.get("role") == "tool":
-                if message.get("function_name") in ["browser_view", "browser_navigate"]:
-                    message["content"] = ToolResult(success=True, data='(removed)').model_dump_json()
+                if message.get("function_name") in COMPACTED_FUNCTIONS:
+                    if message.get("content") == removed:
+                        continue
+                    message["content"] = removed
+                    self._dirty_indices.add(index)
                     logger.debug(f"Removed tool result from memory: {message['function_name']}")
 
+    def get_changes(self) -> MemoryChanges:
+        """Get the changes to write so the stored memory matches this one"""
+        if self._saved_count is None:
+            return MemoryChanges(replace=True)
+        kept = self._saved_count if self._truncated_to is None else self._truncated_to
+        return MemoryChanges(
+            truncate_to=self._truncated_to,
+            removed=self._saved_count - kept,
+            updated={index: self.messages[index] for index in sorted(self._dirty_indices) if index < kept},
+            appended=self.messages[kept:],
+        )
+
+    def mark_saved(self) -> None:
+        """Record that the stored memory now matches this one"""
+        self._saved_count = len(self.messages)
+        self._truncated_to = None
+        self._dirty_indices.clear()
+
     @property
     def empty(self) -> bool:
         """Check if memory is empty"""
@@ -3,8 +3,6 @@ from datetime import datetime, UTC
 from typing import List, Optional
 from enum import Enum
 import uuid
-from app.domain.models.event import PlanEvent, AgentEvent
-from app.domain.models.plan import Plan
 from app.domain.models.file import FileInfo
 
 
@@ -29,14 +27,17 @@ class Session(BaseModel):
     latest_message_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC))
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
-    events: List[AgentEvent] = []
     files: List[FileInfo] = []
     status: SessionStatus = SessionStatus.PENDING
     is_shared: bool = False  # Whether this session is shared publicly
 
-    def get_last_plan(self) -> Optional[Plan]:
-        """Get the last plan from the events"""
-        for event in reversed(self.events):
-            if isinstance(event, PlanEvent):
-                return event.plan
-        return None
\ No newline at end of file
+
+class SessionSummary(BaseModel):
+    """Lightweight read model of a session used for session lists"""
+    id: str
+    title: Optional[str] = None
+    status: SessionStatus = SessionStatus.PENDING
+    unread_message_count: int = 0
+    latest_message: Optional[str] = None
+    latest_message_at: Optional[datetime] = None
+    is_shared: bool = False
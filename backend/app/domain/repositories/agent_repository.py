@@ -1,5 +1,5 @@
 from typing import Optional, List, Protocol
-from app.domain.models.agent import Agent
+from app.domain.models.agent import Agent, TokenUsage
 from app.domain.models.plan import Plan
 from app.domain.models.memory import Memory
 
@@ -25,5 +25,9 @@ class AgentRepository(Protocol):
         ...
 
     async def save_memory(self, agent_id: str, name: str, memory: Memory) -> None:
-        """Update the messages of a memory"""
-        ... 
\ No newline at end of file
+        """Save the changes made to a memory since it was loaded or last saved"""
+        ...
+
+    async def add_usage(self, agent_id: str, name: str, usage: TokenUsage) -> None:
+        """Add token usage of one of the agent's LLM requests to its totals"""
+        ...
@@ -1,8 +1,8 @@
 from typing import Optional, Protocol, List
 from datetime import datetime
-from app.domain.models.session import Session, SessionStatus
+from app.domain.models.session import Session, SessionStatus, SessionSummary
 from app.domain.models.file import FileInfo
-from app.domain.models.event import BaseEvent
+from app.domain.models.event import BaseEvent, AgentEvent
 
 class SessionRepository(Protocol):
     """Repository interface for Session aggregate"""
@@ -19,6 +19,15 @@ class SessionRepository(Protocol):
         """Find all sessions for a specific user"""
         ...
     
+    async def find_summaries_by_user_id(self, user_id: str, session_ids: Optional[List[str]] = None) -> List[SessionSummary]:
+        """Find session summaries for a specific user, newest message first
+
+        Args:
+            user_id: User ID
+            session_ids: Only return these sessions, None means all sessions of the user
+        """
+        ...
+
     async def find_by_id_and_user_id(self, session_id: str, user_id: str) -> Optional[Session]:
         """Find a session by ID and user ID (for authorization)"""
         ...
@@ -34,6 +43,24 @@ class SessionRepository(Protocol):
     async def add_event(self, session_id: str, event: BaseEvent) -> None:
         """Add an event to a session"""
         ...
+
+    async def get_events(self, session_id: str, after_id: Optional[str] = None, limit: Optional[int] = None) -> List[AgentEvent]:
+        """Get events of a session in insertion order
+
+        Args:
+            session_id: Session ID
+            after_id: Only return events added after the event with this ID, None means from the beginning
+            limit: Maximum number of events to return, None means no limit
+        """
+        ...
+
+    async def get_latest_event(self, session_id: str, event_type: str) -> Optional[AgentEvent]:
+        """Get the most recent event of the given type from a session"""
+        ...
+
+    async def clear_screenshot(self, session_id: str, file_id: str) -> None:
+        """Mark the browser screenshot with this file ID as missing in the events of a session"""
+        ...
     
     async def add_file(self, session_id: str, file_info: FileInfo) -> None:
         """Add a file to a session"""
@@ -4,7 +4,7 @@ import time
 from datetime import datetime
 from app.domain.models.session import Session, SessionStatus
 from app.domain.external.llm import LLM
-from app.domain.external.sandbox import Sandbox
+from app.domain.external.sandbox import Sandbox, SandboxPool
 from app.domain.external.search import SearchEngine
 from app.domain.models.event import BaseEvent, ErrorEvent, DoneEvent, MessageEvent, WaitEvent, AgentEvent
 from pydantic import TypeAdapter
@@ -21,6 +21,9 @@ from app.domain.repositories.mcp_repository import MCPRepository
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Maximum number of output events read from the task stream per round trip
+CHAT_EVENT_BATCH_SIZE = 100
+
 class AgentDomainService:
     """
     Agent domain service, responsible for coordinating the work of planning agent and execution agent
@@ -37,11 +40,13 @@ class AgentDomainService:
         file_storage: FileStorage,
         mcp_repository: MCPRepository,
         search_engine: Optional[SearchEngine] = None,
+        sandbox_pool: Optional[SandboxPool] = None,
     ):
         self._repository = agent_repository
         self._session_repository =session_repository
         self._llm = llm
         self._sandbox_cls = sandbox_cls
+        self._sandbox_pool = sandbox_pool
         self._search_engine = search_engine
         self._task_cls = task_cls
         self._json_parser = json_parser
@@ -62,7 +67,10 @@ class AgentDomainService:
         if sandbox_id:
             sandbox = await self._sandbox_cls.get(sandbox_id)
         if not sandbox:
-            sandbox = await self._sandbox_cls.create()
+            if self._sandbox_pool:
+                sandbox = await self._sandbox_pool.acquire()
+            else:
+                sandbox = await self._sandbox_cls.create()
             session.sandbox_id = sandbox.id
             await self._session_repository.save(session)
         browser = await sandbox.get_browser()
@@ -100,7 +108,7 @@ class AgentDomainService:
         if not task_id:
             return None
         
-        return self._task_cls.get(task_id)
+        return await self._task_cls.get(task_id)
 
     async def stop_session(self, session_id: str) -> None:
         """Stop a session"""
@@ -135,7 +143,8 @@ class AgentDomainService:
             task = await self._get_task(session)
 
             if message:
-                if session.status != SessionStatus.RUNNING:
+                # Also recreate the task if its node went away while it was running
+                if session.status != SessionStatus.RUNNING or not task:
                     task = await self._create_task(session)
                     if not task:
                         raise RuntimeError("Failed to create task")
@@ -159,19 +168,32 @@ class AgentDomainService:
             logger.info(f"Session {session_id} started")
             logger.debug(f"Session {session_id} task: {task}")
            
-            while task and not task.done:
-                event_id, event_str = await task.output_stream.get(start_id=latest_event_id, block_ms=1000)
-                latest_event_id = event_id
-                if event_str is None:
+            finished = False
+            while task and not task.done and not finished:
+                # Drain every pending event in one round trip
+                messages = await task.output_stream.get_many(
+                    start_id=latest_event_id,
+                    count=CHAT_EVENT_BATCH_SIZE,
+                    block_ms=1000
+                )
+                if not messages:
                     logger.debug(f"No event found in Session {session_id}'s event queue")
+                    # The task may have finished or lost its node meanwhile
+                    task = await self._get_task(session)
                     continue
-                event = TypeAdapter(AgentEvent).validate_json(event_str)
-                event.id = event_id
-                logger.debug(f"Got event from Session {session_id}'s event queue: {type(event).__name__}")
+                latest_event_id = messages[-1][0]
+                # The user is watching, so reset the unread count once per batch
                 await self._session_repository.update_unread_message_count(session_id, 0)
-                yield event
-                if isinstance(event, (DoneEvent, ErrorEvent, WaitEvent)):
-                    break
+                for event_id, event_str in messages:
+                    if event_str is None:
+                        continue
+                    event = TypeAdapter(AgentEvent).validate_json(event_str)
+                    event.id = event_id
+                    logger.debug(f"Got event from Session {session_id}'s event queue: {type(event).__name__}")
+                    yield event
+                    if isinstance(event, (DoneEvent, ErrorEvent, WaitEvent)):
+                        finished = True
+                        break
             
             logger.info(f"Session {session_id} completed")
 
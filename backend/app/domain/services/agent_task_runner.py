@@ -1,13 +1,15 @@
-from typing import Optional, AsyncGenerator, List
+from typing import Optional, AsyncGenerator, List, Set, Tuple
 import asyncio
+import hashlib
 import logging
-from pydantic import TypeAdapter
+from pydantic import TypeAdapter, ValidationError
 from app.domain.models.message import Message
 from app.domain.models.event import (
     BaseEvent,
     ErrorEvent,
     TitleEvent,
     MessageEvent,
+    MessageDeltaEvent,
     DoneEvent,
     ToolEvent,
     WaitEvent,
@@ -39,6 +41,9 @@ from app.domain.models.search import SearchResults
 
 logger = logging.getLogger(__name__)
 
+# Time an input pop waits for a message, while a pending one is not reclaimable yet
+POP_BLOCK_MS = 1000
+
 class AgentTaskRunner(TaskRunner):
     """Agent task that can be cancelled"""
     def __init__(
@@ -69,6 +74,9 @@ class AgentTaskRunner(TaskRunner):
         self._file_storage = file_storage
         self._mcp_repository = mcp_repository
         self._mcp_tool = MCPTool()
+        # Content hash and file ID of the last browser screenshot
+        self._last_screenshot: Optional[Tuple[str, str]] = None
+        self._screenshot_uploads: Set[asyncio.Task] = set()
         self._flow = PlanActFlow(
             self._agent_id,
             self._repository,
@@ -87,19 +95,56 @@ class AgentTaskRunner(TaskRunner):
         event.id = event_id
         await self._session_repository.add_event(self._session_id, event)
     
-    async def _pop_event(self, task: Task) -> AgentEvent:
-        event_id, event_str = await task.input_stream.pop()
+    async def _pop_event(self, task: Task) -> Optional[AgentEvent]:
+        # Block briefly, so waiting for a pending message to become reclaimable does not spin
+        event_id, event_str = await task.input_stream.pop(block_ms=POP_BLOCK_MS)
+        if event_id is None:
+            return None
+        # Acknowledge messages that can never be handled, so they are not redelivered forever
         if event_str is None:
             logger.warning(f"Agent {self._agent_id} received empty message")
-            return
-        event = TypeAdapter(AgentEvent).validate_json(event_str)
+            await task.input_stream.ack(event_id)
+            return None
+        try:
+            event = TypeAdapter(AgentEvent).validate_json(event_str)
+        except ValidationError as e:
+            logger.error(f"Agent {self._agent_id} dropped invalid message {event_id}: {e}")
+            await task.input_stream.ack(event_id)
+            return None
         event.id = event_id
         return event
     
     async def _get_browser_screenshot(self) -> str:
-        screenshot = await self._browser.screenshot()
-        result = await self._file_storage.upload_file(screenshot, "screenshot.png", self._user_id)
-        return result.file_id
+        """Capture the browser for a tool event and return the screenshot's file ID.
+
+        A frame identical to the previous one reuses its file. A new frame gets its file ID
+        right away and is uploaded in the background, so the event is not held up.
+        """
+        screenshot, content_type = await self._browser.preview_screenshot()
+        digest = hashlib.sha256(screenshot).hexdigest()
+        if self._last_screenshot and self._last_screenshot[0] == digest:
+            return self._last_screenshot[1]
+        file_id = self._file_storage.new_file_id()
+        self._last_screenshot = (digest, file_id)
+        upload = asyncio.create_task(self._upload_screenshot(screenshot, content_type, file_id))
+        self._screenshot_uploads.add(upload)
+        upload.add_done_callback(self._screenshot_uploads.discard)
+        return file_id
+    
+    async def _upload_screenshot(self, screenshot: bytes, content_type: str, file_id: str) -> None:
+        try:
+            file_name = f"screenshot.{content_type.split('/')[-1]}"
+            await self._file_storage.upload_file(screenshot, file_name, self._user_id, content_type, file_id=file_id)
+        except Exception as e:
+            logger.exception(f"Agent {self._agent_id} failed to upload screenshot: {e}")
+            # Later identical frames must not point to the missing file
+            if self._last_screenshot and self._last_screenshot[1] == file_id:
+                self._last_screenshot = None
+            # Events already stored with the file ID show no screenshot instead of a broken one
+            try:
+                await self._session_repository.clear_screenshot(self._session_id, file_id)
+            except Exception as e:
+                logger.exception(f"Agent {self._agent_id} failed to clear missing screenshot {file_id}: {e}")
 
     async def _sync_file_to_storage(self, file_path: str) -> Optional[FileInfo]:
         """Upload or update file and return FileInfo"""
@@ -218,27 +263,39 @@ class AgentTaskRunner(TaskRunner):
             await self._mcp_tool.initialized(await self._mcp_repository.get_mcp_config())
             while not await task.input_stream.is_empty():
                 event = await self._pop_event(task)
-                message = ""
-                if isinstance(event, MessageEvent):
-                    message = event.message or ""
-                    await self._sync_message_attachments_to_sandbox(event)
-                    
-                logger.info(f"Agent {self._agent_id} received new message: {message[:50]}...")
+                if event is None:
+                    continue
+                input_event_id = event.id
+                try:
+                    message = ""
+                    if isinstance(event, MessageEvent):
+                        message = event.message or ""
+                        await self._sync_message_attachments_to_sandbox(event)
+                        
+                    logger.info(f"Agent {self._agent_id} received new message: {message[:50]}...")
 
-                message_obj = Message(message=message, attachments=[attachment.file_path for attachment in event.attachments])
-                
-                async for event in self._run_flow(message_obj):
-                    await self._put_and_add_event(task, event)
-                    if isinstance(event, TitleEvent):
-                        await self._session_repository.update_title(self._session_id, event.title)
-                    elif isinstance(event, MessageEvent):
-                        await self._session_repository.update_latest_message(self._session_id, event.message, event.timestamp)
-                        await self._session_repository.increment_unread_message_count(self._session_id)
-                    elif isinstance(event, WaitEvent):
-                        await self._session_repository.update_status(self._session_id, SessionStatus.WAITING)
-                        return
-                    if not await task.input_stream.is_empty():
-                        break
+                    message_obj = Message(message=message, attachments=[attachment.file_path for attachment in event.attachments])
+                    
+                    async for event in self._run_flow(message_obj):
+                        if isinstance(event, MessageDeltaEvent):
+                            # Partial text is only streamed live, the final MessageEvent is stored
+                            await task.output_stream.put(event.model_dump_json())
+                            continue
+                        await self._put_and_add_event(task, event)
+                        if isinstance(event, TitleEvent):
+                            await self._session_repository.update_title(self._session_id, event.title)
+                        elif isinstance(event, MessageEvent):
+                            await self._session_repository.update_latest_message(self._session_id, event.message, event.timestamp)
+                            await self._session_repository.increment_unread_message_count(self._session_id)
+                        elif isinstance(event, WaitEvent):
+                            await self._session_repository.update_status(self._session_id, SessionStatus.WAITING)
+                            return
+                        if not await task.input_stream.is_empty():
+                            break
+                finally:
+                    # Acknowledge only once the message has been handled so a crashed worker's
+                    # message is redelivered instead of lost
+                    await task.input_stream.ack(input_event_id)
 
             await self._session_repository.update_status(self._session_id, SessionStatus.COMPLETED)
         except asyncio.CancelledError:
@@ -278,6 +335,15 @@ class AgentTaskRunner(TaskRunner):
         """Destroy the task and release resources"""
         logger.info(f"Starting to destroy agent task")
         
+        # Finish screenshot uploads already referenced by events
+        if self._screenshot_uploads:
+            await asyncio.gather(*self._screenshot_uploads, return_exceptions=True)
+        
+        # Close the browser connection before its sandbox goes away
+        if self._browser:
+            logger.debug(f"Closing Agent {self._agent_id}'s browser")
+            await self._browser.cleanup()
+        
         # Destroy sandbox environment
         if self._sandbox:
             logger.debug(f"Destroying Agent {self._agent_id}'s sandbox environment")
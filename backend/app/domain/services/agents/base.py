@@ -1,11 +1,13 @@
 import json
 import logging
 import asyncio
+import time
 import uuid
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, AsyncGenerator
+from typing import List, Dict, Any, Optional, AsyncGenerator, Tuple, Union, Type, TypeVar
+from pydantic import BaseModel, ValidationError
 from app.domain.external.llm import LLM
-from app.domain.models.agent import Agent
+from app.domain.models.agent import Agent, TokenUsage
 from app.domain.models.memory import Memory
 from app.domain.models.message import Message
 from app.domain.services.tools.base import BaseTool
@@ -16,12 +18,27 @@ from app.domain.models.event import (
     ToolStatus,
     ErrorEvent,
     MessageEvent,
+    MessageDeltaEvent,
     DoneEvent,
 )
 from app.domain.repositories.agent_repository import AgentRepository
 from app.domain.utils.json_parser import JsonParser
+from app.domain.utils.json_stream import JsonStringFieldStreamer
+from app.domain.services.agents.context import (
+    ContextManager,
+    ContextStrategy,
+    TruncateToolOutputStrategy,
+    DropToolPairsStrategy,
+    SummarizeStrategy,
+)
 
 logger = logging.getLogger(__name__)
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+
+# Streamed text is sent in batches of at most this interval to limit the event rate
+STREAM_FLUSH_INTERVAL = 0.05
+
 class BaseAgent(ABC):
     """
     Base agent class, defining the basic behavior of the agent
@@ -34,6 +51,8 @@ class BaseAgent(ABC):
     max_retries: int = 3
     retry_interval: float = 1.0
     tool_choice: Optional[str] = None
+    # User-facing fields of JSON responses streamed as MessageDeltaEvent
+    stream_fields: Tuple[str, ...] = ("message", "result")
 
     def __init__(
         self,
@@ -48,21 +67,86 @@ class BaseAgent(ABC):
         self.llm = llm
         self.json_parser = json_parser
         self.tools = tools
+        self._tools_key = None
+        self._available_tools: List[Dict[str, Any]] = []
+        self._function_tools: Dict[str, BaseTool] = {}
         self.memory = None
+        self.usage = TokenUsage()
+        self.context = ContextManager(llm, self.get_context_strategies())
     
-    def get_available_tools(self) -> Optional[List[Dict[str, Any]]]:
-        """Get all available tools list"""
+    def get_context_strategies(self) -> List[ContextStrategy]:
+        """Strategies used, in order, when the memory does not fit the context window"""
+        return [
+            TruncateToolOutputStrategy(),
+            DropToolPairsStrategy(),
+            SummarizeStrategy(self.llm),
+        ]
+    
+    def _refresh_tools(self) -> None:
+        """Rebuild the tool schema list and function lookup when the tools changed"""
+        key = tuple((id(tool), tool.version) for tool in self.tools)
+        if key == self._tools_key:
+            return
         available_tools = []
+        function_tools = {}
         for tool in self.tools:
-            available_tools.extend(tool.get_tools())
-        return available_tools
+            for schema in tool.get_tools():
+                available_tools.append(schema)
+                # The first tool providing a function handles it
+                function_tools.setdefault(schema["function"]["name"], tool)
+        if self.llm.prompt_cache:
+            # Tools are sent before the messages, so their order must not change between requests
+            available_tools.sort(key=lambda tool: tool["function"]["name"])
+        self._available_tools = available_tools
+        self._function_tools = function_tools
+        self._tools_key = key
+    
+    def get_available_tools(self) -> Optional[List[Dict[str, Any]]]:
+        """Get all available tools list, which must not be modified"""
+        self._refresh_tools()
+        return self._available_tools
     
     def get_tool(self, function_name: str) -> BaseTool:
         """Get specified tool"""
-        for tool in self.tools:
-            if tool.has_function(function_name):
-                return tool
-        raise ValueError(f"Unknown tool: {function_name}")
+        self._refresh_tools()
+        tool = self._function_tools.get(function_name)
+        if tool is None:
+            raise ValueError(f"Unknown tool: {function_name}")
+        return tool
+
+    def is_read_only(self, function_name: str) -> bool:
+        """Check if a function only reads state, so it can run concurrently with other read-only calls"""
+        try:
+            return self.get_tool(function_name).is_read_only(function_name)
+        except ValueError:
+            return False
+
+    def _select_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep the tool calls of a response that are run before the model is asked again.
+        
+        Several calls are only kept while they are read-only, any other call runs on its
+        own, so the model sees its result before deciding what to do next.
+        """
+        if not self.llm.parallel_tool_calls:
+            return tool_calls[:1]
+        selected = []
+        for tool_call in tool_calls:
+            if not self.is_read_only(tool_call.get("function", {}).get("name")):
+                break
+            selected.append(tool_call)
+        return selected or tool_calls[:1]
+
+    def _batch_tool_calls(self, calls: List[Tuple[BaseTool, str, str, Dict[str, Any]]]) -> List[List[Tuple[BaseTool, str, str, Dict[str, Any]]]]:
+        """Group consecutive read-only calls to run concurrently, other calls run one at a time"""
+        batches = []
+        for call in calls:
+            tool, function_name = call[0], call[1]
+            read_only = tool.is_read_only(function_name)
+            if read_only and batches and batches[-1][-1][0].is_read_only(batches[-1][-1][1]):
+                batches[-1].append(call)
+            else:
+                batches.append([call])
+        return batches
 
     async def invoke_tool(self, tool: BaseTool, function_name: str, arguments: Dict[str, Any]) -> ToolResult:
         """Invoke specified tool, with retry mechanism"""
@@ -82,13 +166,23 @@ class BaseAgent(ABC):
         
         return ToolResult(success=False, message=last_error)
     
-    async def execute(self, request: str, format: Optional[str] = None) -> AsyncGenerator[BaseEvent, None]:
+    async def execute(
+        self,
+        request: str,
+        format: Optional[str] = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> AsyncGenerator[BaseEvent, None]:
         format = format or self.format
-        message = await self.ask(request, format)
+        message = None
+        async for item in self.ask_stream(request, format, response_schema):
+            if isinstance(item, BaseEvent):
+                yield item
+            else:
+                message = item
         for _ in range(self.max_iterations):
             if not message.get("tool_calls"):
                 break
-            tool_responses = []
+            calls = []
             for tool_call in message["tool_calls"]:
                 if not tool_call.get("function"):
                     continue
@@ -96,39 +190,49 @@ class BaseAgent(ABC):
                 function_name = tool_call["function"]["name"]
                 tool_call_id = tool_call["id"] or str(uuid.uuid4())
                 function_args = await self.json_parser.parse(tool_call["function"]["arguments"])
+                calls.append((self.get_tool(function_name), function_name, tool_call_id, function_args))
+
+            tool_responses = []
+            for batch in self._batch_tool_calls(calls):
+                # Generate events before tool calls, in the order the model requested them
+                for tool, function_name, tool_call_id, function_args in batch:
+                    yield ToolEvent(
+                        status=ToolStatus.CALLING,
+                        tool_call_id=tool_call_id,
+                        tool_name=tool.name,
+                        function_name=function_name,
+                        function_args=function_args
+                    )
+
+                results = await asyncio.gather(*(
+                    self.invoke_tool(tool, function_name, function_args)
+                    for tool, function_name, _, function_args in batch
+                ))
                 
-                tool = self.get_tool(function_name)
-
-                # Generate event before tool call
-                yield ToolEvent(
-                    status=ToolStatus.CALLING,
-                    tool_call_id=tool_call_id,
-                    tool_name=tool.name,
-                    function_name=function_name,
-                    function_args=function_args
-                )
-
-                result = await self.invoke_tool(tool, function_name, function_args)
-                
-                # Generate event after tool call
-                yield ToolEvent(
-                    status=ToolStatus.CALLED,
-                    tool_call_id=tool_call_id,
-                    tool_name=tool.name,
-                    function_name=function_name,
-                    function_args=function_args,
-                    function_result=result
-                )
-
-                tool_response = {
-                    "role": "tool",
-                    "function_name": function_name,
-                    "tool_call_id": tool_call_id,
-                    "content": result.model_dump_json()
-                }
-                tool_responses.append(tool_response)
+                # Generate events after tool calls, in the same order
+                for (tool, function_name, tool_call_id, function_args), result in zip(batch, results):
+                    yield ToolEvent(
+                        status=ToolStatus.CALLED,
+                        tool_call_id=tool_call_id,
+                        tool_name=tool.name,
+                        function_name=function_name,
+                        function_args=function_args,
+                        function_result=result
+                    )
+
+                    tool_response = {
+                        "role": "tool",
+                        "function_name": function_name,
+                        "tool_call_id": tool_call_id,
+                        "content": result.model_dump_json()
+                    }
+                    tool_responses.append(tool_response)
 
-            message = await self.ask_with_messages(tool_responses)
+            async for item in self.ask_with_messages_stream(tool_responses, format, response_schema):
+                if isinstance(item, BaseEvent):
+                    yield item
+                else:
+                    message = item
         else:
             yield ErrorEvent(error="Maximum iteration count reached, failed to complete the task")
         
@@ -153,7 +257,37 @@ class BaseAgent(ABC):
         self.memory.roll_back()
         await self._repository.save_memory(self._agent_id, self.name, self.memory)
 
-    async def ask_with_messages(self, messages: List[Dict[str, Any]], format: Optional[str] = None) -> Dict[str, Any]:
+    async def parse_response(self, text: str, model: Type[ResponseModel]) -> ResponseModel:
+        """Parse a JSON response into a model, repairing it only if it is not valid JSON"""
+        try:
+            return model.model_validate_json(text)
+        except ValidationError:
+            return model.model_validate(await self.json_parser.parse(text))
+
+    async def ask_with_messages(
+        self,
+        messages: List[Dict[str, Any]],
+        format: Optional[str] = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> Dict[str, Any]:
+        async for item in self.ask_with_messages_stream(messages, format, response_schema):
+            if not isinstance(item, BaseEvent):
+                return item
+
+    async def ask_with_messages_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        format: Optional[str] = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> AsyncGenerator[Union[MessageDeltaEvent, Dict[str, Any]], None]:
+        """Ask the LLM, yielding MessageDeltaEvent while the answer streams in and the
+        assistant message as the last item
+
+        Args:
+            messages: Messages to add to memory before asking
+            format: Response format type, like "json_object"
+            response_schema: Schema of JSON answers, which the LLM enforces when it can
+        """
         await self._add_to_memory(messages)
 
         response_format = None
@@ -161,10 +295,24 @@ class BaseAgent(ABC):
             response_format = {"type": format}
         
         for _ in range(self.max_retries):
-            message = await self.llm.ask(self.memory.get_messages(), 
-                                            tools=self.get_available_tools(), 
-                                            response_format=response_format,
-                                            tool_choice=self.tool_choice)
+            tools = self.get_available_tools()
+            context = await self.context.build(self.memory.get_messages(), tools)
+            if self.llm.stream:
+                message = None
+                async for item in self._stream_llm(context, tools, response_format, format, response_schema):
+                    if isinstance(item, BaseEvent):
+                        yield item
+                    else:
+                        message = item
+            else:
+                message = await self.llm.ask(context, 
+                                                tools=tools, 
+                                                response_format=response_format,
+                                                tool_choice=self.tool_choice,
+                                                response_schema=response_schema)
+
+            # Token counts are not part of the conversation, keep them out of memory
+            await self._record_usage(message.pop("usage", None))
 
             filtered_message = {}
             if message.get("role") == "assistant":
@@ -180,21 +328,84 @@ class BaseAgent(ABC):
                     "content": message.get("content"),
                 }
                 if message.get("tool_calls"):
-                    filtered_message["tool_calls"] = message.get("tool_calls")[:1]
+                    filtered_message["tool_calls"] = self._select_tool_calls(message.get("tool_calls"))
             else:
                 logger.warning(f"Unknown message role: {message.get('role')}")
                 filtered_message = message
             
             await self._add_to_memory([filtered_message])
-            return filtered_message
+            yield filtered_message
+            return
         raise Exception(f"Empty response from LLM after {self.max_retries} retries")
 
-    async def ask(self, request: str, format: Optional[str] = None) -> Dict[str, Any]:
+    async def _record_usage(self, usage: Optional[Dict[str, int]]) -> None:
+        """Add the token counts of an LLM response to the agent's totals"""
+        if not usage:
+            return
+        request_usage = TokenUsage(requests=1, **usage)
+        self.usage.add(request_usage)
+        logger.info(
+            f"Agent {self._agent_id} {self.name}: {request_usage.prompt_tokens} prompt tokens, "
+            f"{request_usage.cached_tokens} cached ({request_usage.cache_hit_rate:.0%}), "
+            f"session cache hit rate {self.usage.cache_hit_rate:.0%}"
+        )
+        try:
+            await self._repository.add_usage(self._agent_id, self.name, request_usage)
+        except Exception as e:
+            logger.warning(f"Failed to record token usage of agent {self._agent_id}: {e}")
+
+    async def _stream_llm(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]],
+        response_format: Optional[Dict[str, Any]],
+        format: Optional[str],
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> AsyncGenerator[Union[MessageDeltaEvent, Dict[str, Any]], None]:
+        """Stream one LLM call, batching the user-facing text into MessageDeltaEvent"""
+        # JSON answers only show their user-facing field, plain answers are shown as is
+        streamer = JsonStringFieldStreamer(self.stream_fields if format else None)
+        pending = ""
+        last_flush = time.monotonic()
+        async for chunk in self.llm.ask_stream(messages,
+                                               tools=tools,
+                                               response_format=response_format,
+                                               tool_choice=self.tool_choice,
+                                               response_schema=response_schema):
+            if chunk.get("type") == "message":
+                if pending:
+                    yield MessageDeltaEvent(delta=pending)
+                yield chunk["message"]
+                return
+            pending += streamer.feed(chunk.get("content") or "")
+            if pending and time.monotonic() - last_flush >= STREAM_FLUSH_INTERVAL:
+                yield MessageDeltaEvent(delta=pending)
+                pending = ""
+                last_flush = time.monotonic()
+
+    async def ask(
+        self,
+        request: str,
+        format: Optional[str] = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> Dict[str, Any]:
         return await self.ask_with_messages([
             {
                 "role": "user", "content": request
             }
-        ], format)
+        ], format, response_schema)
+
+    def ask_stream(
+        self,
+        request: str,
+        format: Optional[str] = None,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> AsyncGenerator[Union[MessageDeltaEvent, Dict[str, Any]], None]:
+        return self.ask_with_messages_stream([
+            {
+                "role": "user", "content": request
+            }
+        ], format, response_schema)
     
     async def roll_back(self, message: Message):
         await self._ensure_memory()
@@ -219,5 +430,5 @@ class BaseAgent(ABC):
     
     async def compact_memory(self) -> None:
         await self._ensure_memory()
-        self.memory.compact()
+        self.memory.compact(append_only=self.llm.prompt_cache)
         await self._repository.save_memory(self._agent_id, self.name, self.memory)
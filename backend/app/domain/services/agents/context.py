@@ -0,0 +1,261 @@
+import json
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional
+from pydantic import BaseModel
+from app.domain.external.llm import LLM
+from app.domain.utils.token_counter import TokenCounter, CHARS_PER_TOKEN
+from app.domain.services.prompts.context import (
+    SUMMARIZE_CONTEXT_PROMPT,
+    CONTEXT_SUMMARY_PREFIX,
+    TRUNCATED_OUTPUT_MARKER,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ContextUsage(BaseModel):
+    """Token counts of one LLM request"""
+    budget: int
+    tool_tokens: int
+    original_tokens: int
+    tokens: int
+    original_messages: int
+    messages: int
+    strategies: List[str] = []
+
+
+def group_turns(messages: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Group messages so an assistant message with tool calls stays together with its tool results"""
+    groups: List[List[Dict[str, Any]]] = []
+    for message in messages:
+        if message.get("role") == "tool" and groups and (
+            groups[-1][0].get("tool_calls") or groups[-1][0].get("role") == "tool"
+        ):
+            groups[-1].append(message)
+        else:
+            groups.append([message])
+    return groups
+
+
+def _is_tool_turn(group: List[Dict[str, Any]]) -> bool:
+    return bool(group[0].get("tool_calls")) or group[0].get("role") == "tool"
+
+
+def _split_system(messages: List[Dict[str, Any]]):
+    if messages and messages[0].get("role") == "system":
+        return messages[:1], messages[1:]
+    return [], messages
+
+
+class ContextStrategy(ABC):
+    """A way to shrink the messages sent to the LLM.
+
+    Strategies get a copy of the message list and must not modify the message dicts
+    in place, since those belong to the agent's memory.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    async def apply(self, messages: List[Dict[str, Any]], budget: int, counter: TokenCounter) -> List[Dict[str, Any]]:
+        """Return the messages reduced towards the token budget"""
+        ...
+
+
+class TruncateToolOutputStrategy(ContextStrategy):
+    """Shorten large tool results, oldest first, keeping their beginning and end"""
+
+    name = "truncate_tool_output"
+
+    def __init__(self, max_tokens: int = 2000):
+        self._max_tokens = max_tokens
+
+    def _truncate(self, content: str) -> str:
+        keep = self._max_tokens * CHARS_PER_TOKEN
+        omitted = len(content) - keep
+        if omitted <= 0:
+            return content
+        head = keep * 3 // 4
+        return content[:head] + TRUNCATED_OUTPUT_MARKER.format(omitted=omitted) + content[head - keep:]
+
+    async def apply(self, messages: List[Dict[str, Any]], budget: int, counter: TokenCounter) -> List[Dict[str, Any]]:
+        tokens = counter.count_messages(messages)
+        for index, message in enumerate(messages):
+            if tokens <= budget:
+                break
+            content = message.get("content")
+            if message.get("role") != "tool" or not isinstance(content, str):
+                continue
+            if counter.count_text(content) <= self._max_tokens:
+                continue
+            truncated = {**message, "content": self._truncate(content)}
+            tokens -= counter.count_message(message) - counter.count_message(truncated)
+            messages[index] = truncated
+        return messages
+
+
+class DropToolPairsStrategy(ContextStrategy):
+    """Drop the oldest tool calls together with their results, keeping the recent turns"""
+
+    name = "drop_tool_pairs"
+
+    def __init__(self, keep_recent: int = 6):
+        self._keep_recent = keep_recent
+
+    async def apply(self, messages: List[Dict[str, Any]], budget: int, counter: TokenCounter) -> List[Dict[str, Any]]:
+        system, rest = _split_system(messages)
+        groups = group_turns(rest)
+        tokens = counter.count_messages(messages)
+        droppable = max(len(groups) - self._keep_recent, 0)
+        kept = []
+        for index, group in enumerate(groups):
+            if tokens > budget and index < droppable and _is_tool_turn(group):
+                tokens -= counter.count_messages(group)
+                continue
+            kept.extend(group)
+        return system + kept
+
+
+class SummarizeStrategy(ContextStrategy):
+    """Replace the older turns with an LLM-written summary.
+
+    The last summary is reused, and extended with the turns added since, while the
+    summarized messages stay unchanged, so a long session does not pay for a full
+    summary on every request.
+    """
+
+    name = "summarize"
+
+    # Characters of each message included in the text to summarize
+    MAX_MESSAGE_CHARS = 4000
+
+    def __init__(self, llm: LLM, keep_recent: int = 4):
+        self._llm = llm
+        self._keep_recent = keep_recent
+        self._summary: Optional[str] = None
+        self._summarized: List[str] = []
+
+    @staticmethod
+    def _fingerprint(message: Dict[str, Any]) -> str:
+        return hashlib.sha1(json.dumps(message, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+    def _render(self, messages: List[Dict[str, Any]]) -> str:
+        lines = []
+        for message in messages:
+            content = message.get("content") or ""
+            if not isinstance(content, str):
+                content = json.dumps(content, ensure_ascii=False)
+            if message.get("tool_calls"):
+                content += "\n" + json.dumps([call.get("function") for call in message["tool_calls"]], ensure_ascii=False)
+            role = message.get("function_name") or message.get("role")
+            lines.append(f"[{role}]\n{content[:self.MAX_MESSAGE_CHARS]}")
+        return "\n\n".join(lines)
+
+    async def apply(self, messages: List[Dict[str, Any]], budget: int, counter: TokenCounter) -> List[Dict[str, Any]]:
+        system, rest = _split_system(messages)
+        groups = group_turns(rest)
+        if len(groups) <= self._keep_recent:
+            return messages
+        old = [message for group in groups[:-self._keep_recent] for message in group]
+        recent = [message for group in groups[-self._keep_recent:] for message in group]
+        fingerprints = [self._fingerprint(message) for message in old]
+
+        previous = len(self._summarized)
+        if self._summary and fingerprints[:previous] == self._summarized:
+            new = old[previous:]
+            if new:
+                text = f"{CONTEXT_SUMMARY_PREFIX}{self._summary}\n\n{self._render(new)}"
+            else:
+                text = None
+        else:
+            text = self._render(old)
+
+        if text:
+            try:
+                response = await self._llm.ask([
+                    {"role": "system", "content": SUMMARIZE_CONTEXT_PROMPT},
+                    {"role": "user", "content": text},
+                ])
+            except Exception as e:
+                logger.warning(f"Failed to summarize {len(old)} messages: {e}")
+                return messages
+            summary = response.get("content")
+            if not summary:
+                return messages
+            self._summary = summary
+            self._summarized = fingerprints
+            logger.info(f"Summarized {len(old)} messages into {counter.count_text(summary)} tokens")
+
+        return system + self._with_summary(CONTEXT_SUMMARY_PREFIX + self._summary, recent)
+
+    @staticmethod
+    def _with_summary(summary: str, recent: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Put the summary before the recent messages, merged into a leading user message"""
+        # Some providers reject two user messages in a row
+        first = recent[0] if recent else None
+        if not first or first.get("role") != "user":
+            return [{"role": "user", "content": summary}] + recent
+        content = first.get("content")
+        if isinstance(content, list):
+            merged = [{"type": "text", "text": summary}] + content
+        else:
+            merged = f"{summary}\n\n{content or ''}"
+        return [{**first, "content": merged}] + recent[1:]
+
+
+class ContextManager:
+    """Fits an agent's memory into the model's context window.
+
+    The full memory is kept as is, only the messages sent with each request are
+    reduced. When they do not fit the budget, the strategies run in order, cheapest
+    first, until the request fits.
+    """
+
+    def __init__(self, llm: LLM, strategies: List[ContextStrategy]):
+        self._llm = llm
+        self._strategies = strategies
+        self._counter = TokenCounter(llm.model_name)
+        self.last_usage: Optional[ContextUsage] = None
+
+    @property
+    def counter(self) -> TokenCounter:
+        return self._counter
+
+    async def build(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get the messages to send, reduced to fit the context window"""
+        tool_tokens = self._counter.count_tools(tools)
+        budget = self._llm.context_window - self._llm.max_tokens - tool_tokens
+        original_tokens = tokens = self._counter.count_messages(messages)
+        context = list(messages)
+        applied = []
+        for strategy in self._strategies:
+            if tokens <= budget:
+                break
+            context = await strategy.apply(list(context), budget, self._counter)
+            reduced = self._counter.count_messages(context)
+            if reduced < tokens:
+                applied.append(strategy.name)
+            tokens = reduced
+        if tokens > budget:
+            logger.warning(f"Context of {tokens} tokens exceeds the budget of {budget} tokens after {applied}")
+
+        self.last_usage = ContextUsage(
+            budget=budget,
+            tool_tokens=tool_tokens,
+            original_tokens=original_tokens,
+            tokens=tokens,
+            original_messages=len(messages),
+            messages=len(context),
+            strategies=applied,
+        )
+        logger.info(
+            f"LLM request context: {tokens} tokens in {len(context)} messages + {tool_tokens} tool tokens, "
+            f"budget {budget}" + (f", reduced from {original_tokens} tokens by {applied}" if applied else "")
+        )
+        return context
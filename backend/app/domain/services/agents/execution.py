@@ -2,6 +2,7 @@ from typing import AsyncGenerator, Optional, List
 from app.domain.models.plan import Plan, Step, ExecutionStatus
 from app.domain.models.file import FileInfo
 from app.domain.models.message import Message
+from app.domain.models.agent_response import StepResultResponse, SummaryResponse
 from app.domain.services.agents.base import BaseAgent
 from app.domain.external.llm import LLM
 from app.domain.external.sandbox import Sandbox
@@ -68,15 +69,14 @@ class ExecutionAgent(BaseAgent):
         )
         step.status = ExecutionStatus.RUNNING
         yield StepEvent(status=StepStatus.STARTED, step=step)
-        async for event in self.execute(message):
+        async for event in self.execute(message, response_schema=StepResultResponse):
             if isinstance(event, ErrorEvent):
                 step.status = ExecutionStatus.FAILED
                 step.error = event.error
                 yield StepEvent(status=StepStatus.FAILED, step=step)
             elif isinstance(event, MessageEvent):
                 step.status = ExecutionStatus.COMPLETED
-                parsed_response = await self.json_parser.parse(event.message)
-                new_step = Step.model_validate(parsed_response)
+                new_step = await self.parse_response(event.message, Step)
                 step.success = new_step.success
                 step.result = new_step.result
                 step.attachments = new_step.attachments
@@ -97,11 +97,10 @@ class ExecutionAgent(BaseAgent):
 
     async def summarize(self) -> AsyncGenerator[BaseEvent, None]:
         message = SUMMARIZE_PROMPT
-        async for event in self.execute(message):
+        async for event in self.execute(message, response_schema=SummaryResponse):
             if isinstance(event, MessageEvent):
                 logger.debug(f"Execution agent summary: {event.message}")
-                parsed_response = await self.json_parser.parse(event.message)
-                message = Message.model_validate(parsed_response)
+                message = await self.parse_response(event.message, Message)
                 attachments = [FileInfo(file_path=file_path) for file_path in message.attachments]
                 yield MessageEvent(message=message.message, attachments=attachments)
                 continue
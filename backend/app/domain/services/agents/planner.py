@@ -3,6 +3,7 @@ import json
 import logging
 from app.domain.models.plan import Plan, Step
 from app.domain.models.message import Message
+from app.domain.models.agent_response import CreatePlanResponse, UpdatePlanResponse
 from app.domain.services.agents.base import BaseAgent
 from app.domain.models.memory import Memory
 from app.domain.external.llm import LLM
@@ -61,22 +62,20 @@ class PlannerAgent(BaseAgent):
             message=message.message,
             attachments="\n".join(message.attachments)
         )
-        async for event in self.execute(message):
+        async for event in self.execute(message, response_schema=CreatePlanResponse):
             if isinstance(event, MessageEvent):
                 logger.info(event.message)
-                parsed_response = await self.json_parser.parse(event.message)
-                plan = Plan.model_validate(parsed_response)
+                plan = await self.parse_response(event.message, Plan)
                 yield PlanEvent(status=PlanStatus.CREATED, plan=plan)
             else:
                 yield event
 
     async def update_plan(self, plan: Plan, step: Step) -> AsyncGenerator[BaseEvent, None]:
         message = UPDATE_PLAN_PROMPT.format(plan=plan.dump_json(), step=step.model_dump_json())
-        async for event in self.execute(message):
+        async for event in self.execute(message, response_schema=UpdatePlanResponse):
             if isinstance(event, MessageEvent):
                 logger.debug(f"Planner agent update plan: {event.message}")
-                parsed_response = await self.json_parser.parse(event.message)
-                updated_plan = Plan.model_validate(parsed_response)
+                updated_plan = await self.parse_response(event.message, Plan)
                 new_steps = [Step.model_validate(step) for step in updated_plan.steps]
                 
                 # Find the index of the first pending step
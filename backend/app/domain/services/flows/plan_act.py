@@ -118,7 +118,8 @@ class PlanActFlow(BaseFlow):
             self.status = AgentStatus.EXECUTING
 
         await self._session_repository.update_status(self._session_id, SessionStatus.RUNNING)  
-        self.plan = session.get_last_plan()
+        last_plan_event = await self._session_repository.get_latest_event(self._session_id, "plan")
+        self.plan = last_plan_event.plan if last_plan_event else None
 
         logger.info(f"Agent {self._agent_id} started processing message: {message.message[:50]}...")
         step = None
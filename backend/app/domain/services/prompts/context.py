@@ -0,0 +1,15 @@
+# Context window prompts
+SUMMARIZE_CONTEXT_PROMPT = """
+You are compressing the earlier part of a conversation between a user and an AI agent that uses tools.
+Write a concise summary that the agent can continue working from:
+- Keep the user's requests, decisions, constraints and the working language
+- Keep facts found, files created or changed, URLs and commands that matter for the remaining work
+- Keep what has been completed and what is still pending
+- Leave out greetings, repetition and raw tool output that is no longer needed
+
+Return only the summary in plain text.
+"""
+
+CONTEXT_SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+TRUNCATED_OUTPUT_MARKER = "\n...[{omitted} characters omitted]...\n"
@@ -1,4 +1,4 @@
-from typing import Dict, Any, List, Callable
+from typing import Dict, Any, List, Callable, FrozenSet, NamedTuple, Optional, Tuple
 import inspect
 from app.domain.models.tool_result import ToolResult
 
@@ -6,7 +6,8 @@ def tool(
     name: str, 
     description: str,
     parameters: Dict[str, Dict[str, Any]],
-    required: List[str]
+    required: List[str],
+    read_only: bool = False
 ) -> Callable:
     """Tool registration decorator
     
@@ -15,6 +16,7 @@ def tool(
         description: Tool description
         parameters: Tool parameter definitions
         required: List of required parameters
+        read_only: Whether the tool changes nothing, so it can run concurrently with other read-only calls
         
     Returns:
         Decorator function
@@ -38,19 +40,75 @@ def tool(
         func._function_name = name
         func._tool_description = description
         func._tool_schema = schema
+        func._read_only = read_only
         
         return func
     
     return decorator
 
+class ToolFunction(NamedTuple):
+    """A registered tool function and the parameters it accepts"""
+    attribute: str
+    parameters: FrozenSet[str]
+    schema: Dict[str, Any]
+    read_only: bool
+
+
 class BaseTool:
-    """Base tool class, providing common tool calling methods"""
+    """Base tool class, providing common tool calling methods
+    
+    Tool functions are looked up once per class, so dispatch is a dict lookup. Tools
+    whose functions change at runtime call invalidate_tools() to refresh the caches,
+    including the ones agents keep of their tools.
+    """
 
     name: str = ""
     
+    # Tool functions by name, per tool class
+    _class_functions: Dict[type, Dict[str, ToolFunction]] = {}
+    
     def __init__(self):
         """Initialize base tool class"""
         self._tools_cache = None
+        self._methods_cache: Optional[Dict[str, Tuple[Callable, FrozenSet[str]]]] = None
+        self._version = 0
+    
+    @classmethod
+    def _get_class_functions(cls) -> Dict[str, ToolFunction]:
+        """Get the tool functions declared on this class, found once per class"""
+        functions = BaseTool._class_functions.get(cls)
+        if functions is None:
+            functions = {}
+            for attribute, function in inspect.getmembers(cls, inspect.isfunction):
+                if hasattr(function, '_function_name'):
+                    parameters = frozenset(
+                        name for name in inspect.signature(function).parameters if name != "self"
+                    )
+                    functions[function._function_name] = ToolFunction(
+                        attribute, parameters, function._tool_schema, function._read_only
+                    )
+            BaseTool._class_functions[cls] = functions
+        return functions
+    
+    def _get_methods(self) -> Dict[str, Tuple[Callable, FrozenSet[str]]]:
+        """Get the bound tool methods and their accepted parameters by function name"""
+        if self._methods_cache is None:
+            self._methods_cache = {
+                function_name: (getattr(self, function.attribute), function.parameters)
+                for function_name, function in self._get_class_functions().items()
+            }
+        return self._methods_cache
+    
+    @property
+    def version(self) -> int:
+        """Incremented whenever the tool's functions change"""
+        return self._version
+    
+    def invalidate_tools(self) -> None:
+        """Drop cached tool definitions after the tool's functions changed"""
+        self._tools_cache = None
+        self._methods_cache = None
+        self._version += 1
     
     def get_tools(self) -> List[Dict[str, Any]]:
         """Get all registered tools
@@ -61,13 +119,8 @@ class BaseTool:
         if self._tools_cache is not None:
             return self._tools_cache
         
-        tools = []
-        for _, method in inspect.getmembers(self, inspect.ismethod):
-            if hasattr(method, '_tool_schema'):
-                tools.append(method._tool_schema)
-        
-        self._tools_cache = tools
-        return tools
+        self._tools_cache = [function.schema for function in self._get_class_functions().values()]
+        return self._tools_cache
     
     def has_function(self, function_name: str) -> bool:
         """Check if specified function exists
@@ -78,31 +131,31 @@ class BaseTool:
         Returns:
             Whether the tool exists
         """
-        for _, method in inspect.getmembers(self, inspect.ismethod):
-            if hasattr(method, '_function_name') and method._function_name == function_name:
-                return True
-        return False
+        return function_name in self._get_class_functions()
     
-    def _filter_parameters(self, method: Callable, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    def is_read_only(self, function_name: str) -> bool:
+        """Check if specified function only reads state and can run concurrently
+        
+        Args:
+            function_name: Function name
+            
+        Returns:
+            Whether the function is read-only
+        """
+        function = self._get_class_functions().get(function_name)
+        return function is not None and function.read_only
+    
+    def _filter_parameters(self, parameters: FrozenSet[str], kwargs: Dict[str, Any]) -> Dict[str, Any]:
         """Filter parameters to match method signature
         
         Args:
-            method: Target method
+            parameters: Names of the parameters the method accepts
             kwargs: Input parameters
             
         Returns:
             Filtered parameters that match the method signature
         """
-        # Get method signature
-        sig = inspect.signature(method)
-        
-        # Filter kwargs to only include parameters that the method accepts
-        filtered_kwargs = {}
-        for param_name, param_value in kwargs.items():
-            if param_name in sig.parameters:
-                filtered_kwargs[param_name] = param_value
-        
-        return filtered_kwargs
+        return {name: value for name, value in kwargs.items() if name in parameters}
     
     async def invoke_function(self, function_name: str, **kwargs) -> ToolResult:
         """Invoke specified tool
@@ -117,10 +170,9 @@ class BaseTool:
         Raises:
             ValueError: Raised when tool doesn't exist
         """
-        for _, method in inspect.getmembers(self, inspect.ismethod):
-            if hasattr(method, '_function_name') and method._function_name == function_name:
-                # Filter parameters to match method signature
-                filtered_kwargs = self._filter_parameters(method, kwargs)
-                return await method(**filtered_kwargs)
-        
-        raise ValueError(f"Tool '{function_name}' not found") 
\ No newline at end of file
+        entry = self._get_methods().get(function_name)
+        if entry is None:
+            raise ValueError(f"Tool '{function_name}' not found")
+        method, parameters = entry
+        # Filter parameters to match method signature
+        return await method(**self._filter_parameters(parameters, kwargs))
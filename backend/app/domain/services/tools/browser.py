@@ -20,16 +20,26 @@ class BrowserTool(BaseTool):
     @tool(
         name="browser_view",
         description="View content of the current browser page. Use for checking the latest state of previously opened pages.",
-        parameters={},
-        required=[]
+        parameters={
+            "mode": {
+                "type": "string",
+                "enum": ["extract", "accessibility"],
+                "description": "(Optional) \"accessibility\" quickly outlines the page structure with roles, labels, values and element indices. \"extract\" returns the page content rewritten as Markdown, slower but better for reading text. Defaults to the configured mode."
+            }
+        },
+        required=[],
+        read_only=True
     )
-    async def browser_view(self) -> ToolResult:
+    async def browser_view(self, mode: Optional[str] = None) -> ToolResult:
         """View current browser page content
         
+        Args:
+            mode: (Optional) "extract" or "accessibility"
+            
         Returns:
             Browser page content
         """
-        return await self.browser.view_page()
+        return await self.browser.view_page(mode)
     
     @tool(
         name="browser_navigate",
@@ -332,7 +342,8 @@ class BrowserTool(BaseTool):
                 "description": "(Optional) Maximum number of log lines to return."
             }
         },
-        required=[]
+        required=[],
+        read_only=True
     )
     async def browser_console_view(
         self,
@@ -516,7 +527,8 @@ class BrowserTool(BaseTool):
                 "description": "Index number of the element to get bounds for"
             }
         },
-        required=["index"]
+        required=["index"],
+        read_only=True
     )
     async def browser_get_element_bounds(
         self,
@@ -468,7 +468,8 @@ class ExposeTool(BaseTool):
         name="list_exposed_ports",
         description="List all currently exposed ports and their public URLs",
         parameters={},
-        required=[]
+        required=[],
+        read_only=True
     )
     async def list_exposed_ports(self) -> ToolResult:
         """List all exposed ports and their public URLs
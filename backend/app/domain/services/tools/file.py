@@ -38,7 +38,8 @@ class FileTool(BaseTool):
                 "description": "(Optional) Whether to use sudo privileges"
             }
         },
-        required=["file"]
+        required=["file"],
+        read_only=True
     )
     async def file_read(
         self,
@@ -202,7 +203,8 @@ class FileTool(BaseTool):
                 "description": "(Optional) Whether to use sudo privileges"
             }
         },
-        required=["file", "regex"]
+        required=["file", "regex"],
+        read_only=True
     )
     async def file_find_in_content(
         self,
@@ -240,7 +242,8 @@ class FileTool(BaseTool):
                 "description": "Filename pattern using glob syntax wildcards"
             }
         },
-        required=["path", "glob"]
+        required=["path", "glob"],
+        read_only=True
     )
     async def file_find_by_name(
         self,
@@ -1,6 +1,6 @@
 import os
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 from contextlib import AsyncExitStack
 
 from mcp import ClientSession, StdioServerParameters
@@ -23,6 +23,7 @@ class MCPClientManager:
         self._clients: Dict[str, ClientSession] = {}
         self._exit_stack = AsyncExitStack()
         self._tools_cache: Dict[str, List[MCPTool]] = {}
+        self._read_only_tools: Set[str] = set()
         self._initialized = False
         self._config = config
     
@@ -240,8 +241,16 @@ class MCPClientManager:
                     }
                 }
                 all_tools.append(tool_schema)
+                # 服务器声明为只读的工具可以并行调用
+                annotations = getattr(tool, "annotations", None)
+                if annotations and getattr(annotations, "readOnlyHint", False):
+                    self._read_only_tools.add(tool_name)
         
         return all_tools
+
+    def is_read_only(self, tool_name: str) -> bool:
+        """检查工具是否被服务器声明为只读"""
+        return tool_name in self._read_only_tools
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
         """调用 MCP 工具"""
@@ -321,26 +330,33 @@ class MCPTool(BaseTool):
         super().__init__()
         self._initialized = False
         self._tools = []
+        self._function_names = set()
     
     async def initialized(self, config: Optional[MCPConfig] = None):
         """确保管理器已初始化"""
         if not self._initialized:
             self.manager = MCPClientManager(config)
             await self.manager.initialize()
-            self._tools = await self.manager.get_all_tools()
+            await self.refresh_tools()
             self._initialized = True
 
+    async def refresh_tools(self):
+        """重新获取 MCP 服务器的工具列表"""
+        self._tools = await self.manager.get_all_tools()
+        self._function_names = {tool['function']['name'] for tool in self._tools}
+        self.invalidate_tools()
+
     def get_tools(self) -> List[Dict[str, Any]]:
         """获取同步工具定义（基础工具）"""
         return self._tools
 
     def has_function(self, function_name: str) -> bool:
         """检查指定函数是否存在（包括动态 MCP 工具）"""
-        # 检查是否是 MCP 工具
-        for tool in self._tools:
-            if tool['function']['name'] == function_name:
-                return True
-        return False
+        return function_name in self._function_names
+
+    def is_read_only(self, function_name: str) -> bool:
+        """检查 MCP 工具是否只读"""
+        return function_name in self._function_names and self.manager.is_read_only(function_name)
     
     async def invoke_function(self, function_name: str, **kwargs) -> ToolResult:
         """调用工具函数"""
@@ -31,7 +31,8 @@ class SearchTool(BaseTool):
                 "description": "(Optional) Time range filter for search results."
             }
         },
-        required=["query"]
+        required=["query"],
+        read_only=True
     )
     async def info_search_web(
         self,
@@ -63,7 +63,8 @@ class ShellTool(BaseTool):
                 "description": "Unique identifier of the target shell session"
             }
         },
-        required=["id"]
+        required=["id"],
+        read_only=True
     )
     async def shell_view(self, id: str) -> ToolResult:
         """View Shell session content
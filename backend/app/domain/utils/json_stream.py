@@ -0,0 +1,87 @@
+import re
+from typing import Optional, Tuple
+
+# JSON string escapes other than \uXXXX
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JsonStringFieldStreamer:
+    """Incrementally decode a string field out of a JSON document streamed in chunks
+
+    Used to show the user-facing text of a JSON response (e.g. "message" or "result")
+    while the rest of the document is still being generated. Only the first matching
+    field is streamed.
+    """
+
+    def __init__(self, fields: Optional[Tuple[str, ...]] = None):
+        """
+        Args:
+            fields: Names of the fields to stream, None streams the text as is
+        """
+        self._pattern = re.compile(r'"(?:%s)"\s*:\s*"' % "|".join(map(re.escape, fields))) if fields else None
+        self._buffer = ""
+        self._pos: Optional[int] = None
+        self._done = False
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk of the document
+
+        Returns:
+            str: Newly decoded text of the field, empty if there is none yet
+        """
+        if self._pattern is None:
+            return chunk
+        if self._done:
+            return ""
+        self._buffer += chunk
+        if self._pos is None:
+            match = self._pattern.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        buffer = self._buffer
+        i = self._pos
+        decoded = []
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self._done = True
+                break
+            if char != '\\':
+                decoded.append(char)
+                i += 1
+                continue
+            # Wait for the rest of an escape sequence split across chunks
+            if i + 1 >= len(buffer):
+                break
+            escape = buffer[i + 1]
+            if escape == 'u':
+                if i + 6 > len(buffer):
+                    break
+                try:
+                    code = int(buffer[i + 2:i + 6], 16)
+                except ValueError:
+                    i += 6
+                    continue
+                # Characters outside the BMP come as a surrogate pair of two escapes
+                if 0xD800 <= code < 0xDC00:
+                    # Wait for the low surrogate unless the next text cannot be one
+                    if i + 12 > len(buffer) and '\\u'.startswith(buffer[i + 6:i + 8]):
+                        break
+                    if buffer[i + 6:i + 8] == '\\u':
+                        try:
+                            low = int(buffer[i + 8:i + 12], 16)
+                        except ValueError:
+                            low = 0
+                        if 0xDC00 <= low < 0xE000:
+                            decoded.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                            i += 12
+                            continue
+                decoded.append(chr(code))
+                i += 6
+                continue
+            decoded.append(_ESCAPES.get(escape, escape))
+            i += 2
+        self._pos = i
+        return "".join(decoded)
@@ -0,0 +1,62 @@
+import json
+import logging
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+# Tokens added by the chat format around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+# Rough characters per token when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=8)
+def _get_encoder(model_name: str) -> Optional[Callable[[str], List[int]]]:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        encoding = tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return encoding.encode
+
+
+class TokenCounter:
+    """Counts the tokens of chat messages and tool schemas.
+
+    Uses tiktoken when it is installed, otherwise estimates from the text length.
+    Counts are approximate for models that do not use an OpenAI tokenizer, which is
+    enough to keep a prompt within a budget with some headroom.
+    """
+
+    def __init__(self, model_name: str = ""):
+        self._encode = _get_encoder(model_name)
+
+    def count_text(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encode:
+            return len(self._encode(text))
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    def count_message(self, message: Dict[str, Any]) -> int:
+        tokens = MESSAGE_OVERHEAD_TOKENS
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += self.count_text(content)
+        elif content:
+            tokens += self.count_text(json.dumps(content, ensure_ascii=False))
+        if message.get("tool_calls"):
+            tokens += self.count_text(json.dumps(message["tool_calls"], ensure_ascii=False))
+        return tokens
+
+    def count_messages(self, messages: List[Dict[str, Any]]) -> int:
+        return sum(self.count_message(message) for message in messages)
+
+    def count_tools(self, tools: Optional[List[Dict[str, Any]]]) -> int:
+        if not tools:
+            return 0
+        return self.count_text(json.dumps(tools, ensure_ascii=False))
@@ -0,0 +1,109 @@
+import hashlib
+import logging
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.core.config import get_settings
+from app.infrastructure.storage.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "browser:extraction:"
+# Sorted set of cached keys scored by last access time, for LRU eviction
+LRU_KEY = "browser:extraction:lru"
+
+
+class PageExtractionCache:
+    """Redis cache of LLM page extractions, keyed by a hash of the visible page content.
+
+    Viewing a page whose visible content did not change, or revisiting it, reuses the
+    earlier extraction instead of calling the LLM again. Entries expire after the TTL
+    and the least recently used ones are evicted beyond the entry limit. Redis errors
+    count as misses, so extraction works without the cache.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self._redis = get_redis()
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._counts: Counter = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl_seconds > 0 and self._max_entries > 0
+
+    @staticmethod
+    def _key(page_content: str, model_name: str) -> str:
+        # Another model extracts differently
+        digest = hashlib.sha256(f"{model_name}\0{page_content}".encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}{digest}"
+
+    async def get(self, page_content: str, model_name: str) -> Optional[str]:
+        """Get the cached extraction of the visible page content"""
+        if not self.enabled:
+            return None
+        key = self._key(page_content, model_name)
+        try:
+            await self._redis.initialize()
+            client = self._redis.client
+            content = await client.getex(key, ex=self._ttl_seconds)
+            if content is None:
+                # Expired entries stay in the LRU set until now
+                await client.zrem(LRU_KEY, key)
+                self._counts["misses"] += 1
+                return None
+            await client.zadd(LRU_KEY, {key: time.time()})
+        except Exception as e:
+            logger.warning(f"Failed to read page extraction cache: {e}")
+            self._counts["errors"] += 1
+            self._counts["misses"] += 1
+            return None
+        self._counts["hits"] += 1
+        return content
+
+    async def set(self, page_content: str, model_name: str, content: str) -> None:
+        """Cache the extraction of the visible page content, evicting the least recently used entries"""
+        if not self.enabled or not content:
+            return
+        key = self._key(page_content, model_name)
+        try:
+            await self._redis.initialize()
+            client = self._redis.client
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.set(key, content, ex=self._ttl_seconds)
+                pipe.zadd(LRU_KEY, {key: time.time()})
+                pipe.zcard(LRU_KEY)
+                _, _, size = await pipe.execute()
+            if size > self._max_entries:
+                evicted = [member for member, _ in await client.zpopmin(LRU_KEY, size - self._max_entries)]
+                if evicted:
+                    await client.delete(*evicted)
+                    self._counts["evictions"] += len(evicted)
+        except Exception as e:
+            logger.warning(f"Failed to write page extraction cache: {e}")
+            self._counts["errors"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self._counts["hits"]
+        misses = self._counts["misses"]
+        total = hits + misses
+        return {
+            "enabled": self.enabled,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "evictions": self._counts["evictions"],
+            "errors": self._counts["errors"],
+        }
+
+
+@lru_cache()
+def get_page_extraction_cache() -> PageExtractionCache:
+    """Get the page extraction cache"""
+    settings = get_settings()
+    return PageExtractionCache(
+        ttl_seconds=settings.browser_extraction_cache_ttl_seconds,
+        max_entries=settings.browser_extraction_cache_max_entries,
+    )
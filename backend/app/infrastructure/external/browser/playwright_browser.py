@@ -1,8 +1,10 @@
-from typing import Dict, Any, Optional, List
-from playwright.async_api import async_playwright, Browser, Page
+from typing import Dict, Any, Optional, List, Tuple
+from playwright.async_api import Browser, Page
 import asyncio
-from markdownify import markdownify
-from app.infrastructure.external.llm.openai_llm import OpenAILLM
+import base64
+from app.domain.external.llm import LLM
+from app.infrastructure.external.browser.page_extraction_cache import PageExtractionCache
+from app.infrastructure.external.browser.playwright_driver import PlaywrightDriver
 from app.core.config import get_settings
 from app.domain.models.tool_result import ToolResult
 import logging
@@ -10,14 +12,188 @@ import logging
 # Set up logger for this module
 logger = logging.getLogger(__name__)
 
+# Characters of page text sent for extraction, further text is not collected
+PAGE_CONTENT_BUDGET = 50000
+
+# Walks the DOM once with a TreeWalker. Collects the visible text of the viewport as
+# deduplicated blocks, one per block-level element, and numbers the visible interactive
+# elements. Hidden subtrees are not entered. Text beyond the budget is skipped, while
+# interactive elements are indexed on the whole viewport.
+# Returns {blocks: [[tag, text], ...], elements: [{index, tag, text, selector}, ...], truncated}
+PAGE_SNAPSHOT_SCRIPT = r"""({budget, includeContent}) => {
+    const viewportHeight = window.innerHeight;
+    const viewportWidth = window.innerWidth;
+    const interactiveSelector = 'button, a, input, textarea, select, [role="button"], [tabindex]:not([tabindex="-1"])';
+    const skippedTags = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'svg', 'CANVAS', 'IFRAME']);
+
+    // Indices of an earlier walk must not match elements that are not listed anymore
+    for (const element of document.querySelectorAll('[data-manus-id]')) {
+        element.removeAttribute('data-manus-id');
+    }
+
+    // Visibility, nearest block-level ancestor and whitespace handling of visited elements
+    const info = new Map();
+    info.set(document.body, {visible: true, block: document.body, pre: false});
+
+    const blocks = [];
+    const seenBlocks = new Set();
+    const elements = [];
+    let used = 0;
+    let currentBlock = null;
+    let parts = [];
+
+    const emit = (tag, text) => {
+        if (!text || seenBlocks.has(text)) return;
+        seenBlocks.add(text);
+        blocks.push([tag, text]);
+    };
+
+    const flush = () => {
+        if (currentBlock) {
+            const pre = info.get(currentBlock).pre;
+            emit(currentBlock.tagName.toLowerCase(), pre ? parts.join('').replace(/^\n+|\s+$/g, '') : parts.join(' '));
+        }
+        currentBlock = null;
+        parts = [];
+    };
+
+    const getLabel = (element, stripValue) => {
+        if (element.id) {
+            const label = document.querySelector(`label[for="${CSS.escape(element.id)}"]`);
+            if (label) return label.innerText.trim();
+        }
+        // Look for parent label
+        const parentLabel = element.closest('label');
+        if (!parentLabel) return '';
+        const labelText = parentLabel.innerText.trim();
+        return stripValue ? labelText.replace(element.value, '').trim() : labelText;
+    };
+
+    const describe = (element, tagName) => {
+        let text = '';
+        if (element.value && ['input', 'textarea', 'select'].includes(tagName)) {
+            text = element.value;
+            if (tagName === 'input') {
+                const labelText = getLabel(element, true);
+                if (labelText) text = `[Label: ${labelText}] ${text}`;
+                if (element.placeholder) text = `${text} [Placeholder: ${element.placeholder}]`;
+            }
+        } else if (element.innerText) {
+            text = element.innerText.trim().replace(/\s+/g, ' ');
+        } else if (element.alt) { // For image buttons
+            text = element.alt;
+        } else if (element.title) { // For elements with title
+            text = element.title;
+        } else if (element.placeholder) { // For placeholder text
+            text = `[Placeholder: ${element.placeholder}]`;
+        } else if (element.type) { // For input type
+            text = `[${element.type}]`;
+            if (tagName === 'input') {
+                const labelText = getLabel(element, false);
+                if (labelText) text = `[Label: ${labelText}] ${text}`;
+                if (element.placeholder) text = `${text} [Placeholder: ${element.placeholder}]`;
+            }
+        } else {
+            text = '[No text]';
+        }
+        // Maximum limit on text length to keep it clear
+        return text.length > 100 ? text.substring(0, 97) + '...' : text;
+    };
+
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+        acceptNode(node) {
+            if (node.nodeType === Node.TEXT_NODE) {
+                const parentInfo = info.get(node.parentElement);
+                return includeContent && parentInfo && parentInfo.visible ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_SKIP;
+            }
+            if (skippedTags.has(node.tagName)) return NodeFilter.FILTER_REJECT;
+            const style = window.getComputedStyle(node);
+            // Nothing inside can show, while children of visibility: hidden still may
+            if (style.display === 'none' || style.opacity === '0') return NodeFilter.FILTER_REJECT;
+            const rect = node.getBoundingClientRect();
+            const visible = (
+                style.visibility !== 'hidden' &&
+                rect.width > 0 && rect.height > 0 &&
+                rect.bottom >= 0 && rect.top <= viewportHeight &&
+                rect.right >= 0 && rect.left <= viewportWidth
+            );
+            const parentInfo = info.get(node.parentElement) || info.get(document.body);
+            info.set(node, {
+                visible: visible,
+                block: style.display.startsWith('inline') ? parentInfo.block : node,
+                pre: style.whiteSpace.startsWith('pre'),
+            });
+            // Children of an element outside the viewport may still be positioned inside
+            return visible ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_SKIP;
+        }
+    });
+
+    let truncated = false;
+    let node;
+    while ((node = walker.nextNode())) {
+        if (node.nodeType === Node.TEXT_NODE) {
+            const parentInfo = info.get(node.parentElement);
+            const text = parentInfo.pre ? node.data : node.data.replace(/\s+/g, ' ').trim();
+            if (!text) continue;
+            if (used >= budget) {
+                truncated = true;
+                continue;
+            }
+            if (parentInfo.block !== currentBlock) {
+                flush();
+                currentBlock = parentInfo.block;
+            }
+            parts.push(text);
+            used += text.length;
+            continue;
+        }
+
+        const tagName = node.tagName.toLowerCase();
+        if (includeContent && tagName === 'img' && node.alt) {
+            if (used < budget) {
+                flush();
+                emit('img', node.alt.trim());
+                used += node.alt.length;
+            } else {
+                truncated = true;
+            }
+        }
+        if (node.matches(interactiveSelector)) {
+            const index = elements.length;
+            const text = describe(node, tagName);
+            node.setAttribute('data-manus-id', `manus-element-${index}`);
+            elements.push({
+                index: index,
+                tag: tagName,
+                text: text,
+                selector: `[data-manus-id="manus-element-${index}"]`
+            });
+        }
+    }
+    flush();
+    return {blocks: blocks, elements: elements, truncated: truncated};
+}"""
+
+# Accessibility roles listed through their children only, unless they are named or indexed
+TRANSPARENT_ROLES = {"generic", "none", "presentation", "LineBreak", "paragraph", "group"}
+# Accessibility node properties shown after the name
+SHOWN_PROPERTIES = ("level", "checked", "pressed", "selected", "expanded", "disabled", "required", "readonly")
+
 class PlaywrightBrowser:
     """Playwright client that provides specific implementation of browser operations"""
     
-    def __init__(self, cdp_url: str):
+    def __init__(
+        self,
+        cdp_url: str,
+        llm: LLM,
+        driver: PlaywrightDriver,
+        extraction_cache: Optional[PageExtractionCache] = None
+    ):
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
-        self.playwright = None
-        self.llm = OpenAILLM()
+        self.driver = driver
+        self.llm = llm
+        self.extraction_cache = extraction_cache
         self.settings = get_settings()
         self.cdp_url = cdp_url
         
@@ -28,9 +204,8 @@ class PlaywrightBrowser:
         retry_delay = 1  # Initial wait 1 second
         for attempt in range(max_retries):
             try:
-                self.playwright = await async_playwright().start()
-                # Connect to existing Chrome instance
-                self.browser = await self.playwright.chromium.connect_over_cdp(self.cdp_url)
+                # Connect to existing Chrome instance over the shared driver
+                self.browser = await self.driver.connect_over_cdp(self.cdp_url)
                 # Get all contexts
                 contexts = self.browser.contexts
                 if contexts and len(contexts[0].pages) == 1:
@@ -92,20 +267,21 @@ class PlaywrightBrowser:
             if self.browser:
                 await self.browser.close()
                 
-            # Stop playwright
-            if self.playwright:
-                await self.playwright.stop()
-                
         except Exception as e:
             logger.error(f"Error occurred when cleaning up resources: {e}")
         finally:
+            # Release the shared driver, stopped after its last connection
+            if self.browser:
+                await self.driver.release()
             # Reset references
             self.page = None
             self.browser = None
-            self.playwright = None
     
     async def _ensure_browser(self):
-        """Ensure the browser is started"""
+        """Ensure the browser is started, reconnecting if the connection was lost"""
+        if self.browser and not self.browser.is_connected():
+            logger.warning(f"Browser connection to {self.cdp_url} lost, reconnecting")
+            await self.cleanup()
         if not self.browser or not self.page:
             if not await self.initialize():
                 raise Exception("Unable to initialize browser resources")
@@ -161,248 +337,201 @@ class PlaywrightBrowser:
         # Timeout, page loading not completed
         return False
     
-    async def _extract_content(self) -> Dict[str, Any]:
-        """Extract content from the current page"""
-
-        # Execute JavaScript to get elements in the viewport    
-        visible_content = await self.page.evaluate("""() => {
-            const visibleElements = [];
-            const viewportHeight = window.innerHeight;
-            const viewportWidth = window.innerWidth;
-            
-            // Get all potentially relevant elements
-            const elements = document.querySelectorAll('body *');
-            
-            for (const element of elements) {
-                // Check if the element is in the viewport and visible
-                const rect = element.getBoundingClientRect();
-                
-                // Element must have some dimensions
-                if (rect.width === 0 || rect.height === 0) continue;
-                
-                // Element must be within the viewport
-                if (
-                    rect.bottom < 0 || 
-                    rect.top > viewportHeight ||
-                    rect.right < 0 || 
-                    rect.left > viewportWidth
-                ) continue;
-                
-                // Check if the element is visible (not hidden by CSS)
-                const style = window.getComputedStyle(element);
-                if (
-                    style.display === 'none' || 
-                    style.visibility === 'hidden' || 
-                    style.opacity === '0'
-                ) continue;
-                
-                // If it's a text node or meaningful element, add it to the results
-                if (
-                    element.innerText || 
-                    element.tagName === 'IMG' || 
-                    element.tagName === 'INPUT' || 
-                    element.tagName === 'BUTTON'
-                ) {
-                    visibleElements.push(element.outerHTML);
-                }
-            }
-            
-            // Build HTML containing these visible elements
-            return '<div>' + visibleElements.join('') + '</div>';
-        }""")
-
+    async def _snapshot_page(self, include_content: bool) -> Dict[str, Any]:
+        """Walk the page once for its visible text blocks and interactive elements"""
+        await self._ensure_page()
+        snapshot = await self.page.evaluate(PAGE_SNAPSHOT_SCRIPT, {
+            "budget": PAGE_CONTENT_BUDGET,
+            "includeContent": include_content,
+        })
+        if snapshot["truncated"]:
+            logger.debug(f"Page snapshot text cut at {PAGE_CONTENT_BUDGET} characters")
         
-        # Convert to Markdown
-        markdown_content = markdownify(visible_content)
+        # Update cache
+        self.page.interactive_elements_cache = snapshot["elements"]
+        return snapshot
+    
+    @staticmethod
+    def _format_blocks(blocks: List[List[str]]) -> str:
+        """Format the text blocks of a page snapshot as Markdown"""
+        lines = []
+        for tag, text in blocks:
+            if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+                lines.append(f"{'#' * int(tag[1])} {text}")
+            elif tag == "li":
+                lines.append(f"- {text}")
+            elif tag == "pre":
+                lines.append(f"```\n{text}\n```")
+            elif tag == "img":
+                lines.append(f"![{text}]")
+            else:
+                lines.append(text)
+        return "\n\n".join(lines)
+    
+    @staticmethod
+    def _format_interactive_elements(elements: List[Dict[str, Any]]) -> List[str]:
+        """Format interactive elements as index:<tag>text</tag>"""
+        return [f"{el['index']}:<{el['tag']}>{el['text']}</{el['tag']}>" for el in elements]
+    
+    async def _extract_content(self, blocks: List[List[str]]) -> str:
+        """Extract the information of the visible text blocks of the current page"""
+        page_content = self._format_blocks(blocks)[:PAGE_CONTENT_BUDGET]
 
-        max_content_length = min(50000, len(markdown_content))
+        # The same visible content was extracted before, on this page or another visit
+        if self.extraction_cache:
+            cached_content = await self.extraction_cache.get(page_content, self.llm.model_name)
+            if cached_content is not None:
+                logger.debug("Using cached page extraction")
+                return cached_content
+        
         response = await self.llm.ask([{
             "role": "system",
             "content": "You are a professional web page information extraction assistant. Please extract all information from the current page content and convert it to Markdown format."
         },
         {
             "role": "user",
-            "content": markdown_content[:max_content_length]
+            "content": page_content
         }
         ])
         
-        return response.get("content", "")
+        content = response.get("content", "")
+        if self.extraction_cache:
+            await self.extraction_cache.set(page_content, self.llm.model_name, content)
+        return content
+    
+    @staticmethod
+    def _format_accessibility_tree(nodes: List[Dict[str, Any]], indices: Dict[int, int]) -> Tuple[str, bool]:
+        """Format a CDP accessibility tree as an indented outline of roles, names and values
+        
+        Args:
+            nodes: Nodes of Accessibility.getFullAXTree, the root first
+            indices: Interactive element index by backend DOM node id
+            
+        Returns:
+            The outline, and whether it was cut at the content budget
+        """
+        if not nodes:
+            return "", False
+        by_id = {node["nodeId"]: node for node in nodes}
+        lines = []
+        used = 0
+        # (node, depth, name of the closest listed ancestor)
+        stack = [(nodes[0], 0, "")]
+        while stack:
+            node, depth, parent_name = stack.pop()
+            role = node.get("role", {}).get("value", "")
+            if role == "InlineTextBox":
+                continue
+            name = " ".join(str(node.get("name", {}).get("value", "")).split())
+            if len(name) > 100:
+                name = name[:97] + "..."
+            index = indices.get(node.get("backendDOMNodeId"))
+            listed = not node.get("ignored") and (role not in TRANSPARENT_ROLES or name or index is not None)
+            if listed and role == "StaticText":
+                # Text that only repeats the name of its link, button or heading
+                listed = bool(name) and name != parent_name
+                line = f"- text: {name}"
+            elif listed:
+                line = f"- {role}"
+                if name:
+                    line += f' "{name}"'
+                if index is not None:
+                    line += f" [{index}]"
+                for prop in node.get("properties", []):
+                    if prop["name"] not in SHOWN_PROPERTIES:
+                        continue
+                    value = prop.get("value", {}).get("value")
+                    if value is None or value is False or value == "false":
+                        continue
+                    line += f" [{prop['name']}]" if value is True or value == "true" else f" [{prop['name']}={value}]"
+                value = node.get("value", {}).get("value")
+                if value not in (None, ""):
+                    line += f": {value}"
+            if listed:
+                lines.append("  " * depth + line)
+                used += len(line) + 2 * depth + 1
+                if used >= PAGE_CONTENT_BUDGET:
+                    return "\n".join(lines), True
+            child_depth = depth + 1 if listed else depth
+            child_parent_name = name if listed else parent_name
+            for child_id in reversed(node.get("childIds", [])):
+                child = by_id.get(child_id)
+                if child:
+                    stack.append((child, child_depth, child_parent_name))
+        return "\n".join(lines), False
+    
+    async def _view_accessibility_tree(self) -> str:
+        """Outline the accessibility tree of the current page without an LLM call.
+        
+        Interactive elements carry the indices the last DOM walk wrote to their data-manus-id attribute.
+        """
+        cdp = await self.page.context.new_cdp_session(self.page)
+        try:
+            document = await cdp.send("DOM.getDocument", {"depth": 0})
+            indexed = await cdp.send("DOM.querySelectorAll", {
+                "nodeId": document["root"]["nodeId"],
+                "selector": "[data-manus-id]",
+            })
+            attributes = await asyncio.gather(*(
+                cdp.send("DOM.getAttributes", {"nodeId": node_id}) for node_id in indexed["nodeIds"]
+            ))
+            node_indices = {}
+            for node_id, result in zip(indexed["nodeIds"], attributes):
+                # Attributes come as a flat [name, value, ...] list
+                values = dict(zip(result["attributes"][::2], result["attributes"][1::2]))
+                index = values.get("data-manus-id", "").removeprefix("manus-element-")
+                if index.isdigit():
+                    node_indices[node_id] = int(index)
+            tree = await cdp.send("Accessibility.getFullAXTree")
+            nodes = tree.get("nodes", [])
+            backend_ids = [node["backendDOMNodeId"] for node in nodes if "backendDOMNodeId" in node]
+            pushed = await cdp.send("DOM.pushNodesByBackendIdsToFrontend", {"backendNodeIds": backend_ids})
+        finally:
+            await cdp.detach()
+        
+        indices = {
+            backend_id: node_indices[node_id]
+            for backend_id, node_id in zip(backend_ids, pushed["nodeIds"])
+            if node_id in node_indices
+        }
+        outline, truncated = self._format_accessibility_tree(nodes, indices)
+        if truncated:
+            logger.debug(f"Accessibility outline stopped at {PAGE_CONTENT_BUDGET} characters")
+        return outline
     
-    async def view_page(self) -> ToolResult:
-        """View visible elements within the current page's viewport and convert to Markdown format"""
+    async def view_page(self, mode: Optional[str] = None) -> ToolResult:
+        """View the current page, rewritten as Markdown by the LLM or outlined from its accessibility tree
+        
+        Args:
+            mode: "extract" or "accessibility", the configured view mode if None
+        """
+        mode = mode or self.settings.browser_view_mode
+        if mode not in ("extract", "accessibility"):
+            return ToolResult(success=False, message=f"Unknown view mode: {mode}")
         await self._ensure_page()
         
         # Wait for the page to load completely, maximum wait 15 seconds
         await self.wait_for_page_load()
         
-        # First update the interactive elements cache
-        interactive_elements = await self._extract_interactive_elements()
+        # One walk updates the interactive elements cache and collects the content
+        snapshot = await self._snapshot_page(include_content=mode == "extract")
+        if mode == "accessibility":
+            content = await self._view_accessibility_tree()
+        else:
+            content = await self._extract_content(snapshot["blocks"])
         
         return ToolResult(
             success=True,
             data={
-                "interactive_elements": interactive_elements,
-                "content": await self._extract_content(),
+                "interactive_elements": self._format_interactive_elements(snapshot["elements"]),
+                "content": content,
             }
         )
     
     async def _extract_interactive_elements(self) -> List[str]:
         """Return a list of visible interactive elements on the page, formatted as index:<tag>text</tag>"""
-        await self._ensure_page()
-        
-        # Clear the current page's cache to ensure we always get the latest list of elements
-        self.page.interactive_elements_cache = []
-        
-        # Execute JavaScript to get interactive elements in the viewport
-        interactive_elements = await self.page.evaluate("""() => {
-            const interactiveElements = [];
-            const viewportHeight = window.innerHeight;
-            const viewportWidth = window.innerWidth;
-            
-            // Get all potentially relevant interactive elements
-            const elements = document.querySelectorAll('button, a, input, textarea, select, [role="button"], [tabindex]:not([tabindex="-1"])');
-            
-            let validElementIndex = 0; // For generating consecutive indices
-            
-            for (let i = 0; i < elements.length; i++) {
-                const element = elements[i];
-                // Check if the element is in the viewport and visible
-                const rect = element.getBoundingClientRect();
-                
-                // Element must have some dimensions
-                if (rect.width === 0 || rect.height === 0) continue;
-                
-                // Element must be within the viewport
-                if (
-                    rect.bottom < 0 || 
-                    rect.top > viewportHeight ||
-                    rect.right < 0 || 
-                    rect.left > viewportWidth
-                ) continue;
-                
-                // Check if the element is visible (not hidden by CSS)
-                const style = window.getComputedStyle(element);
-                if (
-                    style.display === 'none' || 
-                    style.visibility === 'hidden' || 
-                    style.opacity === '0'
-                ) continue;
-                
-                
-                // Get element type and text
-                let tagName = element.tagName.toLowerCase();
-                let text = '';
-                
-                if (element.value && ['input', 'textarea', 'select'].includes(tagName)) {
-                    text = element.value;
-                    
-                    // Add label and placeholder information for input elements
-                    if (tagName === 'input') {
-                        // Get associated label text
-                        let labelText = '';
-                        if (element.id) {
-                            const label = document.querySelector(`label[for="${element.id}"]`);
-                            if (label) {
-                                labelText = label.innerText.trim();
-                            }
-                        }
-                        
-                        // Look for parent or sibling label
-                        if (!labelText) {
-                            const parentLabel = element.closest('label');
-                            if (parentLabel) {
-                                labelText = parentLabel.innerText.trim().replace(element.value, '').trim();
-                            }
-                        }
-                        
-                        // Add label information
-                        if (labelText) {
-                            text = `[Label: ${labelText}] ${text}`;
-                        }
-                        
-                        // Add placeholder information
-                        if (element.placeholder) {
-                            text = `${text} [Placeholder: ${element.placeholder}]`;
-                        }
-                    }
-                } else if (element.innerText) {
-                    text = element.innerText.trim().replace(/\\s+/g, ' ');
-                } else if (element.alt) { // For image buttons
-                    text = element.alt;
-                } else if (element.title) { // For elements with title
-                    text = element.title;
-                } else if (element.placeholder) { // For placeholder text
-                    text = `[Placeholder: ${element.placeholder}]`;
-                } else if (element.type) { // For input type
-                    text = `[${element.type}]`;
-                    
-                    // Add label and placeholder information for text-less input elements
-                    if (tagName === 'input') {
-                        // Get associated label text
-                        let labelText = '';
-                        if (element.id) {
-                            const label = document.querySelector(`label[for="${element.id}"]`);
-                            if (label) {
-                                labelText = label.innerText.trim();
-                            }
-                        }
-                        
-                        // Look for parent or sibling label
-                        if (!labelText) {
-                            const parentLabel = element.closest('label');
-                            if (parentLabel) {
-                                labelText = parentLabel.innerText.trim();
-                            }
-                        }
-                        
-                        // Add label information
-                        if (labelText) {
-                            text = `[Label: ${labelText}] ${text}`;
-                        }
-                        
-                        // Add placeholder information
-                        if (element.placeholder) {
-                            text = `${text} [Placeholder: ${element.placeholder}]`;
-                        }
-                    }
-                } else {
-                    text = '[No text]';
-                }
-                
-                // Maximum limit on text length to keep it clear
-                if (text.length > 100) {
-                    text = text.substring(0, 97) + '...';
-                }
-                
-                // Only add data-manus-id attribute to elements that meet the conditions
-                element.setAttribute('data-manus-id', `manus-element-${validElementIndex}`);
-                                                        
-                // Build selector - using only data-manus-id
-                const selector = `[data-manus-id="manus-element-${validElementIndex}"]`;
-                
-                // Add element information to the array
-                interactiveElements.push({
-                    index: validElementIndex,  // Use consecutive index
-                    tag: tagName,
-                    text: text,
-                    selector: selector
-                });
-                
-                validElementIndex++; // Increment valid element counter
-            }
-            
-            return interactiveElements;
-        }""")
-        
-        # Update cache
-        self.page.interactive_elements_cache = interactive_elements
-        
-        # Format element information in specified format
-        formatted_elements = []
-        for el in interactive_elements:
-            formatted_elements.append(f"{el['index']}:<{el['tag']}>{el['text']}</{el['tag']}>")
-        
-        return formatted_elements
+        snapshot = await self._snapshot_page(include_content=False)
+        return self._format_interactive_elements(snapshot["elements"])
     
     async def navigate(self, url: str, timeout: Optional[int] = 15000) -> ToolResult:
         """Navigate to the specified URL
@@ -591,27 +720,61 @@ class PlaywrightBrowser:
     
     async def screenshot(
         self,
-        full_page: Optional[bool] = False
+        full_page: Optional[bool] = False,
+        image_format: str = "png",
+        quality: Optional[int] = None
     ) -> bytes:
         """Take a screenshot of the current page
         
         Args:
             full_page: Whether to capture the full page or just the viewport
+            image_format: "png", "jpeg" or "webp"
+            quality: Compression quality 0-100 of jpeg and webp
             
         Returns:
-            bytes: PNG screenshot data
+            bytes: Screenshot data
         """
         await self._ensure_page()
         
+        if image_format == "webp":
+            # Playwright only encodes PNG and JPEG, Chrome encodes WebP over CDP
+            return await self._cdp_screenshot(full_page, image_format, quality)
+        
         # Configure screenshot options
         screenshot_options = {
             "full_page": full_page,
-            "type": "png"
+            "type": image_format
         }
+        if image_format == "jpeg" and quality is not None:
+            screenshot_options["quality"] = quality
         
         # Return bytes data directly
         return await self.page.screenshot(**screenshot_options)
     
+    async def _cdp_screenshot(self, full_page: bool, image_format: str, quality: Optional[int]) -> bytes:
+        """Take a screenshot with Page.captureScreenshot"""
+        params: Dict[str, Any] = {"format": image_format}
+        if quality is not None:
+            params["quality"] = quality
+        cdp = await self.page.context.new_cdp_session(self.page)
+        try:
+            if full_page:
+                metrics = await cdp.send("Page.getLayoutMetrics")
+                size = metrics["cssContentSize"]
+                params["captureBeyondViewport"] = True
+                params["clip"] = {"x": 0, "y": 0, "width": size["width"], "height": size["height"], "scale": 1}
+            result = await cdp.send("Page.captureScreenshot", params)
+        finally:
+            await cdp.detach()
+        return base64.b64decode(result["data"])
+    
+    async def preview_screenshot(self) -> Tuple[bytes, str]:
+        """Take a viewport screenshot in the configured format and quality, returning the data and its MIME type"""
+        image_format = self.settings.browser_screenshot_format
+        quality = None if image_format == "png" else self.settings.browser_screenshot_quality
+        data = await self.screenshot(image_format=image_format, quality=quality)
+        return data, f"image/{image_format}"
+    
     async def console_exec(self, javascript: str) -> ToolResult:
         """Execute JavaScript code"""
         await self._ensure_page()
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Optional
+
+from playwright.async_api import async_playwright, Browser, Playwright
+
+logger = logging.getLogger(__name__)
+
+
+class PlaywrightDriver:
+    """Playwright driver shared by all browsers of the process.
+
+    Starting Playwright spawns a Node driver process, so one driver multiplexes the CDP
+    connections to every sandbox instead. It starts with the first connection and stops
+    when the last one is released. A driver whose process died is restarted by the
+    next connection.
+    """
+
+    def __init__(self):
+        self._playwright: Optional[Playwright] = None
+        self._references = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def references(self) -> int:
+        return self._references
+
+    def _is_alive(self) -> bool:
+        # Playwright has no public API for this, the connection records why it closed
+        connection = getattr(self._playwright, "_connection", None)
+        return getattr(connection, "_closed_error", None) is None
+
+    async def _stop(self) -> None:
+        playwright, self._playwright = self._playwright, None
+        try:
+            await playwright.stop()
+        except Exception as e:
+            logger.warning(f"Failed to stop Playwright driver: {e}")
+
+    async def connect_over_cdp(self, cdp_url: str) -> Browser:
+        """Connect to a Chrome instance, holding a reference to the driver until release()"""
+        async with self._lock:
+            if self._playwright is not None and not self._is_alive():
+                logger.warning("Playwright driver disconnected, restarting it")
+                await self._stop()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+                logger.info("Started shared Playwright driver")
+            self._references += 1
+            playwright = self._playwright
+        try:
+            return await playwright.chromium.connect_over_cdp(cdp_url)
+        except BaseException:
+            await self.release()
+            raise
+
+    async def release(self) -> None:
+        """Release the reference of a closed connection, stopping the driver after the last one"""
+        async with self._lock:
+            self._references = max(0, self._references - 1)
+            if self._references == 0 and self._playwright is not None:
+                await self._stop()
+                logger.info("Stopped shared Playwright driver")
+
+    async def shutdown(self) -> None:
+        """Stop the driver regardless of open connections"""
+        async with self._lock:
+            self._references = 0
+            if self._playwright is not None:
+                await self._stop()
+
+
+@lru_cache()
+def get_playwright_driver() -> PlaywrightDriver:
+    """Get the process-wide Playwright driver"""
+    return PlaywrightDriver()
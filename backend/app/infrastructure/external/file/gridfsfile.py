@@ -65,7 +65,8 @@ class GridFSFileStorage(FileStorage):
         filename: str,
         user_id: str,
         content_type: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        file_id: Optional[str] = None
     ) -> FileInfo:
         """Upload file to GridFS"""
         try:
@@ -83,11 +84,20 @@ class GridFSFileStorage(FileStorage):
                 file_metadata['contentType'] = content_type
             
             # Upload directly from file stream to avoid loading entire file into memory
-            file_id = await bucket.upload_from_stream(
-                filename,
-                file_data,
-                metadata=file_metadata
-            )
+            if file_id:
+                file_id = ObjectId(file_id)
+                await bucket.upload_from_stream_with_id(
+                    file_id,
+                    filename,
+                    file_data,
+                    metadata=file_metadata
+                )
+            else:
+                file_id = await bucket.upload_from_stream(
+                    filename,
+                    file_data,
+                    metadata=file_metadata
+                )
             
             # Get file size (can be retrieved from GridFS if needed)
             files_collection = self._get_files_collection()
@@ -110,6 +120,10 @@ class GridFSFileStorage(FileStorage):
             logger.error(f"Failed to upload file {filename} for user {user_id}: {str(e)}")
             raise
     
+    def new_file_id(self) -> str:
+        """Generate an ObjectId for a file uploaded later"""
+        return str(ObjectId())
+    
     async def download_file(self, file_id: str, user_id: Optional[str] = None) -> Tuple[BinaryIO, FileInfo]:
         """Download file by file ID"""
         try:
@@ -0,0 +1,52 @@
+from enum import Enum
+from functools import lru_cache
+import logging
+
+from app.domain.external.llm import LLM
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMRole(str, Enum):
+    """Model tiers, auxiliary calls use cheaper models than the agents"""
+    MAIN = "main"  # Planner and execution agents
+    FAST = "fast"  # JSON repair and other short auxiliary calls
+    EXTRACTION = "extraction"  # Page content extraction of the browser
+
+
+# Role whose settings fill those a role leaves unset
+ROLE_FALLBACKS = {
+    LLMRole.EXTRACTION: LLMRole.FAST,
+    LLMRole.FAST: LLMRole.MAIN,
+}
+
+
+def get_llm(role: LLMRole = LLMRole.MAIN) -> LLM:
+    """Get the LLM of a role, shared by all callers of the role"""
+    return _get_llm(LLMRole(role))
+
+
+@lru_cache()
+def _get_llm(role: LLMRole) -> LLM:
+    from app.infrastructure.external.llm.openai_llm import OpenAILLM
+    from app.infrastructure.external.llm.llm_router import LLMRouter
+
+    settings = get_settings()
+    if role == LLMRole.MAIN:
+        # Routed over several endpoints when they are configured
+        if settings.llm_endpoints:
+            return LLMRouter(settings.llm_endpoints)
+        return OpenAILLM()
+
+    config = {"api_base": None, "api_key": None, "model_name": None}
+    tier = role
+    while tier != LLMRole.MAIN:
+        for field in config:
+            config[field] = config[field] or getattr(settings, f"{tier.value}_{field}")
+        tier = ROLE_FALLBACKS[tier]
+    if not any(config.values()):
+        # Not configured, share the client of the fallback role
+        return _get_llm(ROLE_FALLBACKS[role])
+    logger.info(f"Using model {config['model_name'] or settings.model_name} for {role.value} LLM calls")
+    return OpenAILLM(**config)
@@ -0,0 +1,403 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Any, Optional, AsyncGenerator, Type, Deque, Tuple
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+from pydantic import BaseModel
+
+from app.core.config import get_settings, LLMEndpointConfig
+from app.domain.external.llm import LLM
+from app.infrastructure.external.llm.openai_llm import OpenAILLM
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept per endpoint for percentiles
+LATENCY_WINDOW = 200
+# Samples needed before an endpoint's p95 is known and its slow requests are hedged
+MIN_HEDGE_SAMPLES = 20
+# Longest circuit open time, also caps Retry-After
+MAX_CIRCUIT_OPEN_SECONDS = 300.0
+
+
+def _percentile(samples: Deque[float], percentile: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * percentile), len(ordered) - 1)]
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds to wait from the Retry-After headers of an API error"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_endpoint_failure(error: Exception) -> bool:
+    """Whether an error says the endpoint is unhealthy, rather than the request being bad"""
+    if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+class LLMEndpoint:
+    """An LLM endpoint with a concurrency limit, latency statistics and a circuit breaker"""
+
+    def __init__(self, llm: OpenAILLM, max_concurrency: int, failure_threshold: int, open_seconds: float):
+        self.llm = llm
+        self.name = f"{llm.model_name}@{llm.api_base}"
+        self._max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._failure_threshold = failure_threshold
+        self._open_seconds = open_seconds
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._first_token_latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._in_flight = 0
+        self._waiting = 0
+        self._requests = 0
+        self._errors = 0
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        """Whether the circuit is closed, or open long enough to let a request try again"""
+        return time.monotonic() >= self._open_until
+
+    def expected_latency(self, streaming: bool) -> float:
+        """Typical latency, scaled up by the requests queued before a new one"""
+        p50 = _percentile(self._first_token_latencies if streaming else self._latencies, 0.5) or 0.0
+        return p50 * (1 + self._waiting / self._max_concurrency)
+
+    def hedge_delay(self, streaming: bool, min_delay: float) -> Optional[float]:
+        """Time after which a request is hedged, None until the p95 latency is known"""
+        samples = self._first_token_latencies if streaming else self._latencies
+        if len(samples) < MIN_HEDGE_SAMPLES:
+            return None
+        return max(_percentile(samples, 0.95), min_delay)
+
+    async def acquire(self) -> None:
+        """Wait for one of the endpoint's request slots"""
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record_first_token(self, latency: float) -> None:
+        self._consecutive_failures = 0
+        self._first_token_latencies.append(latency)
+
+    def record_success(self, latency: float) -> None:
+        self._requests += 1
+        self._consecutive_failures = 0
+        self._latencies.append(latency)
+
+    def record_failure(self, error: Exception) -> None:
+        self._requests += 1
+        self._errors += 1
+        if not _is_endpoint_failure(error):
+            return
+        self._consecutive_failures += 1
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            open_seconds = retry_after
+        elif isinstance(error, RateLimitError) or self._consecutive_failures >= self._failure_threshold:
+            # Back off longer while the endpoint keeps failing
+            extra_failures = max(self._consecutive_failures - self._failure_threshold, 0)
+            open_seconds = self._open_seconds * (2 ** extra_failures)
+        else:
+            return
+        open_seconds = min(open_seconds, MAX_CIRCUIT_OPEN_SECONDS)
+        self._open_until = time.monotonic() + open_seconds
+        logger.warning(f"LLM endpoint {self.name} circuit open for {open_seconds:.1f}s after: {error}")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "available": self.available,
+            "circuit_open_seconds": max(self._open_until - time.monotonic(), 0.0),
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "requests": self._requests,
+            "errors": self._errors,
+            "error_rate": self._errors / self._requests if self._requests else 0.0,
+            "p50_seconds": _percentile(self._latencies, 0.5),
+            "p95_seconds": _percentile(self._latencies, 0.95),
+            "first_token_p50_seconds": _percentile(self._first_token_latencies, 0.5),
+            "first_token_p95_seconds": _percentile(self._first_token_latencies, 0.95),
+        }
+
+
+class LLMRouter(LLM):
+    """LLM over several OpenAI-compatible endpoints.
+
+    Each request goes to the available endpoint with the lowest expected latency,
+    preferring the configured order on ties. Requests that take longer than the
+    endpoint's p95 latency are hedged on a second endpoint and the first answer wins.
+    Endpoints answering 429, 5xx or not at all have their circuit opened, for the
+    Retry-After time when the provider sends one, and requests fail over to the others.
+    """
+
+    def __init__(self, endpoints: List[LLMEndpointConfig]):
+        settings = get_settings()
+        self._endpoints = [
+            LLMEndpoint(
+                OpenAILLM(
+                    api_base=endpoint.api_base,
+                    api_key=endpoint.api_key,
+                    model_name=endpoint.model_name,
+                    max_retries=0,
+                ),
+                max_concurrency=endpoint.max_concurrency,
+                failure_threshold=settings.llm_circuit_failure_threshold,
+                open_seconds=settings.llm_circuit_open_seconds,
+            )
+            for endpoint in endpoints
+        ]
+        self._primary = self._endpoints[0].llm
+        self._hedge = settings.llm_hedge
+        self._hedge_min_delay = settings.llm_hedge_min_delay_seconds
+        logger.info(f"Initialized LLM router with endpoints: {[endpoint.name for endpoint in self._endpoints]}")
+
+    @property
+    def model_name(self) -> str:
+        return self._primary.model_name
+
+    @property
+    def temperature(self) -> float:
+        return self._primary.temperature
+
+    @property
+    def max_tokens(self) -> int:
+        return self._primary.max_tokens
+
+    @property
+    def stream(self) -> bool:
+        return self._primary.stream
+
+    @property
+    def parallel_tool_calls(self) -> bool:
+        return self._primary.parallel_tool_calls
+
+    @property
+    def prompt_cache(self) -> bool:
+        return self._primary.prompt_cache
+
+    @property
+    def context_window(self) -> int:
+        # Any endpoint may serve a request
+        return min(endpoint.llm.context_window for endpoint in self._endpoints)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"endpoints": [endpoint.metrics() for endpoint in self._endpoints]}
+
+    def _ranked_endpoints(self, streaming: bool) -> List[LLMEndpoint]:
+        """Endpoints to try in order, the ones with an open circuit last"""
+        order = {id(endpoint): index for index, endpoint in enumerate(self._endpoints)}
+        return sorted(
+            self._endpoints,
+            key=lambda endpoint: (
+                not endpoint.available,
+                endpoint.expected_latency(streaming),
+                order[id(endpoint)],
+            ),
+        )
+
+    def _hedge_target(
+        self,
+        candidates: List[LLMEndpoint],
+        pending: Dict[asyncio.Task, LLMEndpoint],
+        streaming: bool
+    ) -> Tuple[Optional[LLMEndpoint], Optional[float]]:
+        """Endpoint to hedge the single pending request on, and how long to wait before doing so"""
+        if not self._hedge or not candidates or len(pending) != 1:
+            return None, None
+        delay = next(iter(pending.values())).hedge_delay(streaming, self._hedge_min_delay)
+        if delay is None:
+            return None, None
+        return candidates[0], delay
+
+    async def _ask_endpoint(self, endpoint: LLMEndpoint, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        async with endpoint.slot():
+            start = time.monotonic()
+            try:
+                response = await endpoint.llm.ask(**kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                endpoint.record_failure(e)
+                raise
+            endpoint.record_success(time.monotonic() - start)
+            return response
+
+    async def ask(self, messages: List[Dict[str, str]],
+                tools: Optional[List[Dict[str, Any]]] = None,
+                response_format: Optional[Dict[str, Any]] = None,
+                tool_choice: Optional[str] = None,
+                response_schema: Optional[Type[BaseModel]] = None) -> Dict[str, Any]:
+        """Send the request to the best endpoint, hedging and failing over to the others"""
+        kwargs = dict(messages=messages, tools=tools, response_format=response_format,
+                      tool_choice=tool_choice, response_schema=response_schema)
+        candidates = self._ranked_endpoints(streaming=False)
+        pending: Dict[asyncio.Task, LLMEndpoint] = {}
+        last_error: Optional[Exception] = None
+        try:
+            while candidates or pending:
+                if not pending:
+                    endpoint = candidates.pop(0)
+                    pending[asyncio.create_task(self._ask_endpoint(endpoint, kwargs))] = endpoint
+                hedge_endpoint, timeout = self._hedge_target(candidates, pending, streaming=False)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"Hedging slow LLM request on {hedge_endpoint.name}")
+                    candidates.remove(hedge_endpoint)
+                    pending[asyncio.create_task(self._ask_endpoint(hedge_endpoint, kwargs))] = hedge_endpoint
+                    continue
+                # Retrieve every exception, a hedged pair can finish in the same tick
+                finished = [(task, pending.pop(task), task.exception()) for task in done]
+                for task, _, error in finished:
+                    if error is None:
+                        return task.result()
+                for _, endpoint, error in finished:
+                    last_error = error
+                    if not _is_endpoint_failure(error):
+                        # Another endpoint would reject the request too
+                        raise error
+                    logger.warning(f"LLM request to {endpoint.name} failed: {error}")
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error
+
+    async def _open_stream(
+        self,
+        endpoint: LLMEndpoint,
+        kwargs: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], AsyncGenerator[Dict[str, Any], None], float]:
+        """Start a stream on an endpoint and wait for its first chunk, holding a request slot"""
+        await endpoint.acquire()
+        start = time.monotonic()
+        stream = endpoint.llm.ask_stream(**kwargs)
+        try:
+            first = await stream.__anext__()
+        except BaseException as e:
+            endpoint.release()
+            await stream.aclose()
+            if isinstance(e, Exception):
+                endpoint.record_failure(e)
+            raise
+        endpoint.record_first_token(time.monotonic() - start)
+        return first, stream, start
+
+    async def ask_stream(self, messages: List[Dict[str, str]],
+                tools: Optional[List[Dict[str, Any]]] = None,
+                response_format: Optional[Dict[str, Any]] = None,
+                tool_choice: Optional[str] = None,
+                response_schema: Optional[Type[BaseModel]] = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream from the endpoint that starts answering first.
+
+        Hedging and failover only happen before the first chunk, since content already
+        shown to the user cannot be taken back.
+        """
+        kwargs = dict(messages=messages, tools=tools, response_format=response_format,
+                      tool_choice=tool_choice, response_schema=response_schema)
+        candidates = self._ranked_endpoints(streaming=True)
+        pending: Dict[asyncio.Task, LLMEndpoint] = {}
+        last_error: Optional[Exception] = None
+        winner: Optional[LLMEndpoint] = None
+        try:
+            while (candidates or pending) and winner is None:
+                if not pending:
+                    endpoint = candidates.pop(0)
+                    pending[asyncio.create_task(self._open_stream(endpoint, kwargs))] = endpoint
+                hedge_endpoint, timeout = self._hedge_target(candidates, pending, streaming=True)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"Hedging slow LLM stream on {hedge_endpoint.name}")
+                    candidates.remove(hedge_endpoint)
+                    pending[asyncio.create_task(self._open_stream(hedge_endpoint, kwargs))] = hedge_endpoint
+                    continue
+                fatal_error: Optional[Exception] = None
+                for task in done:
+                    endpoint = pending.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        if not _is_endpoint_failure(last_error):
+                            # Another endpoint would reject the request too
+                            fatal_error = last_error
+                        else:
+                            logger.warning(f"LLM stream from {endpoint.name} failed: {last_error}")
+                    elif winner is None:
+                        winner = endpoint
+                        first, stream, start = task.result()
+                    else:
+                        # Both started in the same tick, drop the later one
+                        _, other_stream, _ = task.result()
+                        endpoint.release()
+                        await other_stream.aclose()
+                if fatal_error is not None and winner is None:
+                    raise fatal_error
+        except BaseException:
+            if winner is not None:
+                winner.release()
+                await stream.aclose()
+            raise
+        finally:
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(self._close_abandoned_stream(pending[task]))
+        if winner is None:
+            raise last_error
+
+        try:
+            yield first
+            async for chunk in stream:
+                yield chunk
+            winner.record_success(time.monotonic() - start)
+        except Exception as e:
+            winner.record_failure(e)
+            raise
+        finally:
+            await stream.aclose()
+            winner.release()
+
+    @staticmethod
+    def _close_abandoned_stream(endpoint: LLMEndpoint):
+        """Release the slot of a hedged stream that lost, if it had started"""
+        def callback(task: asyncio.Task) -> None:
+            if task.cancelled() or task.exception() is not None:
+                return
+            _, stream, _ = task.result()
+            endpoint.release()
+            asyncio.create_task(stream.aclose())
+        return callback
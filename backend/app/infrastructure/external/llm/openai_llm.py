@@ -1,5 +1,6 @@
-from typing import List, Dict, Any, Optional
-from openai import AsyncOpenAI
+from typing import List, Dict, Any, Optional, AsyncGenerator, Type, Tuple
+from openai import AsyncOpenAI, BadRequestError
+from pydantic import BaseModel, ValidationError
 from app.domain.external.llm import LLM
 from app.core.config import get_settings
 import logging
@@ -9,19 +10,145 @@ import time
 
 logger = logging.getLogger(__name__)
 
+# Context window sizes by model name prefix, the longest matching prefix wins
+MODEL_CONTEXT_WINDOWS = {
+    "deepseek": 65536,
+    "gpt-3.5": 16385,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4.1": 1047576,
+    "o1": 200000,
+    "o3": 200000,
+    "o4": 200000,
+    "claude": 200000,
+    "gemini": 1048576,
+    "qwen": 131072,
+    "moonshot": 131072,
+    "kimi": 131072,
+    "glm": 131072,
+}
+DEFAULT_CONTEXT_WINDOW = 32768
+
+
+def get_context_window(model_name: str) -> int:
+    """Get the context window of a model from its name"""
+    name = model_name.lower().rsplit("/", 1)[-1]
+    matches = [prefix for prefix in MODEL_CONTEXT_WINDOWS if name.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)]
+
+
+# Whether an (API base, model) accepts json_schema response formats, found by a probe request
+_structured_output_support: Dict[Tuple[str, str], bool] = {}
+# When an (API base, model) whose probe failed may be probed again
+_structured_output_retry_at: Dict[Tuple[str, str], float] = {}
+_structured_output_lock = asyncio.Lock()
+# Seconds to wait before probing again after a probe failed with a transient error
+PROBE_RETRY_SECONDS = 300
+
+
+class _ProbeResponse(BaseModel):
+    ok: bool
+
+
+_PROBE_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "noop",
+        "description": "Does nothing",
+        "parameters": {"type": "object", "properties": {}, "required": []},
+    },
+}
+
+
+def _strict_schema(schema: Any) -> Any:
+    """Close every object of a JSON schema and require all its properties, as strict mode demands"""
+    if isinstance(schema, list):
+        return [_strict_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    schema = {
+        # Property and definition maps hold schemas by name, they are not schemas themselves
+        key: {name: _strict_schema(item) for name, item in value.items()}
+        if key in ("properties", "$defs") and isinstance(value, dict) else _strict_schema(value)
+        for key, value in schema.items()
+    }
+    if "properties" in schema:
+        schema["additionalProperties"] = False
+        schema["required"] = list(schema["properties"])
+    return schema
+
+
+def json_schema_format(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Build a strict json_schema response format from a pydantic model"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": model.__name__,
+            "strict": True,
+            "schema": _strict_schema(model.model_json_schema()),
+        },
+    }
+
+
+def _get_usage(usage: Any) -> Optional[Dict[str, int]]:
+    """Token counts of a response, including prompt cache hits"""
+    if not usage:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None)
+    if cached_tokens is None:
+        # DeepSeek reports cache hits separately
+        cached_tokens = getattr(usage, "prompt_cache_hit_tokens", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "cached_tokens": cached_tokens or 0,
+        "completion_tokens": usage.completion_tokens or 0,
+    }
+
+
 class OpenAILLM(LLM):
-    def __init__(self):
+    def __init__(
+        self,
+        api_base: Optional[str] = None,
+        api_key: Optional[str] = None,
+        model_name: Optional[str] = None,
+        max_retries: int = 3
+    ):
+        """Create a client for an OpenAI-compatible API, by default the one in settings
+
+        Args:
+            max_retries: Retries of a failed request, 0 when another endpoint takes over instead
+        """
         settings = get_settings()
+        self._api_base = api_base or settings.api_base
         self.client = AsyncOpenAI(
-            api_key=settings.api_key,
-            base_url=settings.api_base
+            api_key=api_key or settings.api_key,
+            base_url=self._api_base,
+            # The router fails over to another endpoint instead of retrying
+            max_retries=2 if max_retries else 0
         )
+        self._max_retries = max_retries
         
-        self._model_name = settings.model_name
+        self._model_name = model_name or settings.model_name
         self._temperature = settings.temperature
         self._max_tokens = settings.max_tokens
+        self._stream = settings.llm_stream
+        self._stream_usage = settings.llm_stream_usage
+        self._prompt_cache = settings.llm_prompt_cache
+        self._parallel_tool_calls = settings.llm_parallel_tool_calls
+        # LLM_CONTEXT_WINDOW describes MODEL_NAME, other models are looked up
+        context_window = settings.llm_context_window if self._model_name == settings.model_name else None
+        self._context_window = context_window or get_context_window(self._model_name)
+        self._structured_output = settings.llm_structured_output
         logger.info(f"Initialized OpenAI LLM with model: {self._model_name}")
     
+    @property
+    def api_base(self) -> str:
+        return self._api_base
+    
     @property
     def model_name(self) -> str:
         return self._model_name
@@ -34,12 +161,107 @@ class OpenAILLM(LLM):
     def max_tokens(self) -> int:
         return self._max_tokens
     
-    async def ask(self, messages: List[Dict[str, str]],
+    @property
+    def stream(self) -> bool:
+        return self._stream
+    
+    @property
+    def parallel_tool_calls(self) -> bool:
+        return self._parallel_tool_calls
+    
+    @property
+    def prompt_cache(self) -> bool:
+        return self._prompt_cache
+    
+    @property
+    def context_window(self) -> int:
+        return self._context_window
+    
+    async def supports_structured_output(self) -> bool:
+        """Check whether the provider accepts json_schema response formats, probing it once"""
+        if self._structured_output is not None:
+            return self._structured_output
+        key = (self._api_base, self._model_name)
+        if key not in _structured_output_support:
+            if time.monotonic() < _structured_output_retry_at.get(key, 0):
+                return False
+            async with _structured_output_lock:
+                if key not in _structured_output_support:
+                    if time.monotonic() < _structured_output_retry_at.get(key, 0):
+                        return False
+                    supported = await self._probe_structured_output()
+                    if supported is None:
+                        # Could not tell, probe again after a while
+                        _structured_output_retry_at[key] = time.monotonic() + PROBE_RETRY_SECONDS
+                        return False
+                    _structured_output_support[key] = supported
+        return _structured_output_support[key]
+    
+    async def _probe_structured_output(self) -> Optional[bool]:
+        """Send a small json_schema request together with a tool, as agents do"""
+        try:
+            response = await self.client.chat.completions.create(
+                model=self._model_name,
+                max_tokens=20,
+                messages=[{"role": "user", "content": 'Reply with the JSON {"ok": true}'}],
+                tools=[_PROBE_TOOL],
+                tool_choice="none",
+                response_format=json_schema_format(_ProbeResponse),
+            )
+        except BadRequestError as e:
+            logger.info(f"Model {self._model_name} does not support structured output: {e}")
+            return False
+        except Exception as e:
+            logger.warning(f"Structured output probe for model {self._model_name} failed: {e}")
+            return None
+        try:
+            _ProbeResponse.model_validate_json(response.choices[0].message.content or "")
+        except ValidationError as e:
+            # Accepted but not enforced
+            logger.info(f"Model {self._model_name} ignores the structured output schema: {e}")
+            return False
+        logger.info(f"Model {self._model_name} supports structured output")
+        return True
+    
+    async def _get_response_format(
+        self,
+        response_format: Optional[Dict[str, Any]],
+        response_schema: Optional[Type[BaseModel]]
+    ) -> Optional[Dict[str, Any]]:
+        """Use the response schema as a json_schema response format when the provider supports it"""
+        if response_schema and await self.supports_structured_output():
+            return json_schema_format(response_schema)
+        return response_format
+    
+    def _request_params(self, messages: List[Dict[str, str]],
                 tools: Optional[List[Dict[str, Any]]] = None,
                 response_format: Optional[Dict[str, Any]] = None,
                 tool_choice: Optional[str] = None) -> Dict[str, Any]:
+        """Build chat completion parameters shared by ask and ask_stream"""
+        params = {
+            "model": self._model_name,
+            "temperature": self._temperature,
+            "max_tokens": self._max_tokens,
+            "messages": messages,
+        }
+        if tools:
+            # Note: Cannot use response_format with function calling (Gemini limitation)
+            params.update(tools=tools, tool_choice=tool_choice, parallel_tool_calls=self._parallel_tool_calls)
+            # Providers that passed the structured output probe accept a schema together with tools
+            if response_format and response_format.get("type") == "json_schema":
+                params["response_format"] = response_format
+        else:
+            params["response_format"] = response_format
+        return params
+    
+    async def ask(self, messages: List[Dict[str, str]],
+                tools: Optional[List[Dict[str, Any]]] = None,
+                response_format: Optional[Dict[str, Any]] = None,
+                tool_choice: Optional[str] = None,
+                response_schema: Optional[Type[BaseModel]] = None) -> Dict[str, Any]:
         """Send chat request to OpenAI API with retry mechanism"""
-        max_retries = 3
+        response_format = await self._get_response_format(response_format, response_schema)
+        max_retries = self._max_retries
         base_delay = 1.0  
 
         for attempt in range(max_retries + 1):  # every try
@@ -50,27 +272,10 @@ class OpenAILLM(LLM):
                     logger.info(f"Retrying OpenAI API request (attempt {attempt + 1}/{max_retries + 1}) after {delay}s delay")
                     await asyncio.sleep(delay)
 
-                if tools:
-                    logger.debug(f"Sending request to OpenAI with tools, model: {self._model_name}, attempt: {attempt + 1}")
-                    # Note: Cannot use response_format with function calling (Gemini limitation)
-                    response = await self.client.chat.completions.create(
-                        model=self._model_name,
-                        temperature=self._temperature,
-                        max_tokens=self._max_tokens,
-                        messages=messages,
-                        tools=tools,
-                        tool_choice=tool_choice,
-                        parallel_tool_calls=False,
-                    )
-                else:
-                    logger.debug(f"Sending request to OpenAI without tools, model: {self._model_name}, attempt: {attempt + 1}")
-                    response = await self.client.chat.completions.create(
-                        model=self._model_name,
-                        temperature=self._temperature,
-                        max_tokens=self._max_tokens,
-                        messages=messages,
-                        response_format=response_format,
-                    )
+                logger.debug(f"Sending request to OpenAI {'with' if tools else 'without'} tools, model: {self._model_name}, attempt: {attempt + 1}")
+                response = await self.client.chat.completions.create(
+                    **self._request_params(messages, tools, response_format, tool_choice)
+                )
 
                 logger.debug(f"Response from OpenAI: {response.model_dump()}")
 
@@ -82,7 +287,9 @@ class OpenAILLM(LLM):
                         raise ValueError(f"Failed after {max_retries + 1} attempts: {error_msg}")
                     continue
 
-                return response.choices[0].message.model_dump()
+                message = response.choices[0].message.model_dump()
+                message["usage"] = _get_usage(response.usage)
+                return message
 
             except Exception as e:
                 error_msg = f"Error calling OpenAI API on attempt {attempt + 1}: {str(e)}"
@@ -91,3 +298,76 @@ class OpenAILLM(LLM):
                     raise e
                 continue
 
+    async def ask_stream(self, messages: List[Dict[str, str]],
+                tools: Optional[List[Dict[str, Any]]] = None,
+                response_format: Optional[Dict[str, Any]] = None,
+                tool_choice: Optional[str] = None,
+                response_schema: Optional[Type[BaseModel]] = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream a chat completion, retrying only while nothing has been yielded yet"""
+        response_format = await self._get_response_format(response_format, response_schema)
+        max_retries = self._max_retries
+        base_delay = 1.0
+
+        for attempt in range(max_retries + 1):
+            started = False
+            try:
+                if attempt > 0:
+                    delay = base_delay * (2 ** (attempt - 1))  # back off
+                    logger.info(f"Retrying OpenAI streaming request (attempt {attempt + 1}/{max_retries + 1}) after {delay}s delay")
+                    await asyncio.sleep(delay)
+
+                logger.debug(f"Sending streaming request to OpenAI {'with' if tools else 'without'} tools, model: {self._model_name}, attempt: {attempt + 1}")
+                start_time = time.monotonic()
+                params = self._request_params(messages, tools, response_format, tool_choice)
+                if self._stream_usage:
+                    # The last chunk then carries the token counts, not every provider accepts it
+                    params["stream_options"] = {"include_usage": True}
+                stream = await self.client.chat.completions.create(**params, stream=True)
+
+                content_parts: List[str] = []
+                # Tool calls arrive as fragments keyed by their index
+                tool_calls: Dict[int, Dict[str, Any]] = {}
+                usage = None
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None):
+                        usage = _get_usage(chunk.usage)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        if not started:
+                            logger.debug(f"First token from OpenAI after {time.monotonic() - start_time:.2f}s")
+                        started = True
+                        content_parts.append(delta.content)
+                        yield {"type": "delta", "content": delta.content}
+                    for tool_call_delta in delta.tool_calls or []:
+                        tool_call = tool_calls.setdefault(tool_call_delta.index, {
+                            "id": None,
+                            "type": "function",
+                            "function": {"name": "", "arguments": ""},
+                        })
+                        if tool_call_delta.id:
+                            tool_call["id"] = tool_call_delta.id
+                        if tool_call_delta.function:
+                            if tool_call_delta.function.name and not tool_call["function"]["name"]:
+                                tool_call["function"]["name"] = tool_call_delta.function.name
+                            if tool_call_delta.function.arguments:
+                                tool_call["function"]["arguments"] += tool_call_delta.function.arguments
+
+                message = {
+                    "role": "assistant",
+                    "content": "".join(content_parts) or None,
+                    "tool_calls": [tool_calls[index] for index in sorted(tool_calls)] or None,
+                    "usage": usage,
+                }
+                logger.debug(f"Streamed response from OpenAI: {message}")
+                yield {"type": "message", "message": message}
+                return
+
+            except Exception as e:
+                error_msg = f"Error streaming from OpenAI API on attempt {attempt + 1}: {str(e)}"
+                logger.error(error_msg)
+                # Content already shown to the user cannot be taken back
+                if started or attempt == max_retries:
+                    raise e
+                continue
@@ -0,0 +1,127 @@
+import os
+import socket
+import uuid
+import logging
+from typing import Any, Optional, Tuple
+from redis.exceptions import ResponseError
+from app.infrastructure.external.message_queue.redis_stream_queue import RedisStreamQueue
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GROUP_NAME = "agent"
+# Pending messages idle for longer than this are considered abandoned by a crashed consumer
+RECLAIM_MIN_IDLE_MS = 60_000
+# Pending messages inspected by is_empty(), more than a task ever has in flight
+PENDING_SCAN_COUNT = 100
+# Unique per process, a restarted container keeps its hostname and often its pid
+_CONSUMER_NAME = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class RedisStreamGroupQueue(RedisStreamQueue):
+    """Redis Stream queue consumed through a consumer group
+
+    pop() delivers each message to exactly one consumer with XREADGROUP and blocks
+    server side instead of polling. Delivered messages stay pending until ack(), so a
+    message popped by a worker that crashes before acknowledging it is reclaimed by
+    the next pop() with XAUTOCLAIM (at-least-once delivery).
+    """
+
+    def __init__(self, stream_name: str, group_name: str = DEFAULT_GROUP_NAME, consumer_name: Optional[str] = None):
+        super().__init__(stream_name)
+        self._group_name = group_name
+        self._consumer_name = consumer_name or _CONSUMER_NAME
+        self._group_ready = False
+
+    async def _ensure_group(self) -> None:
+        """Create the consumer group (and the stream) if it does not exist yet"""
+        if self._group_ready:
+            return
+        try:
+            await self._redis.client.xgroup_create(self._stream_name, self._group_name, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def pop(self, block_ms: Optional[int] = None) -> Tuple[str, Any]:
+        """Deliver the next message to this consumer, reclaiming abandoned ones first
+
+        The message must be acknowledged with ack() once it has been handled.
+
+        Args:
+            block_ms: Time in milliseconds to wait for a message if none is available,
+                defaults to None meaning no blocking
+
+        Returns:
+            Tuple[str, Any]: (Message ID, Message content), returns (None, None) if no message
+        """
+        logger.debug(f"Popping message from stream ({self._stream_name}) as {self._consumer_name}")
+        try:
+            return await self._pop(block_ms)
+        except ResponseError as e:
+            if "NOGROUP" not in str(e):
+                raise
+            # The stream expired and was recreated by a new XADD without the group
+            self._group_ready = False
+            return await self._pop(block_ms)
+
+    async def _pop(self, block_ms: Optional[int]) -> Tuple[str, Any]:
+        await self._ensure_group()
+
+        # Reclaim a message left pending by a crashed consumer
+        claimed = await self._redis.client.xautoclaim(
+            self._stream_name, self._group_name, self._consumer_name,
+            min_idle_time=RECLAIM_MIN_IDLE_MS, count=1
+        )
+        for message_id, message_data in claimed[1]:
+            if message_data is not None:
+                logger.info(f"Reclaimed pending message {message_id} from stream ({self._stream_name})")
+                return message_id, message_data.get("data")
+
+        messages = await self._redis.client.xreadgroup(
+            self._group_name, self._consumer_name,
+            {self._stream_name: ">"},
+            count=1,
+            block=block_ms
+        )
+        if not messages or not messages[0][1]:
+            return None, None
+        message_id, message_data = messages[0][1][0]
+        return message_id, message_data.get("data")
+
+    async def ack(self, message_id: str) -> bool:
+        """Acknowledge a handled message and remove it from the stream"""
+        await self._ensure_group()
+        async with self._redis.client.pipeline(transaction=True) as pipe:
+            pipe.xack(self._stream_name, self._group_name, message_id)
+            pipe.xdel(self._stream_name, message_id)
+            acked, _ = await pipe.execute()
+        return acked == 1
+
+    async def is_empty(self) -> bool:
+        """Check whether no message is waiting to be delivered to the group
+
+        Messages left pending by another consumer count as waiting once pop() can reclaim
+        them, after RECLAIM_MIN_IDLE_MS. Before that, counting them would interrupt the
+        running flow for a message pop() cannot deliver yet. This consumer's own pending
+        messages are the ones it is handling and do not count.
+        """
+        await self._ensure_group()
+        try:
+            groups = await self._redis.client.xinfo_groups(self._stream_name)
+        except ResponseError:
+            # The stream expired, recreate it with the group on the next pop
+            self._group_ready = False
+            return True
+        group = next((group for group in groups if group["name"] == self._group_name), None)
+        last_delivered_id = group["last-delivered-id"] if group else "0-0"
+        undelivered = await self._redis.client.xrange(self._stream_name, f"({last_delivered_id}", "+", count=1)
+        if undelivered:
+            return False
+        pending = await self._redis.client.xpending_range(
+            self._stream_name, self._group_name, min="-", max="+", count=PENDING_SCAN_COUNT
+        )
+        return not any(
+            entry["consumer"] != self._consumer_name and entry["time_since_delivered"] >= RECLAIM_MIN_IDLE_MS
+            for entry in pending
+        )
@@ -1,77 +1,42 @@
 import json
-import uuid
-import asyncio
-from typing import Any, AsyncGenerator, Optional, Tuple
+import time
+from typing import Any, AsyncGenerator, Optional, Tuple, List
 import logging
+from app.core.config import get_settings
 from app.infrastructure.storage.redis import get_redis
 from app.domain.external.message_queue import MessageQueue
 
 logger = logging.getLogger(__name__)
 
+# Atomically take the first entry of a stream
+POP_FIRST_SCRIPT = """
+local messages = redis.call("XRANGE", KEYS[1], "-", "+", "COUNT", 1)
+if #messages == 0 then
+    return nil
+end
+redis.call("XDEL", KEYS[1], messages[1][1])
+return messages[1]
+"""
+
 class RedisStreamQueue(MessageQueue):
     """Redis Stream implementation of message queue"""
     
-    def __init__(self, stream_name: str):
-        self._stream_name = stream_name
-        self._redis = get_redis()
-        self._lock_expire_seconds = 10  # Lock expiration time
+    _pop_script = None  # Registered once and shared by all queues
     
-    async def _acquire_lock(self, lock_key: str, timeout_seconds: int = 5) -> Optional[str]:
-        """Acquire distributed lock
+    def __init__(self, stream_name: str, max_len: Optional[int] = None, retention_seconds: Optional[int] = None):
+        """Initialize the queue
         
         Args:
-            lock_key: Lock key name
-            timeout_seconds: Timeout in seconds for acquiring lock
-            
-        Returns:
-            str: Lock value if acquired successfully, None otherwise
+            stream_name: Redis key of the stream
+            max_len: Approximate maximum number of entries kept, defaults to the configured value
+            retention_seconds: Approximate age after which entries are trimmed, defaults to the
+                configured value and takes precedence over max_len
         """
-        lock_value = str(uuid.uuid4())
-        end_time = timeout_seconds
-        
-        while end_time > 0:
-            # Use SET with NX and EX for atomic lock acquisition
-            result = await self._redis.client.set(
-                lock_key,
-                lock_value,
-                nx=True,  # Only set if key doesn't exist
-                ex=self._lock_expire_seconds  # Set expiration time
-            )
-            
-            if result:
-                return lock_value
-            
-            # Wait a bit before retrying
-            await asyncio.sleep(0.1)
-            end_time -= 0.1
-        
-        return None
-    
-    async def _release_lock(self, lock_key: str, lock_value: str) -> bool:
-        """Release distributed lock
-        
-        Args:
-            lock_key: Lock key name
-            lock_value: Lock value for verification
-            
-        Returns:
-            bool: True if lock released successfully, False otherwise
-        """
-        # Lua script for atomic lock release
-        release_script = """
-        if redis.call("GET", KEYS[1]) == ARGV[1] then
-            return redis.call("DEL", KEYS[1])
-        else
-            return 0
-        end
-        """
-        
-        try:
-            script = self._redis.client.register_script(release_script)
-            result = await script(keys=[lock_key], args=[lock_value])
-            return result == 1
-        except Exception:
-            return False
+        settings = get_settings()
+        self._stream_name = stream_name
+        self._redis = get_redis()
+        self._max_len = max_len if max_len is not None else settings.redis_stream_max_len
+        self._retention_seconds = retention_seconds if retention_seconds is not None else settings.redis_stream_retention_seconds
     
     async def put(self, message: Any) -> str:
         """Add a message to the stream
@@ -83,8 +48,11 @@ class RedisStreamQueue(MessageQueue):
             str: Message ID
         """
         logger.debug(f"Putting message into stream ({self._stream_name}): {message}")
-        message_id = await self._redis.client.xadd(self._stream_name, {"data": message})
-        return message_id
+        if self._retention_seconds:
+            # Entry IDs start with their creation time in milliseconds
+            min_id = int((time.time() - self._retention_seconds) * 1000)
+            return await self._redis.client.xadd(self._stream_name, {"data": message}, minid=min_id, approximate=True)
+        return await self._redis.client.xadd(self._stream_name, {"data": message}, maxlen=self._max_len, approximate=True)
     
     async def get(self, start_id: str = "0", block_ms: Optional[int] = None) -> Tuple[str, Any]:
         """Get a message from the stream
@@ -96,7 +64,23 @@ class RedisStreamQueue(MessageQueue):
         Returns:
             Tuple[str, Any]: (Message ID, Message content), returns (None, None) if no message
         """
-        logger.debug(f"Getting message from stream ({self._stream_name}): {start_id}")
+        messages = await self.get_many(start_id=start_id, count=1, block_ms=block_ms)
+        if not messages:
+            return None, None
+        return messages[0]
+    
+    async def get_many(self, start_id: Optional[str] = "0", count: int = 100, block_ms: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """Get up to count messages from the stream with a single XREAD
+        
+        Args:
+            start_id: Message ID to start reading after, defaults to "0" meaning from the earliest message
+            count: Maximum number of messages to return
+            block_ms: Block time in milliseconds if no message is available, defaults to None meaning no blocking
+            
+        Returns:
+            List[Tuple[str, Any]]: (Message ID, Message content) pairs in stream order, empty if no message
+        """
+        logger.debug(f"Getting up to {count} messages from stream ({self._stream_name}): {start_id}")
         # Handle None start_id by using "0" (read from beginning)
         if start_id is None:
             start_id = "0"
@@ -104,25 +88,17 @@ class RedisStreamQueue(MessageQueue):
         # Read new messages
         messages = await self._redis.client.xread(
             {self._stream_name: start_id},
-            count=1,
+            count=count,
             block=block_ms
         )
         
         if not messages:
-            return None, None
-            
-        # Get message ID and data
-        stream_messages = messages[0][1]
-        if not stream_messages:
-            return None, None
+            return []
             
-        message_id, message_data = stream_messages[0]
-        
-        try:
-            # Try both bytes and string keys for compatibility
-            return message_id, message_data.get("data")
-        except (KeyError, json.JSONDecodeError):
-            return None, None
+        return [
+            (message_id, message_data.get("data"))
+            for message_id, message_data in messages[0][1]
+        ]
     
     async def get_range(self, start_id: str = "-", end_id: str = "+", count: int = 100) -> AsyncGenerator[Tuple[str, Any], None]:
         """Get messages within a specified range
@@ -167,6 +143,14 @@ class RedisStreamQueue(MessageQueue):
         """Check if the stream is empty"""
         return await self.size() == 0
     
+    async def expire(self, ttl_seconds: int) -> None:
+        """Let the stream expire after ttl_seconds, new entries do not reset the expiry"""
+        await self._redis.client.expire(self._stream_name, ttl_seconds)
+    
+    async def persist(self) -> None:
+        """Remove a previously set expiry from the stream"""
+        await self._redis.client.persist(self._stream_name)
+    
     async def size(self) -> int:
         """Get the number of messages in the stream"""
         info = await self._redis.client.xlen(self._stream_name)
@@ -187,39 +171,38 @@ class RedisStreamQueue(MessageQueue):
         except Exception:
             return False
 
-    async def pop(self) -> Tuple[str, Any]:
-        """Get and remove the first message from the stream using distributed lock
+    async def pop(self, block_ms: Optional[int] = None) -> Tuple[str, Any]:
+        """Atomically get and remove the first message from the stream
+        
+        Args:
+            block_ms: Time in milliseconds to wait for a message if the stream is empty,
+                defaults to None meaning no blocking
         
         Returns:
             Tuple[str, Any]: (Message ID, Message content), returns (None, None) if stream is empty
         """
         logger.debug(f"Popping message from stream ({self._stream_name})")
-        lock_key = f"lock:{self._stream_name}:pop"
-        
-        # Acquire distributed lock
-        lock_value = await self._acquire_lock(lock_key)
-        if not lock_value:
+        message = await self._pop_first()
+        if message is None and block_ms:
+            # Wait for the next entry, then try to take it
+            await self._redis.client.xread({self._stream_name: "$"}, count=1, block=block_ms)
+            message = await self._pop_first()
+        if message is None:
             return None, None
-        
-        try:
-            # Get the first message from stream
-            messages = await self._redis.client.xrange(self._stream_name, "-", "+", count=1)
-            
-            if not messages:
-                return None, None
-            
-            message_id, message_data = messages[0]
-            
-            # Delete the message from stream
-            await self._redis.client.xdel(self._stream_name, message_id)
-            
-            try:
-                # Try both bytes and string keys for compatibility
-                return message_id, message_data.get("data")
-            except (KeyError, json.JSONDecodeError):
-                logger.exception(f"Error parsing message from stream ({self._stream_name}): {message_data}")
-                return None, None
-                
-        finally:
-            # Always release the lock
-            await self._release_lock(lock_key, lock_value)
+        return message
+    
+    async def _pop_first(self) -> Optional[Tuple[str, Any]]:
+        """Run XRANGE + XDEL as one atomic script so concurrent poppers never see the same message"""
+        if RedisStreamQueue._pop_script is None:
+            RedisStreamQueue._pop_script = self._redis.client.register_script(POP_FIRST_SCRIPT)
+        result = await RedisStreamQueue._pop_script(keys=[self._stream_name], client=self._redis.client)
+        if not result:
+            return None
+        message_id, fields = result
+        # Lua returns stream fields as a flat [key, value, ...] list
+        message_data = dict(zip(fields[::2], fields[1::2]))
+        return message_id, message_data.get("data")
+
+    async def ack(self, message_id: str) -> bool:
+        """Acknowledge a popped message, a no-op since pop already removed it"""
+        return True
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from typing import AsyncGenerator, Dict, List, Optional, Set
+from redis.asyncio.client import PubSub
+from app.domain.external.notification import SessionNotifier
+from app.infrastructure.storage.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "session:changes:"
+# Wait briefly after a change so bursts (e.g. status + title + message) go out as one batch
+CHANGE_DEBOUNCE_SECONDS = 0.2
+# Marker put into subscriber queues when the shared subscription is lost
+_CHANNEL_LOST = object()
+
+
+class RedisSessionNotifier(SessionNotifier):
+    """Redis pub/sub implementation of SessionNotifier
+
+    All listeners of this process share one pub/sub connection. Each user channel is
+    subscribed while at least one local listener exists, and incoming messages are fanned
+    out to per-listener queues.
+    """
+
+    def __init__(self):
+        self._redis = get_redis()
+        self._pubsub: Optional[PubSub] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._queues: Dict[str, Set[asyncio.Queue]] = {}
+
+    @staticmethod
+    def _channel(user_id: str) -> str:
+        return f"{CHANNEL_PREFIX}{user_id}"
+
+    async def publish(self, user_id: str, session_id: str) -> None:
+        """Publish a session change to the user's channel"""
+        await self._redis.client.publish(self._channel(user_id), session_id)
+
+    async def listen(self, user_id: str, timeout: float) -> AsyncGenerator[List[str], None]:
+        """Yield batches of changed session IDs, or an empty batch after timeout seconds of silence"""
+        queue: asyncio.Queue = asyncio.Queue()
+        await self._add_queue(user_id, queue)
+        try:
+            while True:
+                try:
+                    session_id = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    yield []
+                    continue
+                await asyncio.sleep(CHANGE_DEBOUNCE_SECONDS)
+                session_ids = [session_id]
+                while not queue.empty():
+                    session_ids.append(queue.get_nowait())
+                if any(session_id is _CHANNEL_LOST for session_id in session_ids):
+                    raise ConnectionError("Session change subscription lost")
+                yield list(dict.fromkeys(session_ids))
+        finally:
+            await self._remove_queue(user_id, queue)
+
+    async def _add_queue(self, user_id: str, queue: asyncio.Queue) -> None:
+        if self._pubsub is None:
+            self._pubsub = self._redis.client.pubsub(ignore_subscribe_messages=True)
+        queues = self._queues.setdefault(user_id, set())
+        queues.add(queue)
+        if len(queues) == 1:
+            await self._pubsub.subscribe(self._channel(user_id))
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._dispatch())
+
+    async def _remove_queue(self, user_id: str, queue: asyncio.Queue) -> None:
+        queues = self._queues.get(user_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if queues:
+            return
+        del self._queues[user_id]
+        try:
+            if self._pubsub is not None:
+                await self._pubsub.unsubscribe(self._channel(user_id))
+        except Exception as e:
+            logger.warning(f"Failed to unsubscribe session changes of user {user_id}: {e}")
+
+    async def _dispatch(self) -> None:
+        """Fan out messages from the shared subscription until no listeners are left"""
+        try:
+            while self._queues:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if not message or message.get("type") != "message":
+                    continue
+                user_id = message["channel"][len(CHANNEL_PREFIX):]
+                for queue in self._queues.get(user_id, ()):
+                    queue.put_nowait(message["data"])
+        except Exception as e:
+            logger.error(f"Session change subscription failed: {e}")
+            pubsub, self._pubsub = self._pubsub, None
+            queues_by_user, self._queues = self._queues, {}
+            # Wake up every listener so it can resync and subscribe again
+            for queues in queues_by_user.values():
+                for queue in queues:
+                    queue.put_nowait(_CHANNEL_LOST)
+            try:
+                await pubsub.reset()
+            except Exception:
+                pass
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Optional, List, BinaryIO
+from typing import Dict, Any, Optional, List, BinaryIO, Callable, Set, TypeVar
 import uuid
 import httpx
 import docker
@@ -6,26 +6,133 @@ import socket
 import logging
 import asyncio
 import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from async_lru import alru_cache
 from app.core.config import get_settings
 from app.domain.models.tool_result import ToolResult
 from app.domain.external.sandbox import Sandbox
 from app.infrastructure.external.browser.playwright_browser import PlaywrightBrowser
+from app.infrastructure.external.browser.page_extraction_cache import get_page_extraction_cache
+from app.infrastructure.external.browser.playwright_driver import get_playwright_driver
+from app.infrastructure.external.llm import get_llm, LLMRole
+from app.infrastructure.external.sandbox.sandbox_http_client import (
+    acquire_client, release_client, process_wait_timeout,
+    STATUS_TIMEOUT, EXEC_TIMEOUT, SEARCH_TIMEOUT, TRANSFER_TIMEOUT,
+)
 from app.domain.external.browser import Browser
 from app.domain.external.llm import LLM
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+DOCKER_EXECUTOR_WORKERS = 4
+EVENT_RECONNECT_DELAY_SECONDS = 1
+
+# The Docker SDK is blocking, so every call goes through one shared client on a
+# dedicated executor instead of the event loop or the default thread pool
+_docker_executor = ThreadPoolExecutor(max_workers=DOCKER_EXECUTOR_WORKERS, thread_name_prefix="docker")
+
+
+@lru_cache()
+def get_docker_client() -> docker.DockerClient:
+    """Get the shared Docker client."""
+    return docker.from_env()
+
+
+async def run_docker(func: Callable[..., T], *args: Any) -> T:
+    """Run a blocking Docker SDK call on the Docker executor"""
+    return await asyncio.get_running_loop().run_in_executor(_docker_executor, partial(func, *args))
+
+
+class DockerHealthWatcher:
+    """Turns Docker health_status events into awaitable futures
+
+    A single daemon thread follows the Docker event stream and resolves the futures of
+    containers that became healthy on the event loop that asked for them.
+    """
+
+    def __init__(self):
+        self._waiters: Dict[str, Set[asyncio.Future]] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def wait_healthy(self, container_name: str) -> asyncio.Future:
+        """Get a future resolved when the container reports healthy"""
+        self._loop = asyncio.get_running_loop()
+        future = self._loop.create_future()
+        with self._lock:
+            self._waiters.setdefault(container_name, set()).add(future)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._follow_events, name="docker-events", daemon=True)
+                self._thread.start()
+        return future
+
+    def discard(self, container_name: str, future: asyncio.Future) -> None:
+        """Stop waiting for a container"""
+        with self._lock:
+            waiters = self._waiters.get(container_name)
+            if waiters is not None:
+                waiters.discard(future)
+                if not waiters:
+                    del self._waiters[container_name]
+
+    def _resolve(self, container_name: str) -> None:
+        with self._lock:
+            waiters = self._waiters.pop(container_name, set())
+        for future in waiters:
+            if not future.done():
+                future.set_result(True)
+
+    def _follow_events(self) -> None:
+        while True:
+            try:
+                events = get_docker_client().events(
+                    decode=True,
+                    filters={"type": "container", "event": "health_status"}
+                )
+                for event in events:
+                    if event.get("status") != "health_status: healthy":
+                        continue
+                    container_name = event.get("Actor", {}).get("Attributes", {}).get("name")
+                    if container_name and self._loop is not None:
+                        self._loop.call_soon_threadsafe(self._resolve, container_name)
+            except Exception as e:
+                logger.warning(f"Docker event stream interrupted: {str(e)}")
+                time.sleep(EVENT_RECONNECT_DELAY_SECONDS)
+
+
+@lru_cache()
+def get_health_watcher() -> DockerHealthWatcher:
+    """Get the shared Docker health watcher."""
+    return DockerHealthWatcher()
+
+
 class DockerSandbox(Sandbox):
     def __init__(self, ip: str = None, container_name: str = None):
         """Initialize Docker sandbox and API interaction client"""
-        self.client = httpx.AsyncClient(timeout=600)
         self.ip = ip
         self.base_url = f"http://{self.ip}:8080"
+        self._client: Optional[httpx.AsyncClient] = None
         self._vnc_url = f"ws://{self.ip}:5901"
         self._cdp_url = f"http://{self.ip}:9222"
         self._container_name = container_name
+        self._destroyed = False
     
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client of the sandbox API, pooled per sandbox address and shared between instances"""
+        if self._destroyed:
+            # A client acquired now would never be released
+            raise RuntimeError(f"Sandbox {self.id} has been destroyed")
+        if self._client is None:
+            self._client = acquire_client(self.base_url)
+        return self._client
+
     @property
     def id(self) -> str:
         """Sandbox ID"""
@@ -67,6 +174,17 @@ class DockerSandbox(Sandbox):
         
         return ip_address
 
+    @staticmethod
+    def _get_container_ip_by_name(container_name: str) -> str:
+        """Look up a container and get its IP address (blocking)"""
+        container = get_docker_client().containers.get(container_name)
+        return DockerSandbox._get_container_ip(container)
+
+    @staticmethod
+    def _remove_container(container_name: str) -> None:
+        """Force remove a container (blocking)"""
+        get_docker_client().containers.get(container_name).remove(force=True)
+
     @staticmethod
     def _create_task() -> 'DockerSandbox':
         """Create a new Docker sandbox (static method)
@@ -86,8 +204,7 @@ class DockerSandbox(Sandbox):
         container_name = f"{name_prefix}-{str(uuid.uuid4())[:8]}"
         
         try:
-            # Create Docker client
-            docker_client = docker.from_env()
+            docker_client = get_docker_client()
 
             # Prepare container configuration
             container_config = {
@@ -125,62 +242,67 @@ class DockerSandbox(Sandbox):
             raise Exception(f"Failed to create Docker sandbox: {str(e)}")
 
     async def ensure_sandbox(self) -> None:
-        """Ensure sandbox is ready by checking that all services are RUNNING"""
-        max_retries = 30  # Maximum number of retries
-        retry_interval = 2  # Seconds between retries
+        """Ensure sandbox is ready by checking that all services are RUNNING
         
-        for attempt in range(max_retries):
-            try:
-                response = await self.client.get(f"{self.base_url}/api/v1/supervisor/status")
-                response.raise_for_status()
-                
-                # Parse response as ToolResult
-                tool_result = ToolResult(**response.json())
-                
-                if not tool_result.success:
-                    logger.warning(f"Supervisor status check failed: {tool_result.message}")
-                    await asyncio.sleep(retry_interval)
-                    continue
-                
-                services = tool_result.data or []
-                if not services:
-                    logger.warning("No services found in supervisor status")
-                    await asyncio.sleep(retry_interval)
+        Containers created from an image with a HEALTHCHECK report readiness through a
+        Docker health_status event, so the wait ends as soon as Docker marks the container
+        healthy. The periodic status check remains as a fallback for sandboxes without a
+        container or health check.
+        """
+        max_wait_seconds = 60
+        retry_interval = 2  # Seconds between fallback status checks
+        deadline = asyncio.get_running_loop().time() + max_wait_seconds
+        healthy = get_health_watcher().wait_healthy(self._container_name) if self._container_name else None
+        
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                # Also catches a container that became healthy before we started listening
+                if await self.health_check():
+                    logger.info(f"Sandbox {self.id} is ready")
+                    return
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                logger.info(f"Waiting for sandbox {self.id} services to start (attempt {attempt})")
+                if healthy is None:
+                    await asyncio.sleep(min(retry_interval, remaining))
                     continue
-                
-                # Check if all services are RUNNING
-                all_running = True
-                non_running_services = []
-                
-                for service in services:
-                    service_name = service.get("name", "unknown")
-                    state_name = service.get("statename", "")
-                    
-                    if state_name != "RUNNING":
-                        all_running = False
-                        non_running_services.append(f"{service_name}({state_name})")
-                
-                if all_running:
-                    logger.info(f"All {len(services)} services are RUNNING - sandbox is ready")
-                    return  # Success - all services are running
-                else:
-                    logger.info(f"Waiting for services to start... Non-running: {', '.join(non_running_services)} (attempt {attempt + 1}/{max_retries})")
-                    await asyncio.sleep(retry_interval)
-                    
-            except Exception as e:
-                logger.warning(f"Failed to check supervisor status (attempt {attempt + 1}/{max_retries}): {str(e)}")
-                await asyncio.sleep(retry_interval)
+                try:
+                    await asyncio.wait_for(asyncio.shield(healthy), timeout=min(retry_interval, remaining))
+                    logger.info(f"Sandbox {self.id} reported healthy by Docker")
+                    return
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if healthy is not None:
+                get_health_watcher().discard(self._container_name, healthy)
         
-        # If we reach here, we've exhausted all retries
+        # If we reach here, the sandbox did not become ready in time
         # Note: We log the error but don't raise an exception because:
         # 1. Some services may start asynchronously after this check
         # 2. The sandbox may still be partially functional for basic operations
         # 3. Raising would prevent any agent operations even if core services work
         # The calling code handles degraded sandbox functionality gracefully
-        error_message = f"Sandbox services failed to start after {max_retries} attempts ({max_retries * retry_interval} seconds)"
+        error_message = f"Sandbox services failed to start after {max_wait_seconds} seconds"
         logger.error(error_message)
         logger.warning("Continuing with potentially degraded sandbox functionality")
 
+    async def health_check(self) -> bool:
+        """Check once whether all supervisor services are RUNNING"""
+        try:
+            response = await self.client.get(f"{self.base_url}/api/v1/supervisor/status", timeout=STATUS_TIMEOUT)
+            response.raise_for_status()
+            tool_result = ToolResult(**response.json())
+        except Exception as e:
+            logger.debug(f"Sandbox {self.id} health check failed: {str(e)}")
+            return False
+        services = tool_result.data or []
+        return tool_result.success and bool(services) and all(
+            service.get("statename") == "RUNNING" for service in services
+        )
+
     async def exec_command(self, session_id: str, exec_dir: str, command: str) -> ToolResult:
         response = await self.client.post(
             f"{self.base_url}/api/v1/shell/exec",
@@ -188,7 +310,8 @@ class DockerSandbox(Sandbox):
                 "id": session_id,
                 "exec_dir": exec_dir,
                 "command": command
-            }
+            },
+            timeout=EXEC_TIMEOUT
         )
         return ToolResult(**response.json())
 
@@ -208,7 +331,8 @@ class DockerSandbox(Sandbox):
             json={
                 "id": session_id,
                 "seconds": seconds
-            }
+            },
+            timeout=process_wait_timeout(seconds)
         )
         return ToolResult(**response.json())
 
@@ -368,7 +492,8 @@ class DockerSandbox(Sandbox):
                 "file": file,
                 "regex": regex,
                 "sudo": sudo
-            }
+            },
+            timeout=SEARCH_TIMEOUT
         )
         return ToolResult(**response.json())
 
@@ -387,7 +512,8 @@ class DockerSandbox(Sandbox):
             json={
                 "path": path,
                 "glob": glob_pattern
-            }
+            },
+            timeout=SEARCH_TIMEOUT
         )
         return ToolResult(**response.json())
 
@@ -409,7 +535,8 @@ class DockerSandbox(Sandbox):
         response = await self.client.post(
             f"{self.base_url}/api/v1/file/upload",
             files=files,
-            data=data
+            data=data,
+            timeout=TRANSFER_TIMEOUT
         )
         return ToolResult(**response.json())
 
@@ -424,7 +551,8 @@ class DockerSandbox(Sandbox):
         """
         response = await self.client.get(
             f"{self.base_url}/api/v1/file/download",
-            params={"path": path}
+            params={"path": path},
+            timeout=TRANSFER_TIMEOUT
         )
         response.raise_for_status()
 
@@ -474,27 +602,30 @@ class DockerSandbox(Sandbox):
     async def destroy(self) -> bool:
         """Destroy Docker sandbox"""
         try:
-            if self.client:
-                await self.client.aclose()
-            if self.container_name:
-                docker_client = docker.from_env()
-                docker_client.containers.get(self.container_name).remove(force=True)
+            self._destroyed = True
+            if self._client is not None:
+                self._client = None
+                await release_client(self.base_url)
+            if self._container_name:
+                await run_docker(DockerSandbox._remove_container, self._container_name)
             return True
         except Exception as e:
             logger.error(f"Failed to destroy Docker sandbox: {str(e)}")
             return False
     
     async def get_browser(self) -> Browser:
-        """Get browser instance
+        """Get browser instance, extracting page content with the extraction LLM
         
-        Args:
-            llm: LLM instance used for browser automation
-            
         Returns:
             Browser: Returns a configured PlaywrightBrowser instance
                     connected using the sandbox's CDP URL
         """
-        return PlaywrightBrowser(self.cdp_url)
+        return PlaywrightBrowser(
+            self.cdp_url,
+            get_llm(LLMRole.EXTRACTION),
+            get_playwright_driver(),
+            extraction_cache=get_page_extraction_cache(),
+        )
 
     @staticmethod
     @alru_cache(maxsize=128, typed=True)
@@ -546,7 +677,7 @@ class DockerSandbox(Sandbox):
             ip = await cls._resolve_hostname_to_ip(settings.sandbox_address)
             return DockerSandbox(ip=ip)
     
-        return await asyncio.to_thread(DockerSandbox._create_task)
+        return await run_docker(DockerSandbox._create_task)
     
     @classmethod
     @alru_cache(maxsize=128, typed=True)
@@ -564,10 +695,6 @@ class DockerSandbox(Sandbox):
             ip = await cls._resolve_hostname_to_ip(settings.sandbox_address)
             return DockerSandbox(ip=ip, container_name=id)
 
-        docker_client = docker.from_env()
-        container = docker_client.containers.get(id)
-        container.reload()
-        
-        ip_address = cls._get_container_ip(container)
+        ip_address = await run_docker(cls._get_container_ip_by_name, id)
         logger.info(f"IP address: {ip_address}")
         return DockerSandbox(ip=ip_address, container_name=id)
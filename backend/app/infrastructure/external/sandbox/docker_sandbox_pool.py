@@ -0,0 +1,185 @@
+import asyncio
+import time
+import logging
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, Optional, Set
+
+from app.core.config import get_settings
+from app.domain.external.sandbox import Sandbox, SandboxPool
+from app.infrastructure.external.sandbox.docker_sandbox import DockerSandbox
+
+logger = logging.getLogger(__name__)
+
+
+class DockerSandboxPool(SandboxPool):
+    """Pool of Docker sandboxes booted and health-checked ahead of time
+
+    The pool keeps at least min_idle ready sandboxes and boots more while callers are
+    waiting, never holding more than max_total idle plus booting sandboxes. A caller
+    finding the pool empty waits for a booting sandbox, and falls back to creating one
+    directly when none is booting or the wait times out.
+    """
+
+    def __init__(
+        self,
+        min_idle: Optional[int] = None,
+        max_total: Optional[int] = None,
+        health_check_interval_seconds: Optional[int] = None,
+        acquire_timeout_seconds: Optional[int] = None,
+    ):
+        settings = get_settings()
+        self._min_idle = min_idle if min_idle is not None else settings.sandbox_pool_min_idle
+        self._max_total = max(max_total if max_total is not None else settings.sandbox_pool_max_total, self._min_idle)
+        self._health_check_interval = health_check_interval_seconds or settings.sandbox_pool_health_check_interval_seconds
+        self._acquire_timeout = acquire_timeout_seconds or settings.sandbox_pool_acquire_timeout_seconds
+        self._idle: Deque[DockerSandbox] = deque()
+        self._ready = asyncio.Condition()
+        self._booting = 0
+        self._waiters = 0
+        self._boot_tasks: Set[asyncio.Task] = set()
+        self._maintain_task: Optional[asyncio.Task] = None
+        # Metrics
+        self._hits = 0
+        self._waits = 0
+        self._misses = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether sandboxes are booted ahead of time"""
+        # A fixed sandbox address has nothing to boot
+        return self._min_idle > 0 and not get_settings().sandbox_address
+
+    async def start(self) -> None:
+        """Boot the initial sandboxes and start the background health checks"""
+        if not self.enabled or self._maintain_task is not None:
+            return
+        self._replenish()
+        self._maintain_task = asyncio.create_task(self._maintain())
+        logger.info(f"Sandbox pool started with min_idle={self._min_idle}, max_total={self._max_total}")
+
+    async def stop(self) -> None:
+        """Stop booting sandboxes and destroy the idle ones"""
+        tasks = list(self._boot_tasks)
+        if self._maintain_task is not None:
+            tasks.append(self._maintain_task)
+            self._maintain_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while self._idle:
+            await self._idle.popleft().destroy()
+        logger.info("Sandbox pool stopped")
+
+    async def acquire(self) -> Sandbox:
+        """Take a ready sandbox out of the pool, creating one if none is available"""
+        if self._maintain_task is None:
+            return await DockerSandbox.create()
+
+        start = time.monotonic()
+        waited = False
+        async with self._ready:
+            if not self._idle:
+                waited = True
+                self._waiters += 1
+                self._replenish()
+                try:
+                    await asyncio.wait_for(
+                        self._ready.wait_for(lambda: self._idle or not self._booting),
+                        timeout=self._acquire_timeout
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self._waiters -= 1
+            sandbox = self._idle.popleft() if self._idle else None
+        wait_seconds = time.monotonic() - start
+        self._replenish()
+
+        if sandbox is None:
+            self._misses += 1
+            logger.info(f"Sandbox pool miss after {wait_seconds:.1f}s, creating sandbox directly")
+            return await DockerSandbox.create()
+        if waited:
+            self._waits += 1
+            self._total_wait_seconds += wait_seconds
+            self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+        else:
+            self._hits += 1
+        logger.info(f"Sandbox pool handed out {sandbox.id} after {wait_seconds:.1f}s")
+        return sandbox
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get pool size and hit/miss/wait-time counters"""
+        return {
+            "enabled": self.enabled,
+            "idle": len(self._idle),
+            "booting": self._booting,
+            "hits": self._hits,
+            "waits": self._waits,
+            "misses": self._misses,
+            "avg_wait_seconds": self._total_wait_seconds / self._waits if self._waits else 0.0,
+            "max_wait_seconds": self._max_wait_seconds,
+        }
+
+    def _replenish(self) -> None:
+        """Boot sandboxes until the pool reaches its target size"""
+        target = min(self._min_idle + self._waiters, self._max_total)
+        while len(self._idle) + self._booting < target:
+            self._booting += 1
+            task = asyncio.create_task(self._boot())
+            self._boot_tasks.add(task)
+            task.add_done_callback(self._boot_tasks.discard)
+
+    async def _boot(self) -> None:
+        sandbox: Optional[DockerSandbox] = None
+        try:
+            sandbox = await DockerSandbox.create()
+            await sandbox.ensure_sandbox()
+            if not await sandbox.health_check():
+                logger.warning(f"Discarding sandbox {sandbox.id} that failed to become ready")
+                await sandbox.destroy()
+                sandbox = None
+        except asyncio.CancelledError:
+            if sandbox is not None:
+                await sandbox.destroy()
+            sandbox = None
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to boot pool sandbox: {str(e)}")
+            sandbox = None
+        finally:
+            async with self._ready:
+                self._booting -= 1
+                if sandbox is not None:
+                    self._idle.append(sandbox)
+                # Also wake waiters when booting failed so they can fall back
+                self._ready.notify_all()
+
+    async def _maintain(self) -> None:
+        while True:
+            await asyncio.sleep(self._health_check_interval)
+            try:
+                await self._check_idle()
+                self._replenish()
+            except Exception as e:
+                logger.warning(f"Sandbox pool maintenance failed: {str(e)}")
+
+    async def _check_idle(self) -> None:
+        """Drop idle sandboxes whose container stopped or became unhealthy"""
+        for sandbox in list(self._idle):
+            if await sandbox.health_check():
+                continue
+            # It may have been handed out during the check
+            if sandbox in self._idle:
+                self._idle.remove(sandbox)
+                logger.warning(f"Removed unhealthy sandbox {sandbox.id} from pool")
+                await sandbox.destroy()
+
+
+@lru_cache()
+def get_sandbox_pool() -> DockerSandboxPool:
+    """Get the sandbox pool instance."""
+    return DockerSandboxPool()
@@ -0,0 +1,83 @@
+import logging
+from typing import Dict, Tuple
+import httpx
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Per-operation timeouts, connect failures always surface quickly
+CONNECT_TIMEOUT = 5.0
+STATUS_TIMEOUT = httpx.Timeout(5.0)
+FILE_TIMEOUT = httpx.Timeout(30.0, connect=CONNECT_TIMEOUT)
+EXEC_TIMEOUT = httpx.Timeout(120.0, connect=CONNECT_TIMEOUT)
+# Content search and find walk whole directory trees
+SEARCH_TIMEOUT = httpx.Timeout(600.0, connect=CONNECT_TIMEOUT)
+TRANSFER_TIMEOUT = httpx.Timeout(600.0, connect=CONNECT_TIMEOUT)
+# Default wait of the sandbox shell API plus slack for the response
+DEFAULT_PROCESS_WAIT_SECONDS = 60
+PROCESS_WAIT_SLACK_SECONDS = 30
+
+# Shared clients keyed by sandbox base URL, with the number of sandboxes using each
+_clients: Dict[str, Tuple[httpx.AsyncClient, int]] = {}
+
+
+def process_wait_timeout(seconds: int | None) -> httpx.Timeout:
+    """Get the timeout of a call waiting up to seconds for a sandbox process"""
+    wait_seconds = seconds if seconds is not None else DEFAULT_PROCESS_WAIT_SECONDS
+    return httpx.Timeout(wait_seconds + PROCESS_WAIT_SLACK_SECONDS, connect=CONNECT_TIMEOUT)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("SANDBOX_HTTP2 is enabled but the h2 package is not installed, using HTTP/1.1")
+        return False
+
+
+def _create_client() -> httpx.AsyncClient:
+    settings = get_settings()
+    return httpx.AsyncClient(
+        timeout=FILE_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.sandbox_max_connections,
+            max_keepalive_connections=settings.sandbox_max_keepalive_connections,
+            keepalive_expiry=settings.sandbox_keepalive_expiry_seconds,
+        ),
+        http2=settings.sandbox_http2 and _http2_available(),
+    )
+
+
+def acquire_client(base_url: str) -> httpx.AsyncClient:
+    """Get the pooled client of a sandbox address, creating it on first use
+
+    Every acquire_client must be paired with a release_client.
+    """
+    client, users = _clients.get(base_url, (None, 0))
+    if client is None or client.is_closed:
+        client = _create_client()
+    _clients[base_url] = (client, users + 1)
+    return client
+
+
+async def release_client(base_url: str) -> None:
+    """Release a client, closing its connections once no sandbox uses the address"""
+    client, users = _clients.get(base_url, (None, 0))
+    if client is None:
+        return
+    if users > 1:
+        _clients[base_url] = (client, users - 1)
+        return
+    del _clients[base_url]
+    await client.aclose()
+    logger.debug(f"Closed sandbox HTTP client for {base_url}")
+
+
+async def close_all_clients() -> None:
+    """Close every pooled client"""
+    clients = [client for client, _ in _clients.values()]
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
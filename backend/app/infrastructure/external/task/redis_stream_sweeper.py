@@ -0,0 +1,92 @@
+import asyncio
+import time
+import logging
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from app.core.config import get_settings
+from app.infrastructure.storage.redis import get_redis
+from app.infrastructure.external.task.redis_task_registry import get_task_registry
+
+logger = logging.getLogger(__name__)
+
+TASK_STREAM_PATTERN = "task:*"
+SCAN_COUNT = 500
+
+
+class RedisStreamSweeper:
+    """Background sweeper deleting task streams that were left without an expiry
+
+    Streams of finished tasks get a TTL in RedisStreamTask._on_task_done, but a node that
+    crashes or is killed mid-task never gets there. The sweeper deletes such streams once
+    no entry has been added to them for the configured orphan age.
+    """
+
+    def __init__(self, interval_seconds: Optional[int] = None, orphan_seconds: Optional[int] = None):
+        settings = get_settings()
+        self._redis = get_redis()
+        self._interval_seconds = interval_seconds or settings.redis_stream_sweep_interval_seconds
+        self._orphan_seconds = orphan_seconds or settings.redis_stream_orphan_seconds
+        self._sweep_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start sweeping periodically in the background"""
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._run())
+            logger.info(f"Redis stream sweeper started, interval {self._interval_seconds}s")
+
+    async def stop(self) -> None:
+        """Stop the background sweeping"""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+            logger.info("Redis stream sweeper stopped")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval_seconds)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.warning(f"Redis stream sweep failed: {e}")
+
+    async def sweep(self) -> Tuple[int, int]:
+        """Delete orphaned task streams once
+
+        Returns:
+            Tuple[int, int]: (Number of deleted streams, Reclaimed bytes)
+        """
+        client = self._redis.client
+        orphan_before_ms = int((time.time() - self._orphan_seconds) * 1000)
+        deleted_streams = 0
+        reclaimed_bytes = 0
+        async for key in client.scan_iter(match=TASK_STREAM_PATTERN, count=SCAN_COUNT, _type="stream"):
+            # Streams with an expiry are already taken care of
+            if await client.ttl(key) != -1:
+                continue
+            task_id = key.split(":", 2)[-1]
+            # Still running on some node
+            if await get_task_registry().get_owner(task_id) is not None:
+                continue
+            info = await client.xinfo_stream(key)
+            last_entry_ms = int(info["last-generated-id"].split("-")[0])
+            if last_entry_ms > orphan_before_ms:
+                continue
+            size = await client.memory_usage(key) or 0
+            if await client.delete(key):
+                deleted_streams += 1
+                reclaimed_bytes += size
+                logger.debug(f"Deleted orphaned stream {key} ({size} bytes)")
+        if deleted_streams:
+            logger.info(f"Redis stream sweeper deleted {deleted_streams} orphaned streams, reclaimed {reclaimed_bytes} bytes")
+        return deleted_streams, reclaimed_bytes
+
+
+@lru_cache()
+def get_stream_sweeper() -> RedisStreamSweeper:
+    """Get the Redis stream sweeper instance."""
+    return RedisStreamSweeper()
@@ -3,14 +3,29 @@ import uuid
 import logging
 from typing import Optional, Dict
 
+from app.core.config import get_settings
 from app.domain.external.task import Task, TaskRunner
 from app.infrastructure.external.message_queue.redis_stream_queue import RedisStreamQueue, MessageQueue
+from app.infrastructure.external.message_queue.redis_stream_group_queue import RedisStreamGroupQueue
+from app.infrastructure.external.task.redis_task_registry import get_task_registry
 
 logger = logging.getLogger(__name__)
 
 
+def _input_stream_name(task_id: str) -> str:
+    return f"task:input:{task_id}"
+
+
+def _output_stream_name(task_id: str) -> str:
+    return f"task:output:{task_id}"
+
+
 class RedisStreamTask(Task):
-    """Redis Stream-based task implementation following the Task protocol."""
+    """Redis Stream-based task implementation following the Task protocol.
+    
+    Running tasks are recorded in the Redis task registry, so a task started on one
+    backend node can be found, fed and cancelled from any other node.
+    """
     
     _task_registry: Dict[str, 'RedisStreamTask'] = {}
     
@@ -25,10 +40,8 @@ class RedisStreamTask(Task):
         self._execution_task: Optional[asyncio.Task] = None
         
         # Create input/output streams based on task ID
-        input_stream_name = f"task:input:{self._id}"
-        output_stream_name = f"task:output:{self._id}"
-        self._input_stream = RedisStreamQueue(input_stream_name)
-        self._output_stream = RedisStreamQueue(output_stream_name)
+        self._input_stream = RedisStreamGroupQueue(_input_stream_name(self._id))
+        self._output_stream = RedisStreamQueue(_output_stream_name(self._id))
         
         # Register task instance
         RedisStreamTask._task_registry[self._id] = self
@@ -52,7 +65,16 @@ class RedisStreamTask(Task):
     async def run(self) -> None:
         """Run the task using the provided TaskRunner."""
         if self.done:
+            # The streams may carry an expiry from a previous run, clear it before any event is written
+            await self._persist_streams()
+            if not self.done:
+                # Started by a concurrent call meanwhile
+                return
             self._execution_task = asyncio.create_task(self._execute_task())
+            try:
+                await get_task_registry().register(self._id, self.cancel)
+            except Exception as e:
+                logger.warning(f"Failed to register task {self._id} in the task registry: {e}")
             logger.info(f"Task {self._id} execution started")
     
     def cancel(self) -> bool:
@@ -85,14 +107,42 @@ class RedisStreamTask(Task):
         self._task_done = True
         if self._runner:
             asyncio.create_task(self._runner.on_done(self))
+        asyncio.create_task(self._expire_streams())
         self._cleanup_registry()
     
+    async def _expire_streams(self) -> None:
+        """Let the streams of a finished task expire so Redis memory does not grow with every session"""
+        if not self.done:
+            # Restarted before the expiry was applied
+            return
+        ttl_seconds = get_settings().redis_stream_ttl_seconds
+        try:
+            await self._input_stream.expire(ttl_seconds)
+            await self._output_stream.expire(ttl_seconds)
+            logger.debug(f"Task {self._id} streams expire in {ttl_seconds}s")
+        except Exception as e:
+            logger.warning(f"Failed to set expiry on streams of task {self._id}: {e}")
+    
+    async def _persist_streams(self) -> None:
+        try:
+            await self._input_stream.persist()
+            await self._output_stream.persist()
+        except Exception as e:
+            logger.warning(f"Failed to remove expiry from streams of task {self._id}: {e}")
+    
     def _cleanup_registry(self) -> None:
         """Remove this task from the registry."""
         if self._id in RedisStreamTask._task_registry:
             del RedisStreamTask._task_registry[self._id]
+            asyncio.create_task(self._unregister())
             logger.info(f"Task {self._id} removed from registry")
     
+    async def _unregister(self) -> None:
+        try:
+            await get_task_registry().unregister(self._id)
+        except Exception as e:
+            logger.warning(f"Failed to unregister task {self._id} from the task registry: {e}")
+    
     async def _execute_task(self):
         """Execute the task using the TaskRunner."""
         try:
@@ -105,13 +155,27 @@ class RedisStreamTask(Task):
             self._on_task_done()
     
     @classmethod
-    def get(cls, task_id: str) -> Optional['RedisStreamTask']:
+    async def get(cls, task_id: str) -> Optional[Task]:
         """Get a task by its ID.
 
+        Tasks running on another node are returned as a RemoteStreamTask.
+
         Returns:
-            Optional[RedisStreamTask]: Task instance if found, None otherwise
+            Optional[Task]: Task instance if found, None otherwise
         """
-        return cls._task_registry.get(task_id)
+        task = cls._task_registry.get(task_id)
+        if task is not None:
+            return task
+        registry = get_task_registry()
+        try:
+            owner = await registry.get_owner(task_id)
+        except Exception as e:
+            logger.warning(f"Failed to look up owner of task {task_id}: {e}")
+            return None
+        # A task of this node missing from the local registry has just finished
+        if owner is None or owner == registry.node_id:
+            return None
+        return RemoteStreamTask(task_id, owner)
     
     @classmethod
     def create(cls, runner: TaskRunner) -> "RedisStreamTask":
@@ -128,8 +192,7 @@ class RedisStreamTask(Task):
     @classmethod
     async def destroy(cls) -> None:
         """Destroy all task instances."""
-        for task_id in cls._task_registry:
-            task = cls._task_registry[task_id]
+        for task in list(cls._task_registry.values()):
             task.cancel()
             if task._runner:
                 await task._runner.destroy()
@@ -137,4 +200,61 @@ class RedisStreamTask(Task):
     
     def __repr__(self) -> str:
         """String representation of the task."""
-        return f"RedisStreamTask(id={self._id}, done={self.done})"
\ No newline at end of file
+        return f"RedisStreamTask(id={self._id}, done={self.done})"
+
+
+class RemoteStreamTask(Task):
+    """Handle on a task running on another backend node.
+    
+    Input and output go through the task's Redis streams, which the owning node reads
+    and writes, and cancellation is forwarded to the owner through the task registry.
+    """
+    
+    def __init__(self, task_id: str, owner: str):
+        self._id = task_id
+        self._owner = owner
+        self._input_stream = RedisStreamGroupQueue(_input_stream_name(task_id))
+        self._output_stream = RedisStreamQueue(_output_stream_name(task_id))
+    
+    @property
+    def id(self) -> str:
+        """Task ID."""
+        return self._id
+    
+    @property
+    def done(self) -> bool:
+        """A remote task is only found while its owner reports it running."""
+        return False
+    
+    async def run(self) -> None:
+        """Nothing to do, the owning node consumes the input stream."""
+        logger.debug(f"Task {self._id} already running on node {self._owner}")
+    
+    def cancel(self) -> bool:
+        """Ask the owning node to cancel the task.
+
+        Returns:
+            bool: Always True since the request is sent asynchronously
+        """
+        asyncio.create_task(self._request_cancel())
+        return True
+    
+    async def _request_cancel(self) -> None:
+        try:
+            await get_task_registry().request_cancel(self._id)
+        except Exception as e:
+            logger.warning(f"Failed to request cancellation of task {self._id}: {e}")
+    
+    @property
+    def input_stream(self) -> MessageQueue:
+        """Input stream."""
+        return self._input_stream
+    
+    @property
+    def output_stream(self) -> MessageQueue:
+        """Output stream."""
+        return self._output_stream
+    
+    def __repr__(self) -> str:
+        """String representation of the task."""
+        return f"RemoteStreamTask(id={self._id}, owner={self._owner})"
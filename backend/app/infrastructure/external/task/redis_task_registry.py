@@ -0,0 +1,153 @@
+import asyncio
+import os
+import socket
+import uuid
+import logging
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+from redis.asyncio.client import PubSub
+
+from app.infrastructure.storage.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+OWNER_KEY_PREFIX = "task:owner:"
+CANCEL_CHANNEL = "task:cancel"
+# Ownership expires unless the owning node refreshes it, so tasks of a dead node disappear
+OWNER_TTL_SECONDS = 30
+HEARTBEAT_INTERVAL_SECONDS = 10
+RECONNECT_DELAY_SECONDS = 1
+
+# Only delete the ownership if it still belongs to this node
+RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class RedisTaskRegistry:
+    """Redis-backed registry recording which backend node runs each task
+
+    Every node writes a task:owner:{task_id} key with a short TTL for the tasks it runs
+    and refreshes it from a heartbeat loop. Any node can look up the owner of a task and
+    ask it to cancel the task through a shared pub/sub channel.
+    """
+
+    def __init__(self):
+        self._redis = get_redis()
+        self._node_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._local_tasks: Dict[str, Callable[[], bool]] = {}
+        self._release_script = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._cancel_listener_task: Optional[asyncio.Task] = None
+
+    @property
+    def node_id(self) -> str:
+        """ID of this backend node"""
+        return self._node_id
+
+    @staticmethod
+    def _owner_key(task_id: str) -> str:
+        return f"{OWNER_KEY_PREFIX}{task_id}"
+
+    async def start(self) -> None:
+        """Start the heartbeat and the cancel listener"""
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        if self._cancel_listener_task is None or self._cancel_listener_task.done():
+            self._cancel_listener_task = asyncio.create_task(self._listen_cancel())
+        logger.info(f"Task registry started on node {self._node_id}")
+
+    async def stop(self) -> None:
+        """Stop background loops and release every task owned by this node"""
+        for task in (self._heartbeat_task, self._cancel_listener_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._heartbeat_task = None
+        self._cancel_listener_task = None
+        for task_id in list(self._local_tasks):
+            try:
+                await self.unregister(task_id)
+            except Exception as e:
+                logger.warning(f"Failed to release task {task_id}: {e}")
+        logger.info(f"Task registry stopped on node {self._node_id}")
+
+    async def register(self, task_id: str, cancel: Callable[[], bool]) -> None:
+        """Record this node as the owner of a running task
+
+        Args:
+            task_id: Task ID
+            cancel: Called when another node asks to cancel the task
+        """
+        self._local_tasks[task_id] = cancel
+        await self._redis.client.set(self._owner_key(task_id), self._node_id, ex=OWNER_TTL_SECONDS)
+
+    async def unregister(self, task_id: str) -> None:
+        """Release the ownership of a task that is no longer running on this node"""
+        self._local_tasks.pop(task_id, None)
+        if self._release_script is None:
+            self._release_script = self._redis.client.register_script(RELEASE_SCRIPT)
+        await self._release_script(keys=[self._owner_key(task_id)], args=[self._node_id], client=self._redis.client)
+
+    async def get_owner(self, task_id: str) -> Optional[str]:
+        """Get the node running a task
+
+        Returns:
+            Optional[str]: Node ID, None if the task is not running on any live node
+        """
+        return await self._redis.client.get(self._owner_key(task_id))
+
+    async def request_cancel(self, task_id: str) -> None:
+        """Ask the node owning a task to cancel it"""
+        receivers = await self._redis.client.publish(CANCEL_CHANNEL, task_id)
+        logger.info(f"Requested cancellation of task {task_id} from {receivers} nodes")
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL_SECONDS)
+            if not self._local_tasks:
+                continue
+            try:
+                async with self._redis.client.pipeline(transaction=False) as pipe:
+                    for task_id in self._local_tasks:
+                        pipe.set(self._owner_key(task_id), self._node_id, ex=OWNER_TTL_SECONDS)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Task registry heartbeat failed: {e}")
+
+    async def _listen_cancel(self) -> None:
+        while True:
+            pubsub: Optional[PubSub] = None
+            try:
+                pubsub = self._redis.client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(CANCEL_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    cancel = self._local_tasks.get(message["data"])
+                    if cancel is not None:
+                        logger.info(f"Cancelling task {message['data']} on request of another node")
+                        cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Task cancel subscription lost, reconnecting: {e}")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.reset()
+                    except Exception:
+                        pass
+
+
+@lru_cache()
+def get_task_registry() -> RedisTaskRegistry:
+    """Get the task registry instance."""
+    return RedisTaskRegistry()
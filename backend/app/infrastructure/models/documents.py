@@ -1,11 +1,11 @@
 from typing import Dict, Optional, List, Type, TypeVar, Generic, get_args, Self
 from datetime import datetime, timezone, UTC
 from beanie import Document
-from pydantic import BaseModel
-from app.domain.models.agent import Agent
+from pydantic import BaseModel, Field
+from app.domain.models.agent import Agent, TokenUsage
 from app.domain.models.memory import Memory
 from app.domain.models.event import AgentEvent
-from app.domain.models.session import Session, SessionStatus
+from app.domain.models.session import Session, SessionStatus, SessionSummary
 from app.domain.models.file import FileInfo
 from app.domain.models.user import User, UserRole
 from pymongo import IndexModel, ASCENDING, DESCENDING
@@ -70,6 +70,7 @@ class AgentDocument(BaseDocument[Agent], id_field="agent_id", domain_model_class
     temperature: float
     max_tokens: int
     memories: Dict[str, Memory] = {}
+    usage: Dict[str, TokenUsage] = {}
     created_at: datetime = datetime.now(timezone.utc)
     updated_at: datetime = datetime.now(timezone.utc)
 
@@ -93,7 +94,6 @@ class SessionDocument(BaseDocument[Session], id_field="session_id", domain_model
     latest_message_at: Optional[datetime] = None
     created_at: datetime = datetime.now(timezone.utc)
     updated_at: datetime = datetime.now(timezone.utc)
-    events: List[AgentEvent]
     status: SessionStatus
     files: List[FileInfo] = []
     is_shared: Optional[bool] = False
@@ -107,6 +107,11 @@ class SessionDocument(BaseDocument[Session], id_field="session_id", domain_model
                 [("user_id", ASCENDING), ("created_at", DESCENDING)],
                 name="user_sessions_by_date"
             ),
+            # Compound index backing the session list sorted by latest message
+            IndexModel(
+                [("user_id", ASCENDING), ("latest_message_at", DESCENDING)],
+                name="user_sessions_by_latest_message"
+            ),
             # Index for shared sessions lookup
             IndexModel(
                 [("is_shared", ASCENDING), ("session_id", ASCENDING)],
@@ -118,4 +123,55 @@ class SessionDocument(BaseDocument[Session], id_field="session_id", domain_model
                 [("status", ASCENDING), ("updated_at", DESCENDING)],
                 name="sessions_by_status"
             ),
-        ]
\ No newline at end of file
+        ]
+
+class SessionSummaryView(BaseModel):
+    """Projection of the session fields needed for session lists, never loads files"""
+    session_id: str
+    title: Optional[str] = None
+    status: SessionStatus
+    unread_message_count: int = 0
+    latest_message: Optional[str] = None
+    latest_message_at: Optional[datetime] = None
+    is_shared: Optional[bool] = False
+
+    def to_domain(self) -> SessionSummary:
+        """Convert projection to domain read model"""
+        data = self.model_dump(exclude={'session_id'})
+        data['is_shared'] = bool(self.is_shared)
+        return SessionSummary(id=self.session_id, **data)
+
+
+class SessionOwnerView(BaseModel):
+    """Projection of the owner of a session"""
+    user_id: str
+
+
+class SessionEventDocument(Document):
+    """MongoDB document for a single session event, stored append-only"""
+    session_id: str
+    seq: int  # Monotonic position of the event within its session
+    event: AgentEvent
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+    class Settings:
+        name = "session_events"
+        indexes = [
+            # Unique position per session, also backs cursor-based paging
+            IndexModel(
+                [("session_id", ASCENDING), ("seq", ASCENDING)],
+                name="session_events_by_seq",
+                unique=True
+            ),
+            # Resolve an event ID cursor to its position
+            IndexModel(
+                [("session_id", ASCENDING), ("event.id", ASCENDING)],
+                name="session_events_by_event_id"
+            ),
+        ]
+
+
+class LegacySessionEventsView(BaseModel):
+    """Projection of the events array embedded in sessions created before session_events existed"""
+    session_id: str
+    events: List[AgentEvent] = []
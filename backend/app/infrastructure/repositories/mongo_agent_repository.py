@@ -1,6 +1,7 @@
 from typing import Optional, List
 from datetime import datetime, UTC
-from app.domain.models.agent import Agent
+from pymongo import UpdateOne
+from app.domain.models.agent import Agent, TokenUsage
 from app.domain.models.memory import Memory
 from app.domain.repositories.agent_repository import AgentRepository
 from app.infrastructure.models.documents import AgentDocument
@@ -53,14 +54,53 @@ class MongoAgentRepository(AgentRepository):
         )
         if not mongo_agent:
             raise ValueError(f"Agent {agent_id} not found")
-        return mongo_agent.memories.get(name, Memory(messages=[]))
+        memory = mongo_agent.memories.get(name)
+        if memory is None:
+            memory = Memory(messages=[])
+        memory.mark_saved()
+        return memory
     
     async def save_memory(self, agent_id: str, name: str, memory: Memory) -> None:
-        """Update the messages of a memory"""
+        """Write only what changed in a memory since it was loaded or last saved
+
+        New messages are $push'ed, compacted messages $set by index and rolled back
+        messages removed with $pop (or a $slice for several at once).
+        """
+        changes = memory.get_changes()
+        if changes.empty:
+            return
+        field = f"memories.{name}.messages"
+        agent_filter = {"agent_id": agent_id}
+        updated_at = {"updated_at": datetime.now(UTC)}
+        if changes.replace:
+            operations = [UpdateOne(agent_filter, {"$set": {f"memories.{name}": memory.model_dump(), **updated_at}})]
+        else:
+            operations = []
+            if changes.removed == 1:
+                operations.append(UpdateOne(agent_filter, {"$pop": {field: 1}}))
+            elif changes.removed:
+                # Several stored messages were rolled back, keep only the leading ones
+                operations.append(UpdateOne(agent_filter, {"$push": {field: {"$each": [], "$slice": changes.truncate_to}}}))
+            if changes.updated:
+                operations.append(UpdateOne(agent_filter, {"$set": {
+                    f"{field}.{index}": message for index, message in changes.updated.items()
+                }}))
+            if changes.appended:
+                operations.append(UpdateOne(agent_filter, {"$push": {field: {"$each": changes.appended}}}))
+            operations.append(UpdateOne(agent_filter, {"$set": updated_at}))
+        # Updates of the same array conflict within one operation, run them in order in one round trip
+        result = await AgentDocument.get_pymongo_collection().bulk_write(operations, ordered=True)
+        if not result.matched_count:
+            raise ValueError(f"Agent {agent_id} not found")
+        memory.mark_saved()
+
+    async def add_usage(self, agent_id: str, name: str, usage: TokenUsage) -> None:
+        """Add token usage of one of the agent's LLM requests to its totals"""
         result = await AgentDocument.find_one(
             AgentDocument.agent_id == agent_id
-        ).update(
-            {"$set": {f"memories.{name}": memory, "updated_at": datetime.now(UTC)}}
-        )
+        ).update({
+            "$inc": {f"usage.{name}.{field}": value for field, value in usage.model_dump().items()},
+            "$set": {"updated_at": datetime.now(UTC)},
+        })
         if not result:
             raise ValueError(f"Agent {agent_id} not found")
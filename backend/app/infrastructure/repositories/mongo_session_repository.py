@@ -1,17 +1,71 @@
 from typing import Optional, List
+from async_lru import alru_cache
 from datetime import datetime, UTC
-from app.domain.models.session import Session, SessionStatus
+from app.domain.models.session import Session, SessionStatus, SessionSummary
 from app.domain.models.file import FileInfo
 from app.domain.repositories.session_repository import SessionRepository
-from app.domain.models.event import BaseEvent
-from app.infrastructure.models.documents import SessionDocument
+from app.domain.models.event import BaseEvent, AgentEvent
+from app.domain.external.notification import SessionNotifier
+from app.infrastructure.models.documents import (
+    SessionDocument,
+    SessionEventDocument,
+    SessionSummaryView,
+    SessionOwnerView,
+    LegacySessionEventsView,
+)
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Number of attempts to allocate a sequence number when concurrent writers race on the same session
+ADD_EVENT_MAX_ATTEMPTS = 5
+# Legacy sessions fetched per cursor batch by the event migration
+MIGRATION_BATCH_SIZE = 20
+
 class MongoSessionRepository(SessionRepository):
-    """MongoDB implementation of SessionRepository"""
-    
+    """MongoDB implementation of SessionRepository
+
+    Mutations that affect the session list are published through the optional
+    notifier so that session list streams can push updates instead of polling.
+    """
+
+    def __init__(self, notifier: Optional[SessionNotifier] = None):
+        self._notifier = notifier
+
+    @staticmethod
+    @alru_cache(maxsize=4096)
+    async def _find_session_owner(session_id: str) -> str:
+        """Get the user ID owning a session, cached since ownership never changes
+
+        Raises:
+            LookupError: If the session does not exist (yet), which is not cached
+        """
+        owner = await SessionDocument.find_one(
+            SessionDocument.session_id == session_id
+        ).project(SessionOwnerView)
+        if not owner:
+            raise LookupError(session_id)
+        return owner.user_id
+
+    async def _get_session_owner(self, session_id: str) -> Optional[str]:
+        try:
+            return await self._find_session_owner(session_id)
+        except LookupError:
+            return None
+
+    async def _notify_change(self, session_id: str, user_id: Optional[str] = None) -> None:
+        """Publish a session change to its owner, never failing the write itself"""
+        if not self._notifier:
+            return
+        try:
+            user_id = user_id or await self._get_session_owner(session_id)
+            if user_id:
+                await self._notifier.publish(user_id, session_id)
+        except Exception as e:
+            logger.warning(f"Failed to publish change of session {session_id}: {e}")
+
     async def save(self, session: Session) -> None:
         """Save or update a session"""
         mongo_session = await SessionDocument.find_one(
@@ -21,11 +75,13 @@ class MongoSessionRepository(SessionRepository):
         if not mongo_session:
             mongo_session = SessionDocument.from_domain(session)
             await mongo_session.save()
+            await self._notify_change(session.id, session.user_id)
             return
         
         # Update fields from session domain model
         mongo_session.update_from_domain(session)
         await mongo_session.save()
+        await self._notify_change(session.id, session.user_id)
 
 
     async def find_by_id(self, session_id: str) -> Optional[Session]:
@@ -42,6 +98,14 @@ class MongoSessionRepository(SessionRepository):
         ).sort("-latest_message_at").to_list()
         return [mongo_session.to_domain() for mongo_session in mongo_sessions]
     
+    async def find_summaries_by_user_id(self, user_id: str, session_ids: Optional[List[str]] = None) -> List[SessionSummary]:
+        """Find session summaries for a specific user using a projection"""
+        query = SessionDocument.find(SessionDocument.user_id == user_id)
+        if session_ids is not None:
+            query = query.find({"session_id": {"$in": session_ids}})
+        summary_views = await query.sort("-latest_message_at").project(SessionSummaryView).to_list()
+        return [summary_view.to_domain() for summary_view in summary_views]
+
     async def find_by_id_and_user_id(self, session_id: str, user_id: str) -> Optional[Session]:
         """Find a session by ID and user ID (for authorization)"""
         mongo_session = await SessionDocument.find_one(
@@ -59,6 +123,7 @@ class MongoSessionRepository(SessionRepository):
         )
         if not result:
             raise ValueError(f"Session {session_id} not found")
+        await self._notify_change(session_id)
 
     async def update_latest_message(self, session_id: str, message: str, timestamp: datetime) -> None:
         """Update the latest message of a session"""
@@ -69,16 +134,107 @@ class MongoSessionRepository(SessionRepository):
         )
         if not result:
             raise ValueError(f"Session {session_id} not found")
+        await self._notify_change(session_id)
 
     async def add_event(self, session_id: str, event: BaseEvent) -> None:
-        """Add an event to a session"""
+        """Append an event to the session_events collection"""
         result = await SessionDocument.find_one(
             SessionDocument.session_id == session_id
         ).update(
-            {"$push": {"events": event.model_dump()}, "$set": {"updated_at": datetime.now(UTC)}}
+            {"$set": {"updated_at": datetime.now(UTC)}}
         )
         if not result:
             raise ValueError(f"Session {session_id} not found")
+
+        for _ in range(ADD_EVENT_MAX_ATTEMPTS):
+            last_event = await SessionEventDocument.find(
+                SessionEventDocument.session_id == session_id
+            ).sort("-seq").limit(1).to_list()
+            seq = last_event[0].seq + 1 if last_event else 0
+            try:
+                await SessionEventDocument(session_id=session_id, seq=seq, event=event).insert()
+                return
+            except DuplicateKeyError:
+                # Another writer took this position, read the new tail and retry
+                logger.debug(f"Event sequence {seq} of session {session_id} already taken, retrying")
+        raise RuntimeError(f"Failed to add event to session {session_id} after {ADD_EVENT_MAX_ATTEMPTS} attempts")
+
+    async def get_events(self, session_id: str, after_id: Optional[str] = None, limit: Optional[int] = None) -> List[AgentEvent]:
+        """Get events of a session in insertion order, starting after the given event ID"""
+        query = SessionEventDocument.find(SessionEventDocument.session_id == session_id)
+        if after_id:
+            cursor_event = await SessionEventDocument.find_one(
+                SessionEventDocument.session_id == session_id,
+                {"event.id": after_id}
+            )
+            if not cursor_event:
+                logger.warning(f"Event cursor {after_id} not found in session {session_id}")
+                return []
+            query = query.find(SessionEventDocument.seq > cursor_event.seq)
+        query = query.sort("+seq")
+        if limit:
+            query = query.limit(limit)
+        return [event_document.event for event_document in await query.to_list()]
+
+    async def get_latest_event(self, session_id: str, event_type: str) -> Optional[AgentEvent]:
+        """Get the most recent event of the given type from a session"""
+        event_documents = await SessionEventDocument.find(
+            SessionEventDocument.session_id == session_id,
+            {"event.type": event_type}
+        ).sort("-seq").limit(1).to_list()
+        return event_documents[0].event if event_documents else None
+
+    async def clear_screenshot(self, session_id: str, file_id: str) -> None:
+        """Mark the browser screenshot with this file ID as missing in the events of a session"""
+        await SessionEventDocument.find(
+            SessionEventDocument.session_id == session_id,
+            {"event.tool_content.screenshot": file_id}
+        ).update_many(
+            {"$set": {"event.tool_content.screenshot": None}}
+        )
+
+    async def migrate_legacy_events(self) -> int:
+        """Move events embedded in session documents into the session_events collection
+
+        Safe to run on several nodes at once: events are upserted by (session_id, seq),
+        so a session migrated twice gets the same documents, and the embedded events are
+        only removed once they are all stored.
+
+        Returns:
+            int: Number of sessions migrated by this call
+        """
+        migrated = 0
+        events_collection = SessionEventDocument.get_pymongo_collection()
+        # Stream the sessions, one batch of them in memory at a time
+        legacy_sessions = SessionDocument.find(
+            {"events.0": {"$exists": True}},
+            batch_size=MIGRATION_BATCH_SIZE
+        ).project(LegacySessionEventsView)
+        async for legacy_session in legacy_sessions:
+            operations = [
+                UpdateOne(
+                    {"session_id": legacy_session.session_id, "seq": seq},
+                    {"$setOnInsert": SessionEventDocument(
+                        session_id=legacy_session.session_id, seq=seq, event=event
+                    ).model_dump(exclude={"id", "revision_id"})},
+                    upsert=True
+                )
+                for seq, event in enumerate(legacy_session.events)
+            ]
+            try:
+                await events_collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # Another node inserted the same events concurrently
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+            result = await SessionDocument.find_one(
+                SessionDocument.session_id == legacy_session.session_id,
+                {"events.0": {"$exists": True}}
+            ).update({"$unset": {"events": ""}})
+            if result and result.modified_count:
+                migrated += 1
+                logger.info(f"Migrated {len(legacy_session.events)} events of session {legacy_session.session_id}")
+        return migrated
     
     async def add_file(self, session_id: str, file_info: FileInfo) -> None:
         """Add a file to a session"""
@@ -121,6 +277,11 @@ class MongoSessionRepository(SessionRepository):
         )
         if mongo_session:
             await mongo_session.delete()
+        await SessionEventDocument.find(
+            SessionEventDocument.session_id == session_id
+        ).delete()
+        if mongo_session:
+            await self._notify_change(session_id, mongo_session.user_id)
 
     async def get_all(self) -> List[Session]:
         """Get all sessions"""
@@ -136,6 +297,7 @@ class MongoSessionRepository(SessionRepository):
         )
         if not result:
             raise ValueError(f"Session {session_id} not found")
+        await self._notify_change(session_id)
 
     async def update_unread_message_count(self, session_id: str, count: int) -> None:
         """Update the unread message count of a session"""
@@ -146,6 +308,7 @@ class MongoSessionRepository(SessionRepository):
         )
         if not result:
             raise ValueError(f"Session {session_id} not found")
+        await self._notify_change(session_id)
 
     async def increment_unread_message_count(self, session_id: str) -> None:
         """Atomically increment the unread message count of a session"""
@@ -156,6 +319,7 @@ class MongoSessionRepository(SessionRepository):
         )
         if not result:
             raise ValueError(f"Session {session_id} not found")
+        await self._notify_change(session_id)
 
     async def decrement_unread_message_count(self, session_id: str) -> None:
         """Atomically decrement the unread message count of a session"""
@@ -166,6 +330,7 @@ class MongoSessionRepository(SessionRepository):
         )
         if not result:
             raise ValueError(f"Session {session_id} not found")
+        await self._notify_change(session_id)
 
     async def update_shared_status(self, session_id: str, is_shared: bool) -> None:
         """Update the shared status of a session"""
@@ -176,4 +341,5 @@ class MongoSessionRepository(SessionRepository):
         )
         if not result:
             raise ValueError(f"Session {session_id} not found")
+        await self._notify_change(session_id)
 
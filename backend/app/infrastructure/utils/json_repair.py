@@ -0,0 +1,288 @@
+"""Tolerant JSON parser for LLM output.
+
+Parses the JSON object or array in a text, repairing what models commonly get wrong
+instead of failing:
+
+- Text or a markdown code fence around the JSON
+- Trailing, missing or repeated commas
+- Single-quoted strings and unquoted keys
+- Unescaped double quotes and raw newlines inside strings
+- Python literals (True, False, None) and comments
+- Output cut off in the middle, whose open strings, arrays and objects are closed
+
+Valid JSON parses to the same value as json.loads.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+WHITESPACE = " \t\r\n"
+# Characters that end a bare word such as an unquoted key or a literal
+BARE_WORD_END = ",:{}[]\"'" + WHITESPACE
+ESCAPES = {'"': '"', "'": "'", "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+LITERALS = {
+    "true": True, "false": False, "null": None,
+    "True": True, "False": False, "None": None, "undefined": None,
+}
+NUMBER_PATTERN = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?$")
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_$][\w$-]*")
+
+
+class JsonRepairError(ValueError):
+    """Raised when no JSON object or array can be found in the text"""
+
+
+class _JsonRepairParser:
+    def __init__(self, text: str):
+        self._text = text
+        self._length = len(text)
+        self._pos = 0
+
+    def parse(self) -> Any:
+        start = self._find_start()
+        if start is None:
+            raise JsonRepairError("No JSON object or array found")
+        # Brackets in the text around the JSON, like "see [1]", parse to short values,
+        # keep the value spanning the most text
+        best: Optional[Tuple[int, Any]] = None
+        while start is not None:
+            self._pos = start
+            value = self._parse_value()
+            if best is None or self._pos - start > best[0]:
+                best = (self._pos - start, value)
+            start = self._first_bracket(self._pos)
+        return best[1]
+
+    def _find_start(self) -> Optional[int]:
+        text = self._text
+        search_from = 0
+        fence = text.find("```")
+        first = self._first_bracket(0)
+        # Prefer a fenced block unless the text starts with the JSON, whose strings may contain fences
+        if fence != -1 and (first is None or fence < first or text[:first].strip()):
+            # Skip the opening fence line, like ```json
+            line_end = text.find("\n", fence)
+            search_from = fence + 3 if line_end == -1 else line_end + 1
+        return self._first_bracket(search_from)
+
+    def _first_bracket(self, start: int) -> Optional[int]:
+        positions = [pos for pos in (self._text.find("{", start), self._text.find("[", start)) if pos != -1]
+        return min(positions) if positions else None
+
+    def _at_end(self) -> bool:
+        return self._pos >= self._length
+
+    def _peek(self) -> str:
+        return self._text[self._pos] if self._pos < self._length else ""
+
+    def _skip_whitespace(self) -> None:
+        text = self._text
+        while self._pos < self._length:
+            char = text[self._pos]
+            if char in WHITESPACE:
+                self._pos += 1
+            elif text.startswith("//", self._pos):
+                line_end = text.find("\n", self._pos)
+                self._pos = self._length if line_end == -1 else line_end + 1
+            elif text.startswith("/*", self._pos):
+                comment_end = text.find("*/", self._pos + 2)
+                self._pos = self._length if comment_end == -1 else comment_end + 2
+            else:
+                break
+
+    def _skip_separators(self) -> None:
+        while True:
+            self._skip_whitespace()
+            if self._peek() != ",":
+                return
+            self._pos += 1
+
+    def _parse_value(self, in_array: bool = False) -> Any:
+        self._skip_whitespace()
+        char = self._peek()
+        if char == "{":
+            return self._parse_object()
+        if char == "[":
+            return self._parse_array()
+        if char in ('"', "'"):
+            return self._parse_string(is_key=False, in_array=in_array)
+        if not char:
+            return None
+        return self._parse_bare_value()
+
+    def _parse_object(self) -> Dict[str, Any]:
+        self._pos += 1
+        result: Dict[str, Any] = {}
+        while True:
+            self._skip_separators()
+            char = self._peek()
+            if not char:
+                return result
+            if char in "}]":
+                # A mismatched "]" closes the object too
+                self._pos += 1
+                return result
+            if char in ('"', "'"):
+                key = self._parse_string(is_key=True)
+            else:
+                key = self._parse_bare_word()
+                if not key:
+                    # Not a key, skip the character
+                    self._pos += 1
+                    continue
+            self._skip_whitespace()
+            if self._peek() == ":":
+                self._pos += 1
+            elif self._peek() in ("", ",", "}"):
+                # Key without a value, dropped
+                continue
+            self._skip_whitespace()
+            if self._at_end():
+                return result
+            result[key] = self._parse_value()
+
+    def _parse_array(self) -> List[Any]:
+        self._pos += 1
+        result: List[Any] = []
+        while True:
+            self._skip_separators()
+            char = self._peek()
+            if not char:
+                return result
+            if char in "]}":
+                # A mismatched "}" closes the array too
+                self._pos += 1
+                return result
+            if char == ":":
+                self._pos += 1
+                continue
+            result.append(self._parse_value(in_array=True))
+
+    def _parse_string(self, is_key: bool, in_array: bool = False) -> str:
+        text = self._text
+        quote = text[self._pos]
+        self._pos += 1
+        chars: List[str] = []
+        while self._pos < self._length:
+            char = text[self._pos]
+            if char == "\\":
+                escaped, consumed = self._parse_escape()
+                chars.append(escaped)
+                self._pos += consumed
+            elif char == quote:
+                self._pos += 1
+                if self._string_ends(is_key, in_array):
+                    return "".join(chars)
+                # A quote inside the string that was not escaped
+                chars.append(char)
+            else:
+                chars.append(char)
+                self._pos += 1
+        # Cut off inside the string
+        return "".join(chars)
+
+    def _parse_escape(self) -> Tuple[str, int]:
+        text = self._text
+        if self._pos + 1 >= self._length:
+            return "", 1
+        char = text[self._pos + 1]
+        if char in ESCAPES:
+            return ESCAPES[char], 2
+        if char == "u":
+            digits = text[self._pos + 2:self._pos + 6]
+            if len(digits) == 4 and all(digit in "0123456789abcdefABCDEF" for digit in digits):
+                code = int(digits, 16)
+                # Join UTF-16 surrogate pairs
+                if 0xD800 <= code <= 0xDBFF and text.startswith("\\u", self._pos + 6):
+                    low_digits = text[self._pos + 8:self._pos + 12]
+                    if len(low_digits) == 4 and all(digit in "0123456789abcdefABCDEF" for digit in low_digits):
+                        low = int(low_digits, 16)
+                        if 0xDC00 <= low <= 0xDFFF:
+                            return chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)), 12
+                return chr(code), 6
+        # Unknown escape, keep the character
+        return char, 2
+
+    def _string_ends(self, is_key: bool, in_array: bool = False) -> bool:
+        """Whether the quote just read closes the string, judged by what follows it"""
+        text = self._text
+        pos = self._pos
+        while pos < self._length and text[pos] in WHITESPACE:
+            pos += 1
+        if pos >= self._length:
+            return True
+        char = text[pos]
+        if is_key:
+            return char in ":}"
+        if char in "}]:":
+            return True
+        if char in "\"'":
+            # A missing comma, when a key or another array element follows
+            return self._next_string_ends_element(pos, in_array)
+        if char != ",":
+            return False
+        # After a comma there must be the start of the next element or key
+        pos += 1
+        while pos < self._length and text[pos] in WHITESPACE:
+            pos += 1
+        if pos >= self._length:
+            return True
+        char = text[pos]
+        if char in "\"'{[]}-" or char.isdigit() or text.startswith(("//", "/*"), pos):
+            return True
+        match = IDENTIFIER_PATTERN.match(text, pos)
+        if not match:
+            return False
+        if match.group() in LITERALS:
+            return True
+        rest = text[match.end():].lstrip(WHITESPACE)
+        return rest.startswith(":")
+
+    def _next_string_ends_element(self, pos: int, in_array: bool) -> bool:
+        """Whether the quoted string at pos is followed by what follows a key, or an array element"""
+        text = self._text
+        quote = text[pos]
+        pos += 1
+        while pos < self._length and text[pos] != quote:
+            pos += 2 if text[pos] == "\\" else 1
+        pos += 1
+        while pos < self._length and text[pos] in WHITESPACE:
+            pos += 1
+        if pos >= self._length:
+            return in_array
+        if in_array:
+            return text[pos] in ",]\"'"
+        return text[pos] == ":"
+
+    def _parse_bare_word(self) -> str:
+        start = self._pos
+        while self._pos < self._length and self._text[self._pos] not in BARE_WORD_END:
+            self._pos += 1
+        return self._text[start:self._pos]
+
+    def _parse_bare_value(self) -> Any:
+        start = self._pos
+        word = self._parse_bare_word()
+        if not word:
+            # A stray character that cannot start a value
+            self._pos = start + 1
+            return None
+        if word in LITERALS:
+            return LITERALS[word]
+        if NUMBER_PATTERN.match(word):
+            number = word.lstrip("+")
+            if re.fullmatch(r"-?\d+", number):
+                return int(number)
+            return float(number)
+        # Unquoted text runs up to the end of the element
+        while self._pos < self._length and self._text[self._pos] not in ",}]\n":
+            self._pos += 1
+        return self._text[start:self._pos].strip()
+
+
+def repair_json(text: str) -> Any:
+    """Parse the JSON object or array in text, repairing common mistakes
+
+    Raises:
+        JsonRepairError: If the text contains no JSON object or array
+    """
+    return _JsonRepairParser(text).parse()
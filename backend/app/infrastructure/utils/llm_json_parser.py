@@ -1,11 +1,15 @@
 import json
 import re
+from collections import Counter
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Union
 from enum import Enum
 import logging
 
+from app.domain.external.llm import LLM
 from app.domain.utils.json_parser import JsonParser
-from app.infrastructure.external.llm.openai_llm import OpenAILLM
+from app.infrastructure.external.llm import get_llm, LLMRole
+from app.infrastructure.utils.json_repair import repair_json
 
 
 logger = logging.getLogger(__name__)
@@ -15,7 +19,7 @@ class ParseStrategy(Enum):
     DIRECT = "direct"
     MARKDOWN_BLOCK = "markdown_block"
     REGEX_EXTRACT = "regex_extract"
-    CLEANUP_AND_PARSE = "cleanup_and_parse"
+    REPAIR = "repair"
     LLM_EXTRACT_AND_FIX = "llm_extract_and_fix"
 
 
@@ -24,17 +28,32 @@ class LLMJsonParser(JsonParser):
     A robust parser for converting LLM string output to JSON.
     Handles various formats including markdown code blocks, malformed JSON, etc.
     Inherits from domain JsonParser interface and uses LLM when needed.
+    
+    Counts which strategy parsed each input, so the share of inputs that needed
+    the LLM fallback can be watched.
     """
     
-    def __init__(self):
-        self.llm = OpenAILLM()
+    def __init__(self, llm: LLM):
+        self.llm = llm
         self.strategies = [
-            self._try_direct_parse,
-            self._try_markdown_block_parse,
-            #self._try_regex_extract,
-            self._try_cleanup_and_parse,
-            self._try_llm_extract_and_fix,
+            (ParseStrategy.DIRECT, self._try_direct_parse),
+            (ParseStrategy.MARKDOWN_BLOCK, self._try_markdown_block_parse),
+            #(ParseStrategy.REGEX_EXTRACT, self._try_regex_extract),
+            (ParseStrategy.REPAIR, self._try_repair_parse),
+            (ParseStrategy.LLM_EXTRACT_AND_FIX, self._try_llm_extract_and_fix),
         ]
+        self._hits: Counter = Counter()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get how many inputs each strategy parsed, and how many failed"""
+        total = sum(self._hits.values())
+        llm_hits = self._hits[ParseStrategy.LLM_EXTRACT_AND_FIX.value]
+        return {
+            "total": total,
+            "hits": {strategy.value: self._hits[strategy.value] for strategy, _ in self.strategies},
+            "failed": self._hits["failed"],
+            "llm_fallback_rate": llm_hits / total if total else 0.0,
+        }
     
     async def parse(self, text: str, default_value: Optional[Any] = None) -> Union[Dict, List, Any]:
         """
@@ -52,7 +71,7 @@ class LLMJsonParser(JsonParser):
             ValueError: If all parsing strategies fail and no default value provided
         """
 
-        logger.info(f"Parsing text: {text}")
+        logger.debug(f"Parsing text: {text}")
         if not text or not text.strip():
             if default_value is not None:
                 return default_value
@@ -61,17 +80,23 @@ class LLMJsonParser(JsonParser):
         cleaned_output = text.strip()
         
         # Try each parsing strategy
-        for strategy in self.strategies:
+        for name, strategy in self.strategies:
             try:
                 result = await strategy(cleaned_output)
                 if result is not None:
-                    logger.info(f"Successfully parsed using strategy: {strategy.__name__}")
+                    self._hits[name.value] += 1
+                    if name == ParseStrategy.LLM_EXTRACT_AND_FIX:
+                        logger.warning(f"Parsed using the LLM fallback, strategy hits: {dict(self._hits)}")
+                    elif name != ParseStrategy.DIRECT:
+                        logger.info(f"Successfully parsed using strategy: {name.value}")
                     return result
             except Exception as e:
-                logger.warning(f"Strategy {strategy.__name__} failed: {str(e)}")
+                # Expected for most inputs the earlier strategies cannot handle
+                logger.debug(f"Strategy {name.value} failed: {str(e)}")
                 continue
         
         # If all strategies fail
+        self._hits["failed"] += 1
         if default_value is not None:
             logger.warning("All parsing strategies failed, returning default value")
             return default_value
@@ -119,31 +144,9 @@ class LLMJsonParser(JsonParser):
         
         return None
     
-    async def _try_cleanup_and_parse(self, text: str) -> Optional[Any]:
-        """Clean up common formatting issues and try parsing"""
-        # Remove common prefixes/suffixes
-        prefixes = ["json:", "result:", "output:", "response:"]
-        suffixes = [".", "..."]
-        
-        cleaned = text
-        
-        # Remove prefixes
-        for prefix in prefixes:
-            if cleaned.lower().startswith(prefix.lower()):
-                cleaned = cleaned[len(prefix):].strip()
-        
-        # Remove suffixes
-        for suffix in suffixes:
-            if cleaned.endswith(suffix):
-                cleaned = cleaned[:-len(suffix)].strip()
-        
-        # Fix common JSON formatting issues
-        cleaned = self._fix_json_formatting(cleaned)
-        
-        try:
-            return json.loads(cleaned)
-        except json.JSONDecodeError:
-            return None
+    async def _try_repair_parse(self, text: str) -> Optional[Any]:
+        """Parse with the tolerant parser, which repairs common formatting issues locally"""
+        return repair_json(text)
     
     async def _try_llm_extract_and_fix(self, text: str) -> Optional[Any]:
         """Use LLM to extract and fix JSON from the text"""
@@ -192,48 +195,9 @@ JSON:"""
         except Exception as e:
             logger.warning(f"LLM JSON extraction failed: {str(e)}")
             return None
-    
-    def _fix_json_formatting(self, text: str) -> str:
-        """Fix common JSON formatting issues"""
-        # Replace single quotes with double quotes (but not inside strings)
-        # This is a simplified approach - might need more sophisticated handling
-        text = re.sub(r"(?<!\\)'([^']*?)(?<!\\)'", r'"\1"', text)
-        
-        # Fix trailing commas
-        text = re.sub(r',(\s*[}\]])', r'\1', text)
-        
-        # Fix missing quotes around keys
-        text = re.sub(r'(\w+):', r'"\1":', text)
-        
-        # Fix unescaped double quotes in string values
-        # This handles cases like: "key": "value with " unescaped quotes"
-        def fix_unescaped_quotes_in_values(match):
-            key_part = match.group(1)  # "key": "
-            value_content = match.group(2)  # value content that may contain unescaped quotes
-            
-            # Escape any unescaped double quotes in the value content
-            # Use negative lookbehind to avoid escaping already escaped quotes
-            escaped_content = re.sub(r'(?<!\\)"', r'\\"', value_content)
-            
-            return f'{key_part}{escaped_content}"'
-        
-        # Pattern to match: "key": "value content with potential " unescaped quotes"
-        # Captures everything from key to the final quote of the value
-        text = re.sub(r'("[\w\s\-_]+"\s*:\s*")(.*?)"(?=\s*[,}\]])', fix_unescaped_quotes_in_values, text)
-        
-        # Fix unescaped double quotes in array string values
-        # This handles cases like: ["item with " quotes", "another item"]
-        def fix_unescaped_quotes_in_array_values(match):
-            quote_and_content = match.group(1)  # " + content that may contain unescaped quotes
-            value_content = quote_and_content[1:]  # remove the leading quote
-            
-            # Escape any unescaped double quotes in the value content
-            escaped_content = re.sub(r'(?<!\\)"', r'\\"', value_content)
-            
-            return f'"{escaped_content}"'
-        
-        # Pattern to match string values in arrays: "content with potential " quotes"
-        # Look for quotes that are preceded by [ or , (with optional whitespace) and followed by , or ] (with optional whitespace)
-        text = re.sub(r'(?<=[\[,]\s*)(".*?)"(?=\s*[,\]])', fix_unescaped_quotes_in_array_values, text)
-        
-        return text
+
+
+@lru_cache()
+def get_json_parser() -> LLMJsonParser:
+    """Get the JSON parser"""
+    return LLMJsonParser(get_llm(LLMRole.FAST))
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, UploadFile, File
+from fastapi import APIRouter, Depends, UploadFile, File, Query
 from fastapi.responses import StreamingResponse
 import logging
 
@@ -12,6 +12,9 @@ from app.interfaces.schemas.resource import AccessTokenRequest, SignedUrlRespons
 
 logger = logging.getLogger(__name__)
 
+# Seconds a signed download waits for a file that is still being uploaded
+SIGNED_FILE_WAIT_SECONDS = 5
+
 router = APIRouter(prefix="/files", tags=["files"])
 
 @router.post("", response_model=APIResponse[FileInfoResponse])
@@ -34,6 +37,7 @@ async def upload_file(
 @router.get("/{file_id}")
 async def download_file_with_signature(
     file_id: str,
+    pending: bool = Query(False),
     file_service: FileService = Depends(get_file_service),
     signature: str = Depends(verify_signature),
 ):
@@ -41,7 +45,9 @@ async def download_file_with_signature(
     
     # Download file (authentication is handled by middleware for non-token requests)
     try:
-        file_data, file_info = await file_service.download_file(file_id)
+        # Signed screenshot URLs go out before the background upload is done
+        wait_seconds = SIGNED_FILE_WAIT_SECONDS if pending else 0
+        file_data, file_info = await file_service.download_file(file_id, wait_seconds=wait_seconds)
     except FileNotFoundError:
         raise NotFoundError("File not found")
     except PermissionError:
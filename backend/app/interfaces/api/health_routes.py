@@ -7,6 +7,11 @@ import logging
 from app.core.config import get_settings
 from app.infrastructure.storage.mongodb import get_mongodb
 from app.infrastructure.storage.redis import get_redis
+from app.infrastructure.external.sandbox.docker_sandbox_pool import get_sandbox_pool
+from app.infrastructure.utils.llm_json_parser import get_json_parser
+from app.infrastructure.external.llm import get_llm
+from app.infrastructure.external.browser.page_extraction_cache import get_page_extraction_cache
+from app.infrastructure.external.llm.llm_router import LLMRouter
 from app.interfaces.schemas.base import APIResponse
 
 logger = logging.getLogger(__name__)
@@ -98,3 +103,46 @@ async def service_info() -> APIResponse:
             "timestamp": datetime.now(UTC).isoformat()
         }
     )
+
+
+@router.get("/sandbox-pool", response_model=APIResponse)
+async def sandbox_pool_metrics() -> APIResponse:
+    """Sandbox pool size and hit/miss/wait-time metrics"""
+    return APIResponse(
+        code=0,
+        msg="OK",
+        data=get_sandbox_pool().metrics()
+    )
+
+
+@router.get("/json-parser", response_model=APIResponse)
+async def json_parser_metrics() -> APIResponse:
+    """How often each JSON parsing strategy was needed, including the LLM fallback"""
+    return APIResponse(
+        code=0,
+        msg="OK",
+        data=get_json_parser().get_stats()
+    )
+
+
+@router.get("/page-extraction-cache", response_model=APIResponse)
+async def page_extraction_cache_metrics() -> APIResponse:
+    """Hits and misses of the browser page extraction cache"""
+    return APIResponse(
+        code=0,
+        msg="OK",
+        data=get_page_extraction_cache().get_stats()
+    )
+
+
+@router.get("/llm", response_model=APIResponse)
+async def llm_metrics() -> APIResponse:
+    """Latency, error rate, queue and circuit state of each LLM endpoint"""
+    llm = get_llm()
+    if not isinstance(llm, LLMRouter):
+        return APIResponse(code=0, msg="OK", data={"endpoints": []})
+    return APIResponse(
+        code=0,
+        msg="OK",
+        data=llm.metrics()
+    )
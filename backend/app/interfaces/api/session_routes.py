@@ -15,7 +15,7 @@ from app.interfaces.dependencies import get_agent_service, get_current_user, get
 from app.interfaces.schemas.base import APIResponse
 from app.interfaces.schemas.session import (
     ChatRequest, ShellViewRequest, CreateSessionResponse, GetSessionResponse,
-    ListSessionItem, ListSessionResponse, ShellViewResponse,
+    ListSessionItem, ListSessionResponse, SessionsDeltaResponse, ShellViewResponse,
     ShareSessionResponse, SharedSessionResponse
 )
 from app.interfaces.schemas.file import FileViewRequest, FileViewResponse
@@ -26,6 +26,8 @@ from app.domain.models.user import User
 
 logger = logging.getLogger(__name__)
 SESSION_POLL_INTERVAL = 5
+SESSION_HEARTBEAT_INTERVAL = 30
+MAX_EVENT_PAGE_SIZE = 1000
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
@@ -44,18 +46,24 @@ async def create_session(
 @router.get("/{session_id}", response_model=APIResponse[GetSessionResponse])
 async def get_session(
     session_id: str,
+    after_event_id: Optional[str] = Query(None, description="Only return events after this event ID"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_EVENT_PAGE_SIZE, description="Maximum number of events to return"),
     current_user: User = Depends(get_current_user),
     agent_service: AgentService = Depends(get_agent_service)
 ) -> APIResponse[GetSessionResponse]:
     session = await agent_service.get_session(session_id, current_user.id)
     if not session:
         raise NotFoundError("Session not found")
+    # Fetch one extra event to find out whether another page follows
+    events = await agent_service.get_session_events(session_id, after_event_id, limit + 1 if limit else None)
+    has_more = limit is not None and len(events) > limit
     return APIResponse.success(GetSessionResponse(
         session_id=session.id,
         title=session.title,
         status=session.status,
-        events=await EventMapper.events_to_sse_events(session.events),
-        is_shared=session.is_shared
+        events=await EventMapper.events_to_sse_events(events[:limit]),
+        is_shared=session.is_shared,
+        has_more=has_more
     ))
 
 @router.delete("/{session_id}", response_model=APIResponse[None])
@@ -91,17 +99,7 @@ async def get_all_sessions(
     agent_service: AgentService = Depends(get_agent_service)
 ) -> APIResponse[ListSessionResponse]:
     sessions = await agent_service.get_all_sessions(current_user.id)
-    session_items = [
-        ListSessionItem(
-            session_id=session.id,
-            title=session.title,
-            status=session.status,
-            unread_message_count=session.unread_message_count,
-            latest_message=session.latest_message,
-            latest_message_at=int(session.latest_message_at.timestamp()) if session.latest_message_at else None,
-            is_shared=session.is_shared
-        ) for session in sessions
-    ]
+    session_items = [ListSessionItem.from_summary(session) for session in sessions]
     return APIResponse.success(ListSessionResponse(sessions=session_items))
 
 @router.post("")
@@ -111,23 +109,31 @@ async def stream_sessions(
 ) -> EventSourceResponse:
     async def event_generator() -> AsyncGenerator[ServerSentEvent, None]:
         while True:
+            # Send the full list on connect and after every resubscription
             sessions = await agent_service.get_all_sessions(current_user.id)
-            session_items = [
-                ListSessionItem(
-                    session_id=session.id,
-                    title=session.title,
-                    status=session.status,
-                    unread_message_count=session.unread_message_count,
-                    latest_message=session.latest_message,
-                    latest_message_at=int(session.latest_message_at.timestamp()) if session.latest_message_at else None,
-                    is_shared=session.is_shared
-                ) for session in sessions
-            ]
+            session_items = [ListSessionItem.from_summary(session) for session in sessions]
             yield ServerSentEvent(
                 event="sessions",
                 data=ListSessionResponse(sessions=session_items).model_dump_json()
             )
-            await asyncio.sleep(SESSION_POLL_INTERVAL)
+            try:
+                async for session_ids in agent_service.watch_sessions(current_user.id, SESSION_HEARTBEAT_INTERVAL):
+                    if not session_ids:
+                        yield ServerSentEvent(comment="heartbeat")
+                        continue
+                    sessions = await agent_service.get_all_sessions(current_user.id, session_ids)
+                    found_session_ids = {session.id for session in sessions}
+                    yield ServerSentEvent(
+                        event="sessions_delta",
+                        data=SessionsDeltaResponse(
+                            sessions=[ListSessionItem.from_summary(session) for session in sessions],
+                            deleted_session_ids=[session_id for session_id in session_ids if session_id not in found_session_ids]
+                        ).model_dump_json()
+                    )
+            except Exception as e:
+                # Fall back to polling until session change notifications are available again
+                logger.warning(f"Session change notifications unavailable, polling instead: {e}")
+                await asyncio.sleep(SESSION_POLL_INTERVAL)
     return EventSourceResponse(event_generator())
 
 @router.post("/{session_id}/chat")
@@ -389,6 +395,6 @@ async def get_shared_session(
         session_id=session.id,
         title=session.title,
         status=session.status,
-        events=await EventMapper.events_to_sse_events(session.events),
+        events=await EventMapper.events_to_sse_events(await agent_service.get_session_events(session_id)),
         is_shared=session.is_shared
     ))
\ No newline at end of file
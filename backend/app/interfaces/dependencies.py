@@ -17,12 +17,14 @@ from app.application.services.auth_service import AuthService
 from app.application.services.token_service import TokenService
 from app.application.services.email_service import EmailService
 from app.infrastructure.external.cache import get_cache
+from app.infrastructure.external.notification import get_session_notifier
 
 # Import all required dependencies for agent service
-from app.infrastructure.external.llm.openai_llm import OpenAILLM
+from app.infrastructure.external.llm import get_llm
 from app.infrastructure.external.sandbox.docker_sandbox import DockerSandbox
+from app.infrastructure.external.sandbox.docker_sandbox_pool import get_sandbox_pool
 from app.infrastructure.external.task.redis_task import RedisStreamTask
-from app.infrastructure.utils.llm_json_parser import LLMJsonParser
+from app.infrastructure.utils.llm_json_parser import get_json_parser
 from app.infrastructure.repositories.mongo_agent_repository import MongoAgentRepository
 from app.infrastructure.repositories.mongo_session_repository import MongoSessionRepository
 from app.infrastructure.repositories.file_mcp_repository import FileMCPRepository
@@ -46,12 +48,14 @@ def get_agent_service() -> AgentService:
     logger.info("Creating AgentService instance")
     
     # Create all dependencies
-    llm = OpenAILLM()
+    llm = get_llm()
     agent_repository = MongoAgentRepository()
-    session_repository = MongoSessionRepository()
+    session_notifier = get_session_notifier()
+    session_repository = MongoSessionRepository(notifier=session_notifier)
     sandbox_cls = DockerSandbox
+    sandbox_pool = get_sandbox_pool()
     task_cls = RedisStreamTask
-    json_parser = LLMJsonParser()
+    json_parser = get_json_parser()
     file_storage = get_file_storage()
     search_engine = get_search_engine()
     mcp_repository = FileMCPRepository()
@@ -67,6 +71,8 @@ def get_agent_service() -> AgentService:
         file_storage=file_storage,
         search_engine=search_engine,
         mcp_repository=mcp_repository,
+        session_notifier=session_notifier,
+        sandbox_pool=sandbox_pool if sandbox_pool.enabled else None,
     )
 
 
@@ -77,6 +77,13 @@ class MessageSSEEvent(BaseSSEEvent):
             )
         )
 
+class MessageDeltaEventData(BaseEventData):
+    delta: str
+
+class MessageDeltaSSEEvent(BaseSSEEvent):
+    event: Literal["message_delta"] = "message_delta"
+    data: MessageDeltaEventData
+
 class ToolEventData(BaseEventData):
     tool_call_id: str
     name: str
@@ -92,9 +99,11 @@ class ToolSSEEvent(BaseSSEEvent):
     @classmethod
     async def from_event_async(cls, event: ToolEvent) -> Self:
         content = event.tool_content
-        if isinstance(content, BrowserToolContent):
+        if isinstance(content, BrowserToolContent) and content.screenshot:
             from app.interfaces.dependencies import get_file_service
-            content = BrowserToolContent(screenshot=await get_file_service().create_signed_url(content.screenshot))
+            # Screenshots are uploaded in the background and may not be stored yet
+            signed_url = await get_file_service().create_signed_url(content.screenshot, must_exist=False)
+            content = BrowserToolContent(screenshot=signed_url)
         return cls(
             data=ToolEventData(
                 **BaseEventData.base_event_data(event),
@@ -176,6 +185,7 @@ AgentSSEEvent = Union[
     CommonEventData,
     PlanSSEEvent,
     MessageSSEEvent,
+    MessageDeltaSSEEvent,
     TitleSSEEvent,
     ToolSSEEvent,
     StepSSEEvent,
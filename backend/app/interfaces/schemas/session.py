@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from app.interfaces.schemas.event import AgentSSEEvent
-from app.domain.models.session import SessionStatus
+from app.domain.models.session import SessionStatus, SessionSummary
 
 
 class ChatRequest(BaseModel):
@@ -29,6 +29,7 @@ class GetSessionResponse(BaseModel):
     status: SessionStatus
     events: List[AgentSSEEvent] = []
     is_shared: bool = False
+    has_more: bool = False  # Whether more events follow the last returned one
 
 
 class ListSessionItem(BaseModel):
@@ -41,12 +42,30 @@ class ListSessionItem(BaseModel):
     unread_message_count: int
     is_shared: bool = False
 
+    @classmethod
+    def from_summary(cls, summary: SessionSummary) -> "ListSessionItem":
+        return cls(
+            session_id=summary.id,
+            title=summary.title,
+            status=summary.status,
+            unread_message_count=summary.unread_message_count,
+            latest_message=summary.latest_message,
+            latest_message_at=int(summary.latest_message_at.timestamp()) if summary.latest_message_at else None,
+            is_shared=summary.is_shared
+        )
+
 
 class ListSessionResponse(BaseModel):
     """List session response schema"""
     sessions: List[ListSessionItem]
 
 
+class SessionsDeltaResponse(BaseModel):
+    """Incremental session list update schema"""
+    sessions: List[ListSessionItem]  # Created or updated sessions
+    deleted_session_ids: List[str] = []
+
+
 class ConsoleRecord(BaseModel):
     """Console record schema"""
     ps1: str
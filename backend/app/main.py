@@ -7,11 +7,17 @@ import asyncio
 from app.core.config import get_settings
 from app.infrastructure.storage.mongodb import get_mongodb
 from app.infrastructure.storage.redis import get_redis
+from app.infrastructure.external.task.redis_stream_sweeper import get_stream_sweeper
+from app.infrastructure.external.task.redis_task_registry import get_task_registry
+from app.infrastructure.external.sandbox.docker_sandbox_pool import get_sandbox_pool
+from app.infrastructure.external.sandbox.sandbox_http_client import close_all_clients
+from app.infrastructure.external.browser.playwright_driver import get_playwright_driver
 from app.interfaces.dependencies import get_agent_service
 from app.interfaces.api.routes import router
 from app.infrastructure.logging import setup_logging
 from app.interfaces.errors.exception_handlers import register_exception_handlers
-from app.infrastructure.models.documents import AgentDocument, SessionDocument, UserDocument
+from app.infrastructure.models.documents import AgentDocument, SessionDocument, SessionEventDocument, UserDocument
+from app.infrastructure.repositories.mongo_session_repository import MongoSessionRepository
 from beanie import init_beanie
 
 # Initialize logging system
@@ -34,32 +40,50 @@ async def lifespan(app: FastAPI):
         # Initialize Beanie
         await init_beanie(
             database=get_mongodb().client[settings.mongodb_database],
-            document_models=[AgentDocument, SessionDocument, UserDocument]
+            document_models=[AgentDocument, SessionDocument, SessionEventDocument, UserDocument]
         )
         logger.info("Successfully initialized Beanie")
     except Exception as e:
         logger.warning(f"MongoDB initialization failed (optional): {e}")
         logger.info("Running without MongoDB - some features may be limited")
+    else:
+        # Move events embedded in older session documents into the session_events collection
+        try:
+            migrated = await MongoSessionRepository().migrate_legacy_events()
+            if migrated:
+                logger.info(f"Migrated legacy events of {migrated} sessions")
+        except Exception as e:
+            logger.error(f"Failed to migrate legacy session events, will retry on next startup: {e}")
 
     # Initialize Redis (optional)
     try:
         await get_redis().initialize()
         logger.info("Successfully initialized Redis")
+        # Publish task ownership and accept cancellations from other nodes
+        await get_task_registry().start()
+        # Delete task streams left behind by crashed nodes
+        await get_stream_sweeper().start()
     except Exception as e:
         logger.warning(f"Redis initialization failed (optional): {e}")
         logger.info("Running without Redis - some features may be limited")
 
+    # Boot sandboxes ahead of the first sessions
+    await get_sandbox_pool().start()
+
     try:
         yield
     finally:
         # Code executed on shutdown
         logger.info("Application shutdown - Manus AI Agent terminating")
+        await get_sandbox_pool().stop()
         # Disconnect from MongoDB
         try:
             await get_mongodb().shutdown()
         except:
             pass
         # Disconnect from Redis
+        await get_stream_sweeper().stop()
+        await get_task_registry().stop()
         await get_redis().shutdown()
 
 
@@ -71,6 +95,10 @@ async def lifespan(app: FastAPI):
             logger.warning("AgentService shutdown timed out after 30 seconds")
         except Exception as e:
             logger.error(f"Error during AgentService cleanup: {str(e)}")
+        # Close pooled sandbox connections left open by cached sandboxes
+        await close_all_clients()
+        # Stop the Playwright driver shared by the browsers
+        await get_playwright_driver().shutdown()
 
 app = FastAPI(title="Manus AI Agent", lifespan=lifespan)
 
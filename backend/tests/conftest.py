@@ -35,3 +35,33 @@ def client():
     session = requests.Session()
     # Don't set default Content-Type to allow multipart/form-data for file uploads
     return session
+
+
+@pytest.fixture
+async def mongodb(monkeypatch):
+    """Initialize Beanie on an in-memory MongoDB"""
+    mongomock = pytest.importorskip("mongomock")
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from beanie import init_beanie
+    from app.infrastructure.models.documents import AgentDocument, SessionDocument, SessionEventDocument, UserDocument
+
+    # Beanie passes options of the real server command that mongomock does not know
+    list_collection_names = mongomock.database.Database.list_collection_names
+    monkeypatch.setattr(
+        mongomock.database.Database,
+        "list_collection_names",
+        lambda self, filter=None, session=None, **kwargs: list_collection_names(self, filter, session),
+    )
+    # PyMongo passes the sort option of update operations to bulk writes, which mongomock predates
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+    monkeypatch.setattr(
+        mongomock.collection.BulkOperationBuilder,
+        "add_update",
+        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs),
+    )
+    client = mongomock_motor.AsyncMongoMockClient()
+    await init_beanie(
+        database=client["test"],
+        document_models=[AgentDocument, SessionDocument, SessionEventDocument, UserDocument],
+    )
+    return client["test"]
@@ -216,6 +216,7 @@ class TestAgentServiceInit:
             mock_file_storage,
             mock_mcp_repository,
             mock_search_engine,
+            None,
         )
 
     @patch('app.application.services.agent_service.logger')
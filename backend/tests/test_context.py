@@ -0,0 +1,193 @@
+"""
+Tests for the context window strategies and ContextManager of the agents
+"""
+from app.domain.services.agents.context import (
+    ContextManager,
+    DropToolPairsStrategy,
+    SummarizeStrategy,
+    TruncateToolOutputStrategy,
+    group_turns,
+)
+from app.domain.services.prompts.context import CONTEXT_SUMMARY_PREFIX
+from app.domain.utils.token_counter import TokenCounter
+
+
+class FakeLLM:
+    model_name = "fake-model"
+
+    def __init__(self, context_window: int = 1000, max_tokens: int = 100):
+        self.context_window = context_window
+        self.max_tokens = max_tokens
+        self.requests = []
+
+    async def ask(self, messages, tools=None, response_format=None, tool_choice=None):
+        self.requests.append(messages)
+        return {"role": "assistant", "content": f"summary {len(self.requests)}"}
+
+
+def tool_turn(index: int, output: str = "result"):
+    call_id = f"call_{index}"
+    return [
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{"id": call_id, "type": "function", "function": {"name": "shell", "arguments": "{}"}}],
+        },
+        {"role": "tool", "tool_call_id": call_id, "function_name": "shell", "content": output},
+    ]
+
+
+def conversation(turns: int, output: str = "result"):
+    messages = [{"role": "system", "content": "system prompt"}, {"role": "user", "content": "task"}]
+    for index in range(turns):
+        messages.extend(tool_turn(index, output))
+    return messages
+
+
+def assert_tool_pairs_intact(messages):
+    """Every tool result follows the assistant message that called it"""
+    calls = set()
+    for message in messages:
+        if message.get("tool_calls"):
+            calls = {call["id"] for call in message["tool_calls"]}
+        elif message["role"] == "tool":
+            assert message["tool_call_id"] in calls
+        else:
+            calls = set()
+
+
+def test_group_turns_keeps_tool_results_with_their_call():
+    groups = group_turns(conversation(3)[1:])
+    assert [len(group) for group in groups] == [1, 2, 2, 2]
+
+
+async def test_drop_tool_pairs_drops_oldest_pairs_together():
+    messages = conversation(10)
+    counter = TokenCounter()
+    strategy = DropToolPairsStrategy(keep_recent=3)
+
+    reduced = await strategy.apply(list(messages), counter.count_messages(messages) // 2, counter)
+
+    assert reduced[0] == messages[0]
+    assert reduced[-6:] == messages[-6:]
+    assert len(reduced) < len(messages)
+    assert_tool_pairs_intact(reduced)
+
+
+async def test_drop_tool_pairs_keeps_messages_within_budget():
+    messages = conversation(10)
+    counter = TokenCounter()
+
+    reduced = await DropToolPairsStrategy().apply(list(messages), counter.count_messages(messages), counter)
+
+    assert reduced == messages
+
+
+async def test_truncate_tool_output_keeps_message_dicts_unchanged():
+    messages = conversation(2, output="x" * 20000)
+    original = [dict(message) for message in messages]
+    counter = TokenCounter()
+
+    reduced = await TruncateToolOutputStrategy(max_tokens=100).apply(list(messages), 1000, counter)
+
+    assert messages == original
+    assert all(len(message["content"]) < 1000 for message in reduced if message["role"] == "tool")
+
+
+async def test_summarize_replaces_older_turns():
+    llm = FakeLLM()
+    messages = conversation(6)
+    strategy = SummarizeStrategy(llm, keep_recent=2)
+
+    reduced = await strategy.apply(list(messages), 0, TokenCounter())
+
+    assert len(llm.requests) == 1
+    assert reduced[0] == messages[0]
+    assert reduced[1] == {"role": "user", "content": CONTEXT_SUMMARY_PREFIX + "summary 1"}
+    assert reduced[2:] == messages[-4:]
+    assert_tool_pairs_intact(reduced)
+
+
+async def test_summarize_merges_into_leading_user_message():
+    llm = FakeLLM()
+    messages = conversation(4) + [{"role": "user", "content": "next task"}] + tool_turn(4)
+    strategy = SummarizeStrategy(llm, keep_recent=2)
+
+    reduced = await strategy.apply(list(messages), 0, TokenCounter())
+
+    assert [message["role"] for message in reduced] == ["system", "user", "assistant", "tool"]
+    assert reduced[1]["content"] == CONTEXT_SUMMARY_PREFIX + "summary 1\n\nnext task"
+    assert messages[-3] == {"role": "user", "content": "next task"}
+
+
+async def test_summarize_reuses_summary_for_unchanged_messages():
+    llm = FakeLLM()
+    messages = conversation(6)
+    strategy = SummarizeStrategy(llm, keep_recent=2)
+
+    first = await strategy.apply(list(messages), 0, TokenCounter())
+    second = await strategy.apply(list(messages), 0, TokenCounter())
+
+    assert len(llm.requests) == 1
+    assert second == first
+
+
+async def test_summarize_extends_summary_with_new_turns():
+    llm = FakeLLM()
+    messages = conversation(6)
+    strategy = SummarizeStrategy(llm, keep_recent=2)
+    await strategy.apply(list(messages), 0, TokenCounter())
+
+    messages.extend(tool_turn(6, "new output"))
+    reduced = await strategy.apply(list(messages), 0, TokenCounter())
+
+    assert len(llm.requests) == 2
+    # Only the summary and the newly summarized turn are sent, not the whole history
+    text = llm.requests[1][1]["content"]
+    assert text.startswith(CONTEXT_SUMMARY_PREFIX + "summary 1")
+    assert text.count("[shell]") == 1
+    assert reduced[1]["content"] == CONTEXT_SUMMARY_PREFIX + "summary 2"
+
+
+async def test_summarize_starts_over_when_summarized_messages_change():
+    llm = FakeLLM()
+    messages = conversation(6)
+    strategy = SummarizeStrategy(llm, keep_recent=2)
+    await strategy.apply(list(messages), 0, TokenCounter())
+
+    messages[1] = {"role": "user", "content": "another task"}
+    await strategy.apply(list(messages), 0, TokenCounter())
+
+    assert len(llm.requests) == 2
+    assert not llm.requests[1][1]["content"].startswith(CONTEXT_SUMMARY_PREFIX)
+
+
+async def test_context_manager_returns_messages_that_fit():
+    llm = FakeLLM(context_window=100000)
+    messages = conversation(4)
+    manager = ContextManager(llm, [DropToolPairsStrategy(), SummarizeStrategy(llm)])
+
+    context = await manager.build(messages)
+
+    assert context == messages
+    assert manager.last_usage.strategies == []
+    assert llm.requests == []
+
+
+async def test_context_manager_never_splits_tool_pairs():
+    llm = FakeLLM(context_window=2000, max_tokens=200)
+    messages = conversation(30, output="y" * 4000)
+    manager = ContextManager(llm, [
+        TruncateToolOutputStrategy(max_tokens=200),
+        DropToolPairsStrategy(keep_recent=4),
+        SummarizeStrategy(llm, keep_recent=2),
+    ])
+
+    context = await manager.build(messages)
+
+    assert context[0] == messages[0]
+    assert_tool_pairs_intact(context)
+    assert manager.last_usage.original_messages == len(messages)
+    assert manager.last_usage.messages == len(context)
+    assert manager.last_usage.strategies
+    assert manager.last_usage.tokens < manager.last_usage.original_tokens
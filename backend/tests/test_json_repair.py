@@ -0,0 +1,61 @@
+"""
+Tests for the tolerant JSON parser used before the LLM fallback of LLMJsonParser
+"""
+import json
+import pytest
+
+from app.infrastructure.utils.json_repair import repair_json, JsonRepairError
+
+
+@pytest.mark.parametrize("text", [
+    '{"a": 1, "b": [true, false, null], "c": {"d": "e"}}',
+    '[1, -2.5, 1e10, "x"]',
+    '{"quote": "say \\"hi\\"", "path": "C:\\\\dir", "unicode": "\\u00e9\\ud83d\\ude00"}',
+    '{"colon": "a: b", "comma": "a, b", "fence": "```python\\nprint(1)\\n```"}',
+    '{}',
+    '[]',
+])
+def test_valid_json_matches_json_loads(text):
+    assert repair_json(text) == json.loads(text)
+
+
+@pytest.mark.parametrize("text,expected", [
+    ('{"a": 1, "b": [1, 2,],}', {"a": 1, "b": [1, 2]}),
+    ("{'a': 'it's fine'}", {"a": "it's fine"}),
+    ('{a: 1, b_c: "x"}', {"a": 1, "b_c": "x"}),
+    ('{"a": True, "b": None}', {"a": True, "b": None}),
+    ('{"a": 1 "b": 2}', {"a": 1, "b": 2}),
+    ('{"a": "x"\n"b": "y"}', {"a": "x", "b": "y"}),
+    ('["a" "b"]', ["a", "b"]),
+    ('{"a": ["x"\n"y", "z"] "b": 1}', {"a": ["x", "y", "z"], "b": 1}),
+    ('{"a": "x", // comment\n "b": /* note */ 3}', {"a": "x", "b": 3}),
+    ('{"text": "he said "hello" to me", "n": 2}', {"text": 'he said "hello" to me', "n": 2}),
+    ('{"content": "line1\nline2"}', {"content": "line1\nline2"}),
+])
+def test_repairs_formatting_mistakes(text, expected):
+    assert repair_json(text) == expected
+
+
+@pytest.mark.parametrize("text,expected", [
+    ('{"a": [1, 2, {"b": "c', {"a": [1, 2, {"b": "c"}]}),
+    ('{"a": 1, "b":', {"a": 1}),
+    ('[1, 2', [1, 2]),
+])
+def test_closes_truncated_output(text, expected):
+    assert repair_json(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    '```json\n{"a": 1}\n```',
+    'Here is the [result]:\n```json\n{"a": 1}\n```',
+    'json: {"a": 1}.',
+    'Here is [1] the plan: {"a": 1}',
+    '{"a": 1} as noted in [2]',
+])
+def test_extracts_json_from_surrounding_text(text):
+    assert repair_json(text) == {"a": 1}
+
+
+def test_raises_without_json():
+    with pytest.raises(JsonRepairError):
+        repair_json("no json here")
@@ -0,0 +1,63 @@
+"""
+Tests for JsonStringFieldStreamer, which streams a string field out of a JSON document
+"""
+import json
+import pytest
+
+from app.domain.utils.json_stream import JsonStringFieldStreamer
+
+
+DOCUMENTS = [
+    '{"message": "plain text", "attachments": []}',
+    '{"message": "quote \\" backslash \\\\ slash \\/ controls \\b\\f\\n\\r\\t end"}',
+    '{"message": "accent \\u00e9 cjk \\u4e2d emoji \\ud83d\\ude00 done"}',
+    '{"title": "other \\"field\\"", "result": "raw é中\U0001F600 text"}',
+    '{"message":"", "next": "ignored"}',
+    '{ "message" :\n  "spaced\\u0041" }',
+]
+
+
+def stream(document: str, chunks) -> str:
+    streamer = JsonStringFieldStreamer(("message", "result"))
+    return "".join(streamer.feed(chunk) for chunk in chunks)
+
+
+def expected_text(document: str) -> str:
+    data = json.loads(document)
+    return data.get("message", data.get("result"))
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_whole_document(document):
+    assert stream(document, [document]) == expected_text(document)
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_split_at_every_offset(document):
+    for offset in range(len(document) + 1):
+        chunks = [document[:offset], document[offset:]]
+        assert stream(document, chunks) == expected_text(document), offset
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_one_character_per_chunk(document):
+    assert stream(document, list(document)) == expected_text(document)
+
+
+def test_unicode_escape_split_across_chunks():
+    streamer = JsonStringFieldStreamer(("message",))
+    assert streamer.feed('{"message": "a\\u00') == "a"
+    assert streamer.feed('e9') == "é"
+    assert streamer.feed('\\ud83d') == ""
+    assert streamer.feed('\\ude00"}') == "\U0001F600"
+
+
+def test_stops_after_first_field():
+    streamer = JsonStringFieldStreamer(("message",))
+    assert streamer.feed('{"message": "first"') == "first"
+    assert streamer.feed(', "message": "second"}') == ""
+
+
+def test_without_fields_passes_text_through():
+    streamer = JsonStringFieldStreamer()
+    assert streamer.feed('not {"json"') == 'not {"json"'
@@ -0,0 +1,278 @@
+"""
+Tests for the LLM router: failover, circuit breaking, hedging and Retry-After parsing
+"""
+import asyncio
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIStatusError, BadRequestError, InternalServerError, RateLimitError
+
+from app.core.config import LLMEndpointConfig
+from app.infrastructure.external.llm import llm_router
+from app.infrastructure.external.llm.llm_router import LLMEndpoint, LLMRouter, MIN_HEDGE_SAMPLES, _retry_after
+
+
+def api_error(error_class, status_code: int, headers=None):
+    request = httpx.Request("POST", "https://llm.test/v1/chat/completions")
+    response = httpx.Response(status_code, headers=headers or {}, request=request)
+    return error_class("error", response=response, body=None)
+
+
+class FakeLLM:
+    """Answers after a delay, or raises the next queued error"""
+
+    def __init__(self, api_base: str, api_key=None, model_name=None, max_retries=None):
+        self.api_base = api_base
+        self.model_name = model_name or "model"
+        self.delay = 0.0
+        self.errors = []
+        self.calls = 0
+        self.closed_streams = 0
+
+    async def ask(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"role": "assistant", "content": self.api_base}
+
+    async def ask_stream(self, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+            if self.errors:
+                raise self.errors.pop(0)
+            yield {"content": self.api_base}
+            yield {"content": "done"}
+        finally:
+            self.closed_streams += 1
+
+
+@pytest.fixture
+def router(monkeypatch):
+    settings = SimpleNamespace(
+        llm_circuit_failure_threshold=2,
+        llm_circuit_open_seconds=30.0,
+        llm_hedge=True,
+        llm_hedge_min_delay_seconds=0.05,
+    )
+    monkeypatch.setattr(llm_router, "get_settings", lambda: settings)
+    monkeypatch.setattr(llm_router, "OpenAILLM", FakeLLM)
+    return LLMRouter([LLMEndpointConfig(api_base="primary"), LLMEndpointConfig(api_base="secondary")])
+
+
+def endpoints(router):
+    return router._endpoints
+
+
+def assert_slots_released(router):
+    for endpoint in endpoints(router):
+        assert endpoint.metrics()["in_flight"] == 0
+
+
+@pytest.mark.parametrize("headers,expected", [
+    ({"retry-after": "12"}, 12.0),
+    ({"retry-after": "1.5"}, 1.5),
+    ({"retry-after-ms": "250"}, 0.25),
+    ({"retry-after-ms": "250", "retry-after": "10"}, 0.25),
+    ({}, None),
+    ({"retry-after": "soon"}, None),
+])
+def test_retry_after(headers, expected):
+    assert _retry_after(api_error(RateLimitError, 429, headers)) == expected
+
+
+def test_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=60)
+    seconds = _retry_after(api_error(RateLimitError, 429, {"retry-after": format_datetime(when, usegmt=True)}))
+    assert 55 <= seconds <= 60
+
+
+def test_retry_after_past_http_date():
+    when = datetime.now(timezone.utc) - timedelta(seconds=60)
+    assert _retry_after(api_error(RateLimitError, 429, {"retry-after": format_datetime(when, usegmt=True)})) == 0.0
+
+
+def test_retry_after_without_response():
+    assert _retry_after(ValueError("no response")) is None
+
+
+def test_circuit_opens_after_consecutive_failures():
+    endpoint = LLMEndpoint(FakeLLM("primary"), max_concurrency=1, failure_threshold=2, open_seconds=30)
+    endpoint.record_failure(api_error(InternalServerError, 500))
+    assert endpoint.available
+    endpoint.record_failure(api_error(InternalServerError, 500))
+    assert not endpoint.available
+    assert 29 < endpoint.metrics()["circuit_open_seconds"] <= 30
+
+
+def test_circuit_opens_for_retry_after():
+    endpoint = LLMEndpoint(FakeLLM("primary"), max_concurrency=1, failure_threshold=3, open_seconds=30)
+    endpoint.record_failure(api_error(RateLimitError, 429, {"retry-after": "5"}))
+    assert not endpoint.available
+    assert 4 < endpoint.metrics()["circuit_open_seconds"] <= 5
+
+
+def test_circuit_ignores_bad_requests():
+    endpoint = LLMEndpoint(FakeLLM("primary"), max_concurrency=1, failure_threshold=1, open_seconds=30)
+    endpoint.record_failure(api_error(BadRequestError, 400))
+    assert endpoint.available
+    assert endpoint.metrics()["errors"] == 1
+
+
+def test_success_resets_failures():
+    endpoint = LLMEndpoint(FakeLLM("primary"), max_concurrency=1, failure_threshold=2, open_seconds=30)
+    endpoint.record_failure(api_error(InternalServerError, 500))
+    endpoint.record_success(0.1)
+    endpoint.record_failure(api_error(InternalServerError, 500))
+    assert endpoint.available
+
+
+def test_hedge_delay_waits_for_p95():
+    endpoint = LLMEndpoint(FakeLLM("primary"), max_concurrency=1, failure_threshold=2, open_seconds=30)
+    for _ in range(MIN_HEDGE_SAMPLES - 1):
+        endpoint.record_success(1.0)
+    assert endpoint.hedge_delay(False, 0.5) is None
+    endpoint.record_success(1.0)
+    assert endpoint.hedge_delay(False, 0.5) == 1.0
+    assert endpoint.hedge_delay(False, 3.0) == 3.0
+
+
+async def test_ask_fails_over_on_endpoint_failure(router):
+    primary, secondary = endpoints(router)
+    primary.llm.errors = [api_error(InternalServerError, 500)]
+
+    response = await router.ask(messages=[])
+
+    assert response["content"] == "secondary"
+    assert primary.metrics()["errors"] == 1
+    assert_slots_released(router)
+
+
+async def test_ask_does_not_fail_over_on_bad_request(router):
+    primary, secondary = endpoints(router)
+    primary.llm.errors = [api_error(BadRequestError, 400)]
+
+    with pytest.raises(BadRequestError):
+        await router.ask(messages=[])
+
+    assert secondary.llm.calls == 0
+    assert_slots_released(router)
+
+
+async def test_ask_raises_last_error_when_all_fail(router):
+    for endpoint in endpoints(router):
+        endpoint.llm.errors = [api_error(InternalServerError, 503)]
+
+    with pytest.raises(InternalServerError):
+        await router.ask(messages=[])
+
+
+async def test_ask_skips_open_circuit(router):
+    primary, secondary = endpoints(router)
+    primary.record_failure(api_error(RateLimitError, 429, {"retry-after": "60"}))
+
+    response = await router.ask(messages=[])
+
+    assert response["content"] == "secondary"
+    assert primary.llm.calls == 0
+
+
+async def test_ask_does_not_hedge_without_p95(router):
+    primary, secondary = endpoints(router)
+    primary.llm.delay = 0.2
+
+    response = await router.ask(messages=[])
+
+    assert response["content"] == "primary"
+    assert secondary.llm.calls == 0
+
+
+async def test_ask_hedges_slow_request(router):
+    primary, secondary = endpoints(router)
+    for _ in range(MIN_HEDGE_SAMPLES):
+        primary.record_success(0.01)
+        secondary.record_success(0.01)
+    primary.llm.delay = 1.0
+
+    response = await router.ask(messages=[])
+
+    assert response["content"] == "secondary"
+    await asyncio.sleep(0)
+    assert_slots_released(router)
+
+
+async def test_ask_stream_fails_over_before_first_chunk(router):
+    primary, secondary = endpoints(router)
+    primary.llm.errors = [api_error(RateLimitError, 429)]
+
+    chunks = [chunk async for chunk in router.ask_stream(messages=[])]
+
+    assert chunks == [{"content": "secondary"}, {"content": "done"}]
+    assert not primary.available
+    assert_slots_released(router)
+
+
+async def test_ask_stream_raises_bad_request(router):
+    primary, secondary = endpoints(router)
+    primary.llm.errors = [api_error(BadRequestError, 400)]
+
+    with pytest.raises(BadRequestError):
+        async for _ in router.ask_stream(messages=[]):
+            pass
+
+    assert secondary.llm.calls == 0
+    assert_slots_released(router)
+
+
+async def test_ask_stream_releases_winner_on_bad_request_from_hedge(router):
+    primary, secondary = endpoints(router)
+    for _ in range(MIN_HEDGE_SAMPLES):
+        primary.record_first_token(0.01)
+        secondary.record_first_token(0.01)
+    started = asyncio.Event()
+    ask_stream = primary.llm.ask_stream
+
+    async def wait_for_hedge(**kwargs):
+        await started.wait()
+        async for chunk in ask_stream(**kwargs):
+            yield chunk
+
+    async def reject(**kwargs):
+        # Answers in the same tick as the primary stream starts
+        started.set()
+        raise api_error(BadRequestError, 400)
+        yield
+
+    primary.llm.ask_stream = wait_for_hedge
+    secondary.llm.ask_stream = reject
+
+    try:
+        chunks = [chunk async for chunk in router.ask_stream(messages=[])]
+    except BadRequestError:
+        chunks = None
+
+    await asyncio.sleep(0.01)
+    if chunks is not None:
+        assert chunks[0] == {"content": "primary"}
+    assert primary.llm.closed_streams == 1
+    assert_slots_released(router)
+
+
+async def test_ask_stream_closes_hedged_loser(router):
+    primary, secondary = endpoints(router)
+    for _ in range(MIN_HEDGE_SAMPLES):
+        primary.record_first_token(0.01)
+        secondary.record_first_token(0.01)
+    primary.llm.delay = 1.0
+
+    chunks = [chunk async for chunk in router.ask_stream(messages=[])]
+
+    assert chunks[0] == {"content": "secondary"}
+    await asyncio.sleep(0.01)
+    assert primary.llm.closed_streams == 1
+    assert_slots_released(router)
@@ -0,0 +1,162 @@
+"""
+Tests for the incremental memory writes of MongoAgentRepository on an in-memory MongoDB
+"""
+import pytest
+
+from app.domain.models.agent import Agent
+from app.domain.models.memory import Memory
+from app.infrastructure.models.documents import AgentDocument
+from app.infrastructure.repositories.mongo_agent_repository import MongoAgentRepository
+
+
+@pytest.fixture
+async def repository(mongodb):
+    repository = MongoAgentRepository()
+    await repository.save(Agent(id="agent"))
+    return repository
+
+
+def user(index: int):
+    return {"role": "user", "content": f"message {index}"}
+
+
+def page_view(index: int):
+    return {"role": "tool", "function_name": "browser_view", "tool_call_id": f"call_{index}", "content": f"page {index}"}
+
+
+async def stored_messages(name: str = "planner"):
+    document = await AgentDocument.get_pymongo_collection().find_one({"agent_id": "agent"})
+    return document["memories"][name]["messages"]
+
+
+async def load(repository, messages) -> Memory:
+    """Store messages as a full write and load them back, as agents do on start"""
+    memory = Memory(messages=list(messages))
+    await repository.save_memory("agent", "planner", memory)
+    return await repository.get_memory("agent", "planner")
+
+
+async def test_first_save_writes_all_messages(repository):
+    memory = Memory(messages=[user(0), user(1)])
+    assert memory.get_changes().replace
+
+    await repository.save_memory("agent", "planner", memory)
+
+    assert await stored_messages() == memory.messages
+    assert memory.get_changes().empty
+
+
+async def test_append_only(repository):
+    memory = await load(repository, [user(0)])
+    memory.add_message(user(1))
+    memory.add_messages([user(2), user(3)])
+
+    changes = memory.get_changes()
+    assert changes.appended == [user(1), user(2), user(3)]
+    assert not changes.replace and changes.truncate_to is None
+    await repository.save_memory("agent", "planner", memory)
+
+    assert await stored_messages() == memory.messages
+
+
+async def test_roll_back_one_then_append(repository):
+    memory = await load(repository, [user(0), user(1), user(2)])
+    memory.roll_back()
+    memory.add_message(user(3))
+
+    assert memory.get_changes().removed == 1
+    await repository.save_memory("agent", "planner", memory)
+
+    assert await stored_messages() == [user(0), user(1), user(3)]
+
+
+async def test_roll_back_several_then_append(repository):
+    memory = await load(repository, [user(index) for index in range(5)])
+    memory.roll_back()
+    memory.roll_back()
+    memory.roll_back()
+    memory.add_messages([user(5), user(6)])
+
+    changes = memory.get_changes()
+    assert changes.truncate_to == 2 and changes.removed == 3
+    await repository.save_memory("agent", "planner", memory)
+
+    assert await stored_messages() == memory.messages
+
+
+async def test_roll_back_unsaved_message(repository):
+    memory = await load(repository, [user(0)])
+    memory.add_message(user(1))
+    memory.roll_back()
+
+    assert memory.get_changes().empty
+    await repository.save_memory("agent", "planner", memory)
+
+    assert await stored_messages() == [user(0)]
+
+
+async def test_truncation_without_append(repository):
+    memory = await load(repository, [user(index) for index in range(4)])
+    memory.roll_back()
+    memory.roll_back()
+
+    await repository.save_memory("agent", "planner", memory)
+
+    assert await stored_messages() == [user(0), user(1)]
+
+
+async def test_compact_updates_earlier_messages(repository):
+    memory = await load(repository, [user(0), page_view(1), user(2), page_view(3)])
+    memory.add_message(page_view(4))
+    memory.compact()
+
+    changes = memory.get_changes()
+    assert sorted(changes.updated) == [1, 3]
+    assert len(changes.appended) == 1
+    await repository.save_memory("agent", "planner", memory)
+
+    assert await stored_messages() == memory.messages
+    assert all("(removed)" in message["content"] for message in memory.messages if message["role"] == "tool")
+
+
+async def test_compact_then_roll_back_compacted_message(repository):
+    memory = await load(repository, [user(0), page_view(1), user(2), page_view(3)])
+    memory.compact()
+    memory.roll_back()
+    memory.add_message(user(4))
+
+    await repository.save_memory("agent", "planner", memory)
+
+    assert await stored_messages() == memory.messages
+
+
+async def test_append_only_compaction_appends_marker(repository):
+    memory = await load(repository, [user(0), page_view(1)])
+    memory.compact(append_only=True)
+
+    assert not memory.get_changes().updated
+    await repository.save_memory("agent", "planner", memory)
+
+    assert await stored_messages() == memory.messages
+
+
+async def test_saves_in_sequence(repository):
+    memory = await load(repository, [user(0)])
+    for index in range(1, 4):
+        memory.add_message(page_view(index))
+        await repository.save_memory("agent", "planner", memory)
+    memory.compact()
+    memory.roll_back()
+    await repository.save_memory("agent", "planner", memory)
+
+    assert await stored_messages() == memory.messages
+    assert (await repository.get_memory("agent", "planner")).messages == memory.messages
+
+
+async def test_save_memory_of_missing_agent(repository):
+    memory = Memory(messages=[user(0)])
+    memory.mark_saved()
+    memory.add_message(user(1))
+
+    with pytest.raises(ValueError):
+        await repository.save_memory("missing", "planner", memory)
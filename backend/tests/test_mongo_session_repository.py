@@ -0,0 +1,123 @@
+"""
+Tests for the session event storage of MongoSessionRepository on an in-memory MongoDB
+"""
+import pytest
+
+from app.domain.models.event import TitleEvent
+from app.domain.models.session import Session
+from app.infrastructure.models.documents import SessionDocument, SessionEventDocument
+from app.infrastructure.repositories import mongo_session_repository
+from app.infrastructure.repositories.mongo_session_repository import MongoSessionRepository
+
+
+@pytest.fixture
+async def repository(mongodb):
+    return MongoSessionRepository()
+
+
+async def create_session(repository, session_id: str = "session") -> Session:
+    session = Session(id=session_id, user_id="user", agent_id="agent")
+    await repository.save(session)
+    return session
+
+
+async def stored_seqs(session_id: str):
+    documents = await SessionEventDocument.find(SessionEventDocument.session_id == session_id).sort("+seq").to_list()
+    return [document.seq for document in documents]
+
+
+async def test_add_event_appends_in_order(repository):
+    await create_session(repository)
+    events = [TitleEvent(title=f"title {index}") for index in range(3)]
+    for event in events:
+        await repository.add_event("session", event)
+
+    assert await stored_seqs("session") == [0, 1, 2]
+    assert [event.id for event in await repository.get_events("session")] == [event.id for event in events]
+    assert [event.id for event in await repository.get_events("session", after_id=events[0].id)] == [
+        event.id for event in events[1:]
+    ]
+
+
+async def test_add_event_retries_taken_seq(repository, monkeypatch):
+    await create_session(repository)
+    insert = SessionEventDocument.insert
+    competitor = TitleEvent(title="other writer")
+    raced = []
+
+    async def racing_insert(self, *args, **kwargs):
+        # Another writer takes the position between reading the tail and inserting
+        if not raced:
+            raced.append(self.seq)
+            await insert(SessionEventDocument(session_id=self.session_id, seq=self.seq, event=competitor))
+        return await insert(self, *args, **kwargs)
+
+    monkeypatch.setattr(SessionEventDocument, "insert", racing_insert)
+    event = TitleEvent(title="title")
+    await repository.add_event("session", event)
+
+    assert raced == [0]
+    assert [stored.id for stored in await repository.get_events("session")] == [competitor.id, event.id]
+
+
+async def test_add_event_gives_up_after_max_attempts(repository, monkeypatch):
+    await create_session(repository)
+    insert = SessionEventDocument.insert
+
+    async def always_racing_insert(self, *args, **kwargs):
+        await insert(SessionEventDocument(session_id=self.session_id, seq=self.seq, event=TitleEvent(title="other")))
+        return await insert(self, *args, **kwargs)
+
+    monkeypatch.setattr(SessionEventDocument, "insert", always_racing_insert)
+    with pytest.raises(RuntimeError):
+        await repository.add_event("session", TitleEvent(title="title"))
+
+    assert await stored_seqs("session") == list(range(mongo_session_repository.ADD_EVENT_MAX_ATTEMPTS))
+
+
+async def create_legacy_session(repository, session_id: str, events):
+    await create_session(repository, session_id)
+    await SessionDocument.get_pymongo_collection().update_one(
+        {"session_id": session_id},
+        {"$set": {"events": [event.model_dump() for event in events]}},
+    )
+
+
+async def test_migrate_legacy_events(repository, monkeypatch):
+    monkeypatch.setattr(mongo_session_repository, "MIGRATION_BATCH_SIZE", 1)
+    first = [TitleEvent(title=f"first {index}") for index in range(3)]
+    second = [TitleEvent(title="second")]
+    await create_legacy_session(repository, "first", first)
+    await create_legacy_session(repository, "second", second)
+    await create_session(repository, "current")
+    await repository.add_event("current", TitleEvent(title="current"))
+
+    assert await repository.migrate_legacy_events() == 2
+
+    assert [event.id for event in await repository.get_events("first")] == [event.id for event in first]
+    assert [event.id for event in await repository.get_events("second")] == [event.id for event in second]
+    assert await stored_seqs("current") == [0]
+    raw = await SessionDocument.get_pymongo_collection().find_one({"session_id": "first"})
+    assert "events" not in raw
+
+
+async def test_migrate_legacy_events_twice(repository):
+    events = [TitleEvent(title=f"title {index}") for index in range(3)]
+    await create_legacy_session(repository, "legacy", events)
+
+    assert await repository.migrate_legacy_events() == 1
+    assert await repository.migrate_legacy_events() == 0
+
+    assert await stored_seqs("legacy") == [0, 1, 2]
+
+
+async def test_migrate_legacy_events_resumes_partial_run(repository):
+    events = [TitleEvent(title=f"title {index}") for index in range(3)]
+    await create_legacy_session(repository, "legacy", events)
+    # A node stopped after storing part of the events, before removing the embedded ones
+    await SessionEventDocument(session_id="legacy", seq=0, event=events[0]).insert()
+
+    assert await repository.migrate_legacy_events() == 1
+
+    assert await stored_seqs("legacy") == [0, 1, 2]
+    assert [event.id for event in await repository.get_events("legacy")] == [event.id for event in events]
@@ -0,0 +1,115 @@
+"""
+Tests for the at-least-once delivery of RedisStreamGroupQueue on an in-memory Redis
+"""
+import asyncio
+import os
+import socket
+from types import SimpleNamespace
+
+import pytest
+
+from app.infrastructure.external.message_queue import redis_stream_group_queue, redis_stream_queue
+from app.infrastructure.external.message_queue.redis_stream_group_queue import RedisStreamGroupQueue
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    settings = SimpleNamespace(redis_stream_max_len=1000, redis_stream_retention_seconds=None)
+    monkeypatch.setattr(redis_stream_queue, "get_settings", lambda: settings)
+    monkeypatch.setattr(redis_stream_queue, "get_redis", lambda: SimpleNamespace(client=client))
+    return client
+
+
+@pytest.fixture
+def reclaim_after(monkeypatch):
+    """Make pending messages reclaimable after a short idle time"""
+    monkeypatch.setattr(redis_stream_group_queue, "RECLAIM_MIN_IDLE_MS", 50)
+    return 0.06
+
+
+def consumer(name: str) -> RedisStreamGroupQueue:
+    return RedisStreamGroupQueue("input", consumer_name=name)
+
+
+async def test_put_pop_ack(redis):
+    queue = consumer("worker")
+    assert await queue.is_empty()
+    message_id = await queue.put("hello")
+
+    assert not await queue.is_empty()
+    assert await queue.pop() == (message_id, "hello")
+    # Being handled by this consumer
+    assert await queue.is_empty()
+    assert await queue.pop() == (None, None)
+
+    assert await queue.ack(message_id)
+    assert await redis.xlen("input") == 0
+    assert await redis.xpending("input", "agent") == {"pending": 0, "min": None, "max": None, "consumers": []}
+
+
+async def test_each_message_goes_to_one_consumer(redis):
+    first, second = consumer("first"), consumer("second")
+    ids = [await first.put(f"message {index}") for index in range(2)]
+
+    popped = [await first.pop(), await second.pop()]
+
+    assert [message_id for message_id, _ in popped] == ids
+    assert await first.pop() == (None, None)
+    assert await second.pop() == (None, None)
+
+
+async def test_unacked_message_is_reclaimed_after_idle_time(redis, reclaim_after):
+    crashed, restarted = consumer("crashed"), consumer("restarted")
+    message_id = await crashed.put("hello")
+    await crashed.pop()
+
+    # Not reclaimable yet, the running flow must not be interrupted for it
+    assert await restarted.is_empty()
+    assert await restarted.pop() == (None, None)
+
+    await asyncio.sleep(reclaim_after)
+    assert not await restarted.is_empty()
+    assert await restarted.pop() == (message_id, "hello")
+    assert await restarted.is_empty()
+    assert await restarted.ack(message_id)
+    assert await crashed.is_empty()
+
+
+async def test_acked_message_is_not_redelivered(redis, reclaim_after):
+    first, second = consumer("first"), consumer("second")
+    message_id = await first.put("hello")
+    await first.pop()
+    await first.ack(message_id)
+
+    await asyncio.sleep(reclaim_after)
+    assert await second.is_empty()
+    assert await second.pop() == (None, None)
+
+
+async def test_own_pending_message_does_not_count(redis, reclaim_after):
+    queue = consumer("worker")
+    await queue.put("hello")
+    await queue.pop()
+
+    await asyncio.sleep(reclaim_after)
+    assert await queue.is_empty()
+
+
+async def test_group_is_recreated_after_stream_expired(redis):
+    queue = consumer("worker")
+    await queue.put("first")
+    await redis.delete("input")
+    assert await queue.is_empty()
+
+    message_id = await queue.put("second")
+    assert await queue.pop() == (message_id, "second")
+
+
+def test_default_consumer_name_is_unique_per_process(redis):
+    # A restarted container keeps its hostname and pid, its pending messages must not look like its own
+    queue = RedisStreamGroupQueue("input")
+    assert queue._consumer_name.startswith(f"{socket.gethostname()}-{os.getpid()}-")
+    assert queue._consumer_name != f"{socket.gethostname()}-{os.getpid()}"
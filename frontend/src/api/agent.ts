@@ -1,7 +1,7 @@
 // Backend API service
 import { apiClient, API_CONFIG, ApiResponse, createSSEConnection, SSECallbacks } from './client';
 import { AgentSSEEvent } from '../types/event';
-import { CreateSessionResponse, GetSessionResponse, ShellViewResponse, FileViewResponse, ListSessionResponse, SignedUrlResponse, ShareSessionResponse, SharedSessionResponse } from '../types/response';
+import { CreateSessionResponse, GetSessionResponse, ShellViewResponse, FileViewResponse, ListSessionResponse, SessionsDeltaResponse, SignedUrlResponse, ShareSessionResponse, SharedSessionResponse } from '../types/response';
 import type { FileInfo } from './file';
 
 
@@ -25,8 +25,8 @@ export async function getSessions(): Promise<ListSessionResponse> {
   return response.data.data;
 }
 
-export async function getSessionsSSE(callbacks?: SSECallbacks<ListSessionResponse>): Promise<() => void> {
-  return createSSEConnection<ListSessionResponse>(
+export async function getSessionsSSE(callbacks?: SSECallbacks<ListSessionResponse | SessionsDeltaResponse>): Promise<() => void> {
+  return createSSEConnection<ListSessionResponse | SessionsDeltaResponse>(
     '/sessions',
     {
       method: 'POST'
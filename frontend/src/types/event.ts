@@ -1,8 +1,8 @@
 import type { FileInfo } from '../api/file';
 
 export type AgentSSEEvent = {
-  event: 'tool' | 'step' | 'message' | 'error' | 'done' | 'title' | 'wait' | 'plan' | 'attachments';
-  data: ToolEventData | StepEventData | MessageEventData | ErrorEventData | DoneEventData | TitleEventData | WaitEventData | PlanEventData;
+  event: 'tool' | 'step' | 'message' | 'message_delta' | 'error' | 'done' | 'title' | 'wait' | 'plan' | 'attachments';
+  data: ToolEventData | StepEventData | MessageEventData | MessageDeltaEventData | ErrorEventData | DoneEventData | TitleEventData | WaitEventData | PlanEventData;
 }
 
 export interface BaseEventData {
@@ -31,6 +31,10 @@ export interface MessageEventData extends BaseEventData {
   attachments: FileInfo[];
 }
 
+export interface MessageDeltaEventData extends BaseEventData {
+  delta: string;
+}
+
 export interface ErrorEventData extends BaseEventData {
   error: string;
 }
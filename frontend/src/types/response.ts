@@ -33,6 +33,11 @@ export interface ListSessionResponse {
     sessions: ListSessionItem[];
 }
 
+export interface SessionsDeltaResponse {
+    sessions: ListSessionItem[];
+    deleted_session_ids: string[];
+}
+
 export interface ConsoleRecord {
     ps1: string;
     command: string;